@@ -11,7 +11,24 @@ class Config:
     UPLOAD_FOLDER = 'uploads'
     FRAMES_FOLDER = 'frames'
     DATASETS_FOLDER = 'datasets'
-    MAX_CONTENT_LENGTH = 500 * 1024 * 1024  # 500MB max file size
+    MAX_CONTENT_LENGTH = 500 * 1024 * 1024  # 500MB max file size (per request)
+    
+    # Resumable chunked uploads: largest video, suggested chunk size and how
+    # long an unfinished upload is kept
+    MAX_UPLOAD_SIZE = int(float(os.environ.get('MAX_UPLOAD_GB', 20)) * 1024 ** 3)
+    UPLOAD_CHUNK_MB = int(os.environ.get('UPLOAD_CHUNK_MB', 8))
+    UPLOAD_EXPIRE_HOURS = float(os.environ.get('UPLOAD_EXPIRE_HOURS', 24))
+    
+    # Start extracting chunked uploads while they are still being received,
+    # giving up (until the upload is finalized) if it pauses this many seconds
+    PROGRESSIVE_EXTRACTION = os.environ.get('PROGRESSIVE_EXTRACTION', 'true').lower() in ('1', 'true', 'yes')
+    PROGRESSIVE_STALL_SECONDS = float(os.environ.get('PROGRESSIVE_STALL_SECONDS', 120))
+    
+    # Server-side import: folders videos may be imported from (separated by
+    # os.pathsep; empty disables the API) and whether to hard-link them into
+    # UPLOAD_FOLDER ('link') or use them where they are ('reference')
+    IMPORT_ROOTS = [root for root in os.environ.get('IMPORT_ROOTS', '').split(os.pathsep) if root]
+    IMPORT_MODE = os.environ.get('IMPORT_MODE', 'link')
     
     # Allowed file extensions
     ALLOWED_VIDEO_EXTENSIONS = {'mp4', 'avi', 'mov', 'mkv', 'flv', 'wmv', 'webm'}
@@ -20,6 +37,56 @@ class Config:
     DEFAULT_FRAME_INTERVAL = 1.0  # seconds
     MAX_FRAME_INTERVAL = 10.0     # seconds
     MIN_FRAME_INTERVAL = 0.1      # seconds
+    DEFAULT_SCENE_THRESHOLD = 0.15  # change score (0-1) for scene sampling
+    DEFAULT_DEDUPE_DISTANCE = 6     # max perceptual-hash bit difference for duplicates
+    DEFAULT_MIN_SHARPNESS = 100.0   # Laplacian variance below which a frame is blurry
+    
+    # Frame files: 'jpeg', 'webp' or 'png', JPEG/WebP quality (1-100) and the
+    # JPEG encoder ('opencv', 'turbojpeg' or 'auto' to use PyTurboJPEG if installed)
+    FRAME_FORMAT = os.environ.get('FRAME_FORMAT', 'jpeg')
+    FRAME_QUALITY = int(os.environ.get('FRAME_QUALITY', 95))
+    JPEG_BACKEND = os.environ.get('JPEG_BACKEND', 'auto')
+    
+    # Browser cache lifetime of frame, thumbnail and sprite responses (seconds)
+    FRAME_CACHE_MAX_AGE = int(os.environ.get('FRAME_CACHE_MAX_AGE', 365 * 24 * 3600))
+    
+    # In-memory cache of served frame files: entry and size limits
+    FRAME_CACHE_ITEMS = int(os.environ.get('FRAME_CACHE_ITEMS', 2048))
+    FRAME_CACHE_MB = float(os.environ.get('FRAME_CACHE_MB', 256))
+    
+    # Reuse stored videos and extractions when the same file is uploaded again
+    REUSE_EXTRACTIONS = os.environ.get('REUSE_EXTRACTIONS', 'true').lower() in ('1', 'true', 'yes')
+    
+    # Decode frames on first view instead of at upload time
+    LAZY_EXTRACTION = os.environ.get('LAZY_EXTRACTION', 'false').lower() in ('1', 'true', 'yes')
+    
+    # Background extraction jobs running at the same time
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+    
+    # Parallel extraction: processes per video and shortest segment per process.
+    # The cores are shared between the jobs that may run at the same time
+    EXTRACTION_WORKERS = int(os.environ.get('EXTRACTION_WORKERS',
+                                            max(1, (os.cpu_count() or 1) // max(1, JOB_WORKERS))))
+    MIN_SEGMENT_SECONDS = float(os.environ.get('MIN_SEGMENT_SECONDS', 30.0))
+    
+    # Pipelined extraction: JPEG encoder threads and decoded-frame buffer size
+    ENCODER_THREADS = int(os.environ.get('ENCODER_THREADS', 4))
+    PIPELINE_BUFFER_MB = float(os.environ.get('PIPELINE_BUFFER_MB', 256))
+    
+    # Open VideoCapture handles kept for on-demand frame decoding
+    CAPTURE_POOL_SIZE = int(os.environ.get('CAPTURE_POOL_SIZE', 8))
+    CAPTURE_IDLE_SECONDS = float(os.environ.get('CAPTURE_IDLE_SECONDS', 60))
+    
+    # Scheduling of queued jobs: running jobs per user and cores all running
+    # extractions may keep busy together (0 = unlimited)
+    JOBS_PER_USER = int(os.environ.get('JOBS_PER_USER', 2))
+    CPU_BUDGET = int(os.environ.get('CPU_BUDGET', os.cpu_count() or 1))
+    # Extractions of uploads still being received run outside those limits
+    # (they mostly wait for data); at most this many at a time
+    PROGRESSIVE_JOBS = int(os.environ.get('PROGRESSIVE_JOBS', 4))
+    
+    # Most videos one batch ingest request may queue
+    MAX_BATCH_FILES = int(os.environ.get('MAX_BATCH_FILES', 500))
     
     # Session timeout
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
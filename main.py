@@ -173,6 +173,276 @@ def show_test_info() -> None:
     print("  HTML report generated in 'htmlcov/' directory")
     print("  Open 'htmlcov/index.html' in browser for detailed view")
 
+def create_video_processor(**overrides):
+    """
+    Create a VideoProcessor configured like the web application's.
+    
+    Args:
+        **overrides: VideoProcessor arguments replacing the configured values
+        
+    Returns:
+        VideoProcessor: Processor writing to the configured frames folder
+    """
+    from config import Config
+    from modules.video_processor import VideoProcessor
+    
+    settings = dict(workers=Config.EXTRACTION_WORKERS,
+                    min_segment_seconds=Config.MIN_SEGMENT_SECONDS,
+                    encoder_threads=Config.ENCODER_THREADS,
+                    pipeline_buffer_mb=Config.PIPELINE_BUFFER_MB,
+                    capture_pool_size=Config.CAPTURE_POOL_SIZE,
+                    capture_idle_seconds=Config.CAPTURE_IDLE_SECONDS,
+                    jpeg_backend=Config.JPEG_BACKEND)
+    settings.update(overrides)
+    return VideoProcessor(Config.FRAMES_FOLDER, **settings)
+
+def import_local_video(path: str, interval: float, project_name: Optional[str] = None,
+                       mode: Optional[str] = None, lazy: bool = False) -> int:
+    """
+    Import a video that is already on this machine and extract its frames.
+    
+    The video is hard-linked into the upload folder (or used in place with
+    mode 'reference' or when it is on another file system) instead of being
+    copied through an HTTP upload. IMPORT_ROOTS only restricts the web API;
+    this command runs with the caller's own file permissions.
+    
+    Args:
+        path: Path of the video file
+        interval: Time interval between frames in seconds
+        project_name: Name for the project (generated when omitted)
+        mode: 'link' or 'reference' (default: IMPORT_MODE)
+        lazy: Create an on-demand project instead of extracting every frame
+        
+    Returns:
+        Exit code (0 on success)
+    """
+    from config import Config
+    from modules.uploads import resolve_import_path, import_video
+    
+    try:
+        source_path = resolve_import_path(os.path.abspath(path), None)
+        if not Config.allowed_file(source_path, Config.ALLOWED_VIDEO_EXTENSIONS):
+            print(f"❌ Invalid file type. Allowed: {', '.join(sorted(Config.ALLOWED_VIDEO_EXTENSIONS))}")
+            return 1
+        
+        processor = create_video_processor()
+        video_path = import_video(source_path, Config.UPLOAD_FOLDER, mode or Config.IMPORT_MODE)
+        print(f"📥 Importing {source_path}")
+        print(f"🔗 Hard-linked into {Config.UPLOAD_FOLDER}" if video_path != source_path
+              else "📌 Using the video in place")
+        
+        def report(frames_decoded: int, frames_written: int, total_frames: int):
+            print(f"\r🎞️  {frames_written} frames written ({frames_decoded}/{total_frames} decoded)",
+                  end='', flush=True)
+        
+        target = processor.create_lazy_project if lazy else processor.extract_frames
+        try:
+            project_id, frame_paths, _ = target(video_path, interval, project_name or None,
+                                                progress_callback=report)
+        except BaseException:
+            if video_path != source_path:
+                # No project uses the hard link of a video that was not extracted
+                os.remove(video_path)
+            raise
+        print()
+        print(f"✅ Project '{project_id}' created with {len(frame_paths)} frames")
+        return 0
+        
+    except KeyboardInterrupt:
+        print("\n⏹️  Import interrupted by user")
+        return 1
+    except (PermissionError, FileNotFoundError, ValueError) as e:
+        print(f"❌ Import failed: {e}")
+        return 1
+
+def find_videos(paths: List[str], recursive: bool = False) -> List[str]:
+    """
+    Collect the video files named on the command line.
+    
+    Folders are scanned for files with an allowed video extension (their
+    sub-folders only when recursive); files named explicitly are kept
+    whatever their extension so a wrong name is reported, not skipped.
+    
+    Args:
+        paths: Video files and folders of videos
+        recursive: Whether to scan sub-folders as well
+        
+    Returns:
+        Absolute video paths in a stable order, without duplicates
+    """
+    from config import Config
+    
+    videos = []
+    for path in paths:
+        path = os.path.abspath(path)
+        if os.path.isdir(path):
+            if recursive:
+                names = [os.path.join(folder, name)
+                         for folder, _, files in os.walk(path) for name in files]
+            else:
+                names = [os.path.join(path, name) for name in os.listdir(path)]
+            videos.extend(sorted(name for name in names if os.path.isfile(name) and
+                                 Config.allowed_file(name, Config.ALLOWED_VIDEO_EXTENSIONS)))
+        else:
+            videos.append(path)
+    return list(dict.fromkeys(videos))
+
+def _progress_bar(fraction: float, width: int = 30) -> str:
+    """Text progress bar for a fraction between 0 and 1"""
+    filled = int(round(width * min(max(fraction, 0.0), 1.0)))
+    return '█' * filled + '░' * (width - filled)
+
+def ingest_videos(paths: List[str], interval: float = 1.0, recursive: bool = False,
+                  jobs: Optional[int] = None, mode: Optional[str] = None,
+                  summary_path: str = 'ingest_summary.json') -> int:
+    """
+    Extract frames from many local videos in parallel, without the web server.
+    
+    Every video becomes an ordinary project in FRAMES_FOLDER (with the
+    configured frame format), so it shows up in the web UI exactly like an
+    uploaded one. Videos are imported like --import-video and run as jobs
+    on a JobRunner sized to the machine: shortest videos first, with the
+    running extractions' cores kept within the CPU count. With at least as
+    many videos as cores, each video is decoded on a single thread, since
+    one video per core is the cheapest way to keep every core busy.
+    
+    Args:
+        paths: Video files and folders of videos
+        interval: Time interval between frames in seconds
+        recursive: Whether to scan sub-folders of the given folders
+        jobs: Videos extracted at the same time (default: number of cores)
+        mode: 'link' or 'reference' (default: IMPORT_MODE)
+        summary_path: Where to write the JSON summary of the run
+        
+    Returns:
+        Exit code (0 if every video was extracted)
+    """
+    import json
+    import time
+    from concurrent.futures import wait
+    from config import Config
+    from modules.jobs import JobRunner, JOB_COMPLETED, JOB_RUNNING, FINISHED_STATES
+    from modules.uploads import resolve_import_path, import_video
+    
+    videos = find_videos(paths, recursive)
+    if not videos:
+        print("❌ No videos found")
+        return 1
+    cores = os.cpu_count() or 1
+    jobs = jobs or cores
+    
+    if len(videos) >= cores:
+        processor = create_video_processor(workers=1, encoder_threads=1)
+    else:
+        processor = create_video_processor()
+    runner = JobRunner(max_workers=jobs, history_limit=len(videos), cpu_budget=cores)
+    
+    print(f"📥 Ingesting {len(videos)} videos with up to {jobs} at a time on {cores} cores")
+    started = time.time()
+    entries = []
+    for source_path in videos:
+        entry = {'path': source_path, 'video_path': None, 'linked': False, 'job': None, 'error': None}
+        entries.append(entry)
+        try:
+            source_path = resolve_import_path(source_path, None)
+            if not Config.allowed_file(source_path, Config.ALLOWED_VIDEO_EXTENSIONS):
+                raise ValueError("Invalid file type. Allowed: " +
+                                 ', '.join(sorted(Config.ALLOWED_VIDEO_EXTENSIONS)))
+            video_path = import_video(source_path, Config.UPLOAD_FOLDER, mode or Config.IMPORT_MODE)
+        except (PermissionError, FileNotFoundError, ValueError) as e:
+            entry['error'] = str(e)
+            continue
+        duration = processor.probe_duration(video_path)
+        entry['video_path'] = video_path
+        entry['linked'] = video_path != source_path
+        entry['duration'] = round(duration, 3)
+        entry['job'] = runner.submit(
+            processor.extract_frames, video_path, interval,
+            description=os.path.basename(source_path),
+            duration_estimate=duration, cpu_cost=processor.extraction_cores(duration),
+            image_format=Config.FRAME_FORMAT, image_quality=Config.FRAME_QUALITY
+        )
+    
+    submitted = [entry['job'] for entry in entries if entry['job'] is not None]
+    try:
+        while True:
+            pending = wait([job.future for job in submitted], timeout=0.5).not_done
+            finished = sum(1 for entry in entries
+                           if entry['job'] is None or entry['job'].status in FINISHED_STATES)
+            # Running videos count by the share of their frames decoded so far
+            done = finished + sum(job.frames_decoded / job.total_frames for job in submitted
+                                  if job.status == JOB_RUNNING and job.total_frames > 0)
+            frames = sum(job.frames_written for job in submitted)
+            print(f"\r{_progress_bar(done / len(entries))} {finished}/{len(entries)} videos, "
+                  f"{frames} frames, {time.time() - started:.0f}s", end='', flush=True)
+            if not pending:
+                break
+        print()
+    except KeyboardInterrupt:
+        print("\n⏹️  Ingest interrupted by user, cancelling remaining videos")
+        for job in submitted:
+            runner.cancel(job.id)
+    finally:
+        runner.shutdown()
+    
+    results = []
+    for entry in entries:
+        job = entry.pop('job')
+        if job is not None:
+            entry['status'] = job.status
+            entry['error'] = job.error
+            if job.status == JOB_COMPLETED:
+                project_id, frame_paths, _ = job.result
+                entry['project_id'] = project_id
+                entry['frame_count'] = len(frame_paths)
+            if job.started_at and job.finished_at:
+                entry['seconds'] = round(job.finished_at - job.started_at, 3)
+        else:
+            entry['status'] = 'failed'
+        if entry['status'] != JOB_COMPLETED and entry['linked']:
+            # No project uses the hard link of a video that was not extracted
+            os.remove(entry['video_path'])
+            entry['video_path'] = None
+        results.append(entry)
+    
+    completed = [entry for entry in results if entry['status'] == JOB_COMPLETED]
+    summary = {
+        'started_at': started,
+        'elapsed_seconds': round(time.time() - started, 3),
+        'interval': interval,
+        'frames_folder': Config.FRAMES_FOLDER,
+        'videos': len(results),
+        'completed': len(completed),
+        'failed': len(results) - len(completed),
+        'frames': sum(entry['frame_count'] for entry in completed),
+        'results': results
+    }
+    with open(summary_path, 'w') as f:
+        json.dump(summary, f, indent=2)
+    
+    print(f"✅ {summary['completed']} of {summary['videos']} videos extracted "
+          f"({summary['frames']} frames in {summary['elapsed_seconds']:.0f}s)")
+    for entry in results:
+        if entry['status'] != JOB_COMPLETED:
+            print(f"❌ {entry['path']}: {entry['error'] or entry['status']}")
+    print(f"📄 Summary written to {summary_path}")
+    return 0 if summary['failed'] == 0 else 1
+
+def _add_extraction_arguments(parser, default=None):
+    """
+    Add the --interval and --import-mode options shared by imports and ingest.
+    
+    Args:
+        parser: Parser or argument group to add the options to
+        default: argparse.SUPPRESS to leave values parsed by a parent parser
+            alone when the options are not given (None: use the defaults)
+    """
+    parser.add_argument('--interval', type=float,
+                        default=1.0 if default is None else default,
+                        help='Seconds between extracted frames (default: 1.0)')
+    parser.add_argument('--import-mode', choices=['link', 'reference'], default=default,
+                        help='Hard-link videos into the upload folder or use them in place')
+
 def main():
     """Main function to start the Flask application or run tests."""
     parser = argparse.ArgumentParser(
@@ -187,6 +457,10 @@ Examples:
   python main.py --test-integration        # Run integration tests only
   python main.py --test-pattern auth       # Run auth-related tests
   python main.py --test-info               # Show test information
+  python main.py --import-video /mnt/footage/run1.mp4 --interval 2
+                                           # Extract a local video without uploading it
+  python main.py ingest /mnt/footage -r --summary nightly.json
+                                           # Extract a folder of videos in parallel
         """
     )
     
@@ -209,6 +483,16 @@ Examples:
     test_group.add_argument('--verbose', '-v', action='store_true',
                            help='Use verbose output for tests')
     
+    # Import arguments
+    import_group = parser.add_argument_group('Import Options')
+    import_group.add_argument('--import-video', metavar='PATH',
+                              help='Extract frames from a video already on this machine and exit')
+    _add_extraction_arguments(import_group)
+    import_group.add_argument('--project-name', default=None,
+                              help='Name of the imported project')
+    import_group.add_argument('--lazy', action='store_true',
+                              help='Decode frames on first view instead of extracting them now')
+    
     # Application arguments  
     app_group = parser.add_argument_group('Application Options')
     app_group.add_argument('--host', default='localhost', 
@@ -218,8 +502,31 @@ Examples:
     app_group.add_argument('--debug', action='store_true',
                           help='Run application in debug mode')
     
+    # Commands
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    ingest_parser = subparsers.add_parser(
+        'ingest', help='Extract frames from many local videos in parallel and exit',
+        description='Extract frames from local videos and folders of videos in parallel, '
+                    'without starting the web server')
+    ingest_parser.add_argument('paths', nargs='+', metavar='PATH',
+                               help='Video files or folders of videos')
+    ingest_parser.add_argument('--recursive', '-r', action='store_true',
+                               help='Also scan sub-folders of the given folders')
+    # Given after the command they override the top-level values, otherwise
+    # those apply (argparse would reset them to the defaults)
+    _add_extraction_arguments(ingest_parser, default=argparse.SUPPRESS)
+    ingest_parser.add_argument('--jobs', '-j', type=int, default=None,
+                               help='Videos extracted at the same time (default: number of cores)')
+    ingest_parser.add_argument('--summary', default='ingest_summary.json', metavar='PATH',
+                               help='Where to write the JSON summary (default: ingest_summary.json)')
+    
     args = parser.parse_args()
     
+    # Handle the headless ingest command
+    if args.command == 'ingest':
+        return ingest_videos(args.paths, args.interval, args.recursive, args.jobs,
+                             args.import_mode, args.summary)
+    
     # Handle test information request
     if args.test_info:
         show_test_info()
@@ -237,6 +544,11 @@ Examples:
     elif args.test_pattern:
         return run_specific_tests(args.test_pattern, verbose=args.verbose)
     
+    # Handle a local video import
+    if args.import_video:
+        return import_local_video(args.import_video, args.interval, args.project_name,
+                                  args.import_mode, args.lazy)
+    
     # Run the Flask application
     try:
         print("🚀 Starting VisionLabel Pro with Poetry...")
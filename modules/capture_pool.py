@@ -0,0 +1,202 @@
+"""
+Pool of open OpenCV VideoCapture handles for random-access frame decoding
+Avoids reopening the container for every frame request and decodes forward
+from the last position when frames are requested in order
+"""
+
+import cv2
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class PooledCapture:
+    """An open VideoCapture that remembers where its decoder is"""
+
+    def __init__(self, video_path: str, cap):
+        self.video_path = video_path
+        self.cap = cap
+        self.position = 0  # Frame number the next read() returns
+        self.last_used = time.monotonic()
+
+    def read_frame(self, frame_number: int, max_forward_frames: int) -> Tuple[bool, object]:
+        """
+        Decode a specific frame
+
+        Frames a short distance ahead are reached by grabbing forward from
+        the current position; anything else is reached with a seek.
+        """
+        gap = frame_number - self.position
+        if gap < 0 or gap > max_forward_frames:
+            if not self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number):
+                self.position = -1  # Unknown position: not returned to the pool
+                return False, None
+        else:
+            for _ in range(gap):
+                if not self.cap.grab():
+                    self.position = -1  # At the end of the video
+                    return False, None
+
+        ret, frame = self.cap.read()
+        self.position = frame_number + 1 if ret else -1
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
+
+
+class CapturePool:
+    """
+    Bounded LRU pool of open VideoCapture handles keyed by video path
+
+    Idle handles are released idle_timeout seconds after their last use by a
+    background timer, so a server that stops serving frames does not keep
+    the videos open.
+    """
+
+    # Timer-driven eviction runs at most this often (seconds)
+    MIN_EVICTION_DELAY = 1.0
+
+    def __init__(self, max_handles: int = 8, idle_timeout: float = 60.0,
+                 max_forward_frames: int = 120):
+        self.max_handles = max(1, max_handles)
+        self.idle_timeout = idle_timeout
+        self.max_forward_frames = max_forward_frames
+        # Idle handles in least-recently-used order
+        self._idle: 'OrderedDict[int, PooledCapture]' = OrderedDict()
+        self._in_use = 0
+        self._lock = threading.Lock()
+        self._eviction_timer: Optional[threading.Timer] = None
+        self.stats: Dict[str, int] = {'opened': 0, 'reused': 0, 'evicted': 0}
+
+    @contextmanager
+    def checkout(self, video_path: str, frame_number: int = None) -> Iterator[PooledCapture]:
+        """
+        Borrow an open capture for a video, opening one if none is idle
+
+        Args:
+            video_path: Path to the video file
+            frame_number: Frame the caller intends to read, used to prefer the
+                idle handle positioned closest before it
+
+        Yields:
+            PooledCapture owned exclusively by the caller until the block exits
+        """
+        handle = self._take_idle(video_path, frame_number)
+        if handle is None:
+            cap = cv2.VideoCapture(video_path)
+            if not cap.isOpened():
+                cap.release()
+                with self._lock:
+                    self._in_use -= 1
+                raise ValueError(f"Could not open video file: {video_path}")
+            handle = PooledCapture(video_path, cap)
+            with self._lock:
+                self.stats['opened'] += 1
+
+        healthy = False
+        try:
+            yield handle
+            healthy = handle.position >= 0
+        finally:
+            self._return(handle, healthy)
+
+    def read_frame(self, video_path: str, frame_number: int) -> Tuple[bool, object]:
+        """Decode one frame using a pooled capture"""
+        with self.checkout(video_path, frame_number) as handle:
+            return handle.read_frame(frame_number, self.max_forward_frames)
+
+    def evict_idle(self) -> int:
+        """Release handles that have been idle longer than idle_timeout"""
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            expired = [key for key, handle in self._idle.items() if handle.last_used < cutoff]
+            handles = [self._idle.pop(key) for key in expired]
+            self.stats['evicted'] += len(handles)
+        for handle in handles:
+            handle.release()
+        return len(handles)
+
+    def discard(self, video_path: str):
+        """Release every idle handle for a video (e.g. before deleting it)"""
+        with self._lock:
+            keys = [key for key, handle in self._idle.items() if handle.video_path == video_path]
+            handles = [self._idle.pop(key) for key in keys]
+        for handle in handles:
+            handle.release()
+
+    def close(self):
+        """Release all idle handles and stop the eviction timer"""
+        with self._lock:
+            handles = list(self._idle.values())
+            self._idle.clear()
+            if self._eviction_timer is not None:
+                self._eviction_timer.cancel()
+                self._eviction_timer = None
+        for handle in handles:
+            handle.release()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._idle) + self._in_use
+
+    def _take_idle(self, video_path: str, frame_number: Optional[int]) -> Optional[PooledCapture]:
+        """Remove and return the best idle handle for a video (counts it as in use)"""
+        self.evict_idle()
+        with self._lock:
+            self._in_use += 1
+            best_key = None
+            best_gap = None
+            for key, handle in self._idle.items():
+                if handle.video_path != video_path:
+                    continue
+                if frame_number is None:
+                    best_key = key
+                    break
+                gap = frame_number - handle.position
+                # Prefer a handle just behind the target; any other needs a seek
+                score = gap if 0 <= gap <= self.max_forward_frames else self.max_forward_frames + 1
+                if best_gap is None or score < best_gap:
+                    best_key, best_gap = key, score
+            if best_key is None:
+                return None
+            self.stats['reused'] += 1
+            return self._idle.pop(best_key)
+
+    def _return(self, handle: PooledCapture, healthy: bool):
+        """Put a handle back in the pool, trimming the least recently used"""
+        handle.last_used = time.monotonic()
+        released = []
+        with self._lock:
+            self._in_use -= 1
+            if healthy:
+                self._idle[id(handle)] = handle
+            else:
+                released.append(handle)
+            while self._idle and len(self._idle) + self._in_use > self.max_handles:
+                _, oldest = self._idle.popitem(last=False)
+                released.append(oldest)
+                self.stats['evicted'] += 1
+            self._schedule_eviction()
+        for stale in released:
+            stale.release()
+
+    def _schedule_eviction(self):
+        """Arm the timer releasing the oldest idle handle once it expires (lock held)"""
+        if self._eviction_timer is not None or not self._idle:
+            return
+        oldest = next(iter(self._idle.values()))
+        delay = max(oldest.last_used + self.idle_timeout - time.monotonic(), self.MIN_EVICTION_DELAY)
+        self._eviction_timer = threading.Timer(delay, self._evict_on_timer)
+        self._eviction_timer.daemon = True
+        self._eviction_timer.start()
+
+    def _evict_on_timer(self):
+        """Timer callback: release expired handles, then wait for the next one"""
+        with self._lock:
+            self._eviction_timer = None
+        self.evict_idle()
+        with self._lock:
+            self._schedule_eviction()
@@ -1,8 +1,9 @@
 import json
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence
 from datetime import datetime
 import uuid
+import numpy as np
 
 class LabelStorage:
     """Class to handle storage and retrieval of bounding box labels"""
@@ -121,7 +122,71 @@ class LabelStorage:
         except Exception as e:
             print(f"Error deleting annotation: {e}")
             return False
-    
+
+    def remap_frames(self, project_id: str, old_timestamps: Sequence[float],
+                     new_timestamps: Sequence[float], frame_paths: List[str],
+                     tolerance: float) -> Dict[str, int]:
+        """
+        Move annotations to new frame indices after a project was re-sampled
+
+        Each annotated frame is matched to the new frame with the nearest
+        source timestamp. Frames without a match within tolerance are kept
+        under 'unmatched_frames' (with their timestamp) so a later re-sample
+        that includes them again restores the labels.
+
+        Args:
+            project_id: Project identifier
+            old_timestamps: Source timestamp of every frame before re-sampling
+            new_timestamps: Source timestamp of every frame after re-sampling
+            frame_paths: New frame paths, indexed like new_timestamps
+            tolerance: Largest timestamp difference (seconds) counted as a match
+
+        Returns:
+            Number of 'matched' and 'unmatched' annotated frames
+        """
+        annotations_file = os.path.join(self.datasets_folder, project_id, 'annotations.json')
+        if not os.path.exists(annotations_file):
+            return {'matched': 0, 'unmatched': 0}
+
+        with open(annotations_file, 'r') as f:
+            all_annotations = json.load(f)
+
+        entries = list(all_annotations.get('unmatched_frames', []))
+        for frame_key, frame_data in all_annotations.get('frames', {}).items():
+            if 'timestamp' not in frame_data:
+                frame_index = int(frame_key)
+                if frame_index >= len(old_timestamps):
+                    continue
+                frame_data['timestamp'] = float(old_timestamps[frame_index])
+            entries.append(frame_data)
+
+        new_timestamps = np.asarray(new_timestamps, dtype=np.float64)
+        frames = {}
+        unmatched = []
+        for frame_data in sorted(entries, key=lambda entry: entry['timestamp']):
+            timestamp = frame_data['timestamp']
+            frame_index = None
+            if len(new_timestamps):
+                nearest = int(np.abs(new_timestamps - timestamp).argmin())
+                if abs(new_timestamps[nearest] - timestamp) <= tolerance:
+                    frame_index = nearest
+            if frame_index is None or str(frame_index) in frames:
+                if frame_data.get('annotations'):
+                    unmatched.append(dict(frame_data, frame_index=None, frame_path=None))
+                continue
+            frames[str(frame_index)] = dict(frame_data,
+                                            frame_index=frame_index,
+                                            frame_path=frame_paths[frame_index],
+                                            timestamp=float(new_timestamps[frame_index]))
+
+        all_annotations['frames'] = frames
+        all_annotations['unmatched_frames'] = unmatched
+        all_annotations['updated_at'] = datetime.now().isoformat()
+        with open(annotations_file, 'w') as f:
+            json.dump(all_annotations, f, indent=2)
+
+        return {'matched': len(frames), 'unmatched': len(unmatched)}
+
     def export_dataset(self, project_id: str, format_type: str = 'yolo') -> str:
         """
         Export dataset in specified format
@@ -0,0 +1,115 @@
+"""
+Filmstrip sprite sheets for timeline scrubbing
+Packs consecutive frame thumbnails into one image plus an offset map, built
+on first request and cached in the project folder (so deleting or re-sampling
+the project drops them with the frames)
+"""
+
+import cv2
+import json
+import math
+import os
+import uuid
+import numpy as np
+from typing import Dict, Tuple
+
+from .frame_encoder import FrameEncoder
+
+FILMSTRIP_FOLDER = 'filmstrip'
+
+
+class FilmstripCache:
+    """Class to handle building and caching filmstrip sprites of a project"""
+
+    # Sprite layout: tile height (px), tiles per row and largest strip
+    TILE_HEIGHT = 72
+    COLUMNS = 10
+    MAX_FRAMES = 200
+    SPRITE_QUALITY = 80
+
+    def __init__(self, video_processor):
+        self.video_processor = video_processor
+        self.encoder = FrameEncoder('jpeg', self.SPRITE_QUALITY)
+
+    def get(self, project_id: str, start: int = 0, count: int = 100) -> Tuple[str, Dict]:
+        """
+        Get the sprite path and offset map for frames [start, start + count)
+
+        Args:
+            project_id: Project identifier
+            start: First frame index
+            count: Number of frames (clamped to MAX_FRAMES and the project end)
+
+        Returns:
+            Tuple containing (sprite_path, offset_map)
+
+        Raises:
+            FileNotFoundError: If the project does not exist
+            IndexError: If start is outside the project
+        """
+        metadata = self.video_processor.get_project_metadata(project_id)
+        total = metadata['extracted_count']
+        if start < 0 or start >= total:
+            raise IndexError(f"Frame index {start} out of range")
+        count = max(1, min(count, self.MAX_FRAMES, total - start))
+
+        sprite_path, map_path = self._cache_paths(project_id, start, count)
+        if os.path.exists(map_path) and os.path.exists(sprite_path):
+            with open(map_path, 'r') as f:
+                return sprite_path, json.load(f)
+        return self._build(project_id, start, count, sprite_path, map_path)
+
+    def _cache_paths(self, project_id: str, start: int, count: int) -> Tuple[str, str]:
+        folder = os.path.join(self.video_processor.frames_folder, project_id, FILMSTRIP_FOLDER)
+        name = f"sprite_{start:06d}_{count:03d}"
+        return os.path.join(folder, f"{name}.jpg"), os.path.join(folder, f"{name}.json")
+
+    def _build(self, project_id: str, start: int, count: int,
+               sprite_path: str, map_path: str) -> Tuple[str, Dict]:
+        """Assemble the sprite from frame thumbnails and write it with its map"""
+        tiles = []
+        for frame_index in range(start, start + count):
+            thumb_path = self.video_processor.materialize_frame(project_id, frame_index, 'thumb')
+            thumb = cv2.imread(thumb_path, cv2.IMREAD_COLOR)
+            if thumb is None:
+                raise FileNotFoundError(f"Frame file unreadable: {thumb_path}")
+            height, width = thumb.shape[:2]
+            tile_width = max(1, round(width * self.TILE_HEIGHT / height))
+            tiles.append(cv2.resize(thumb, (tile_width, self.TILE_HEIGHT),
+                                    interpolation=cv2.INTER_AREA))
+
+        # Frames of one video share a size; the widest tile sets the grid
+        tile_width = max(tile.shape[1] for tile in tiles)
+        columns = min(self.COLUMNS, count)
+        rows = math.ceil(count / columns)
+        sprite = np.zeros((rows * self.TILE_HEIGHT, columns * tile_width, 3), dtype=np.uint8)
+
+        frames = []
+        for offset, tile in enumerate(tiles):
+            x = (offset % columns) * tile_width
+            y = (offset // columns) * self.TILE_HEIGHT
+            sprite[y:y + self.TILE_HEIGHT, x:x + tile.shape[1]] = tile
+            frames.append({'frame_index': start + offset, 'x': x, 'y': y,
+                           'width': tile.shape[1], 'height': self.TILE_HEIGHT})
+
+        offset_map = {
+            'start': start,
+            'count': count,
+            'columns': columns,
+            'tile_width': tile_width,
+            'tile_height': self.TILE_HEIGHT,
+            'sprite_width': sprite.shape[1],
+            'sprite_height': sprite.shape[0],
+            'frames': frames
+        }
+
+        os.makedirs(os.path.dirname(sprite_path), exist_ok=True)
+        suffix = uuid.uuid4().hex[:8]
+        temp_sprite = f"{sprite_path}.{suffix}.tmp{self.encoder.extension}"
+        self.encoder.write(temp_sprite, sprite)
+        os.replace(temp_sprite, sprite_path)
+        temp_map = f"{map_path}.{suffix}.tmp"
+        with open(temp_map, 'w') as f:
+            json.dump(offset_map, f)
+        os.replace(temp_map, map_path)
+        return sprite_path, offset_map
@@ -0,0 +1,79 @@
+"""
+In-process LRU cache of encoded frame bytes
+Keeps the most requested frame files in memory, bounded by item count and total size
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+
+class FrameByteCache:
+    """Thread-safe LRU cache of file contents bounded by count and bytes"""
+
+    def __init__(self, max_items: int = 1024, max_bytes: int = 256 * 1024 * 1024):
+        self.max_items = max(0, max_items)
+        self.max_bytes = max(0, max_bytes)
+        self._items: 'OrderedDict[Hashable, bytes]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Return cached bytes (marking them recently used), or None"""
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: Hashable, data: bytes) -> bool:
+        """
+        Cache bytes under key, evicting least recently used entries
+
+        Returns:
+            False if the value is larger than the whole cache and was not stored
+        """
+        if self.max_items == 0 or len(data) > self.max_bytes:
+            return False
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._items[key] = data
+            self._bytes += len(data)
+            while len(self._items) > self.max_items or self._bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+        return True
+
+    def clear(self):
+        """Drop every cached entry (counters are kept)"""
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'items': len(self._items),
+                'bytes': self._bytes,
+                'max_items': self.max_items,
+                'max_bytes': self.max_bytes
+            }
@@ -0,0 +1,146 @@
+"""
+Image encoding of extracted frames
+JPEG (OpenCV or libjpeg-turbo), WebP and lossless PNG with per-project settings
+"""
+
+import os
+from typing import Dict, Optional
+
+import cv2
+
+try:
+    from turbojpeg import TurboJPEG
+except ImportError:  # PyTurboJPEG is optional
+    TurboJPEG = None
+
+# Frame image formats: extension and mimetype
+FORMAT_JPEG = 'jpeg'
+FORMAT_WEBP = 'webp'
+FORMAT_PNG = 'png'
+FRAME_FORMATS = {
+    FORMAT_JPEG: ('.jpg', 'image/jpeg'),
+    FORMAT_WEBP: ('.webp', 'image/webp'),
+    FORMAT_PNG: ('.png', 'image/png'),
+}
+
+# JPEG backends
+BACKEND_AUTO = 'auto'
+BACKEND_OPENCV = 'opencv'
+BACKEND_TURBOJPEG = 'turbojpeg'
+JPEG_BACKENDS = (BACKEND_AUTO, BACKEND_OPENCV, BACKEND_TURBOJPEG)
+
+# OpenCV's own JPEG default, so unconfigured projects encode as before
+DEFAULT_QUALITY = 95
+
+_turbojpeg = None
+
+
+def _get_turbojpeg():
+    """Shared TurboJPEG instance (loading libjpeg-turbo is not free)"""
+    global _turbojpeg
+    if _turbojpeg is None:
+        _turbojpeg = TurboJPEG()
+    return _turbojpeg
+
+
+def turbojpeg_available() -> bool:
+    """Whether the libjpeg-turbo backend can be used"""
+    if TurboJPEG is None:
+        return False
+    try:
+        _get_turbojpeg()
+    except (OSError, RuntimeError):
+        return False
+    return True
+
+
+def mimetype_for_path(frame_path: str) -> str:
+    """Mimetype of a frame file from its extension"""
+    extension = os.path.splitext(frame_path)[1].lower()
+    for format_extension, mimetype in FRAME_FORMATS.values():
+        if extension == format_extension:
+            return mimetype
+    return 'application/octet-stream'
+
+
+class FrameEncoder:
+    """Class to handle encoding frames to image files in one format"""
+
+    def __init__(self, image_format: str = FORMAT_JPEG, quality: int = None,
+                 jpeg_backend: str = BACKEND_OPENCV):
+        """
+        Args:
+            image_format: 'jpeg', 'webp' or 'png'
+            quality: 1-100 for JPEG/WebP; ignored for lossless PNG
+            jpeg_backend: 'opencv', 'turbojpeg', or 'auto' to use
+                libjpeg-turbo when it is installed
+        """
+        if image_format not in FRAME_FORMATS:
+            raise ValueError(f"Unknown frame format: {image_format}")
+        if jpeg_backend not in JPEG_BACKENDS:
+            raise ValueError(f"Unknown JPEG backend: {jpeg_backend}")
+        quality = DEFAULT_QUALITY if quality is None else int(quality)
+        if not 1 <= quality <= 100:
+            raise ValueError(f"Quality must be between 1 and 100: {quality}")
+
+        if image_format != FORMAT_JPEG:
+            backend = BACKEND_OPENCV
+        elif jpeg_backend == BACKEND_AUTO:
+            backend = BACKEND_TURBOJPEG if turbojpeg_available() else BACKEND_OPENCV
+        elif jpeg_backend == BACKEND_TURBOJPEG and not turbojpeg_available():
+            raise ValueError("The turbojpeg backend requires PyTurboJPEG and libjpeg-turbo")
+        else:
+            backend = jpeg_backend
+
+        self.image_format = image_format
+        self.quality = quality
+        self.backend = backend
+        self.extension, self.mimetype = FRAME_FORMATS[image_format]
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict]) -> 'FrameEncoder':
+        """Rebuild an encoder from project metadata (JPEG defaults if missing)"""
+        if not settings:
+            return cls()
+        return cls(settings.get('format', FORMAT_JPEG), settings.get('quality'),
+                   settings.get('backend', BACKEND_OPENCV))
+
+    def to_dict(self) -> Dict:
+        """Settings recorded in project metadata"""
+        return {
+            'format': self.image_format,
+            'quality': self.quality,
+            'backend': self.backend,
+            'extension': self.extension,
+            'mimetype': self.mimetype
+        }
+
+    def encode(self, frame) -> bytes:
+        """Encode a BGR frame to image bytes"""
+        if self.backend == BACKEND_TURBOJPEG:
+            return _get_turbojpeg().encode(frame, quality=self.quality)
+        ok, buffer = cv2.imencode(self.extension, frame, self._imwrite_params())
+        if not ok:
+            raise ValueError(f"Could not encode frame as {self.image_format}")
+        return buffer.tobytes()
+
+    def write(self, frame_path: str, frame):
+        """
+        Encode a frame and write it to frame_path
+
+        Raises:
+            OSError: If the file could not be written (full disk, bad path)
+        """
+        if self.backend == BACKEND_OPENCV:
+            if not cv2.imwrite(frame_path, frame, self._imwrite_params()):
+                raise OSError(f"Could not write frame: {frame_path}")
+            return
+        with open(frame_path, 'wb') as f:
+            f.write(self.encode(frame))
+
+    def _imwrite_params(self) -> list:
+        if self.image_format == FORMAT_JPEG:
+            return [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        if self.image_format == FORMAT_WEBP:
+            return [cv2.IMWRITE_WEBP_QUALITY, self.quality]
+        return [cv2.IMWRITE_PNG_COMPRESSION, 3]
@@ -0,0 +1,51 @@
+"""
+Perceptual hashing of video frames for near-duplicate detection
+64-bit difference hashes (dHash) computed with OpenCV/NumPy and stored per project
+"""
+
+import os
+from typing import List
+
+import cv2
+import numpy as np
+
+# Hash index file written next to metadata.json
+HASH_INDEX_FILENAME = 'frame_hashes.npy'
+
+
+def dhash(frame) -> int:
+    """
+    Compute the 64-bit difference hash of a frame
+
+    The frame is reduced to a 9x8 grayscale image and each bit records
+    whether a pixel is brighter than its left-hand neighbour (row by row,
+    most significant bit first), which makes the hash robust to scaling,
+    compression and small exposure changes.
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int(np.packbits(bits.ravel()).view('>u8')[0])
+
+
+def hamming_distances(hashes: np.ndarray, value: int) -> np.ndarray:
+    """Hamming distance between every hash in an array and one hash"""
+    xor = np.bitwise_xor(np.asarray(hashes, dtype=np.uint64), np.uint64(value))
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(xor).astype(np.int64)
+    return np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def save_hash_index(project_folder: str, hashes: List[int]) -> str:
+    """Write a project's frame hashes (one per extracted frame, in order)"""
+    index_path = os.path.join(project_folder, HASH_INDEX_FILENAME)
+    np.save(index_path, np.asarray(hashes, dtype=np.uint64))
+    return index_path
+
+
+def load_hash_index(project_folder: str) -> np.ndarray:
+    """Load a project's frame hashes"""
+    index_path = os.path.join(project_folder, HASH_INDEX_FILENAME)
+    if not os.path.exists(index_path):
+        raise FileNotFoundError(f"Hash index not found: {index_path}")
+    return np.load(index_path)
@@ -0,0 +1,237 @@
+"""
+Decoding of videos that are still being uploaded
+A GrowingFile tracks how much of an upload is on disk and a GrowingCapture
+reads it like a VideoCapture, waiting for more data whenever the decoder
+catches up with the upload
+"""
+
+import cv2
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Optional, Tuple
+
+
+class SourceAborted(Exception):
+    """Raised when the upload being decoded was abandoned or stopped sending data"""
+
+
+class GrowingFile:
+    """Progress of a file that is being written, shared with the threads reading it"""
+
+    def __init__(self, path: str, stall_timeout: Optional[float] = None):
+        self.path = path
+        # Seconds the writer may pause before readers give up (None: reader's default)
+        self.stall_timeout = stall_timeout
+        self.sha256: Optional[str] = None  # Content hash, known once the file is complete
+        self._size = os.path.getsize(path) if os.path.exists(path) else 0
+        self._complete = False
+        self._aborted = False
+        self._condition = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def complete(self) -> bool:
+        return self._complete
+
+    @property
+    def aborted(self) -> bool:
+        return self._aborted
+
+    def grew(self, size: int):
+        """Called by the writer after bytes up to size were written and flushed"""
+        with self._condition:
+            self._size = max(self._size, size)
+            self._condition.notify_all()
+
+    def finish(self, sha256: str = None):
+        """Called by the writer once the whole file is on disk"""
+        with self._condition:
+            self._size = os.path.getsize(self.path)
+            self.sha256 = sha256
+            self._complete = True
+            self._condition.notify_all()
+
+    def abort(self):
+        """Called by the writer when the file will never be completed"""
+        with self._condition:
+            self._aborted = True
+            self._condition.notify_all()
+
+    def wait(self, size: int, timeout: float) -> bool:
+        """
+        Wait until the file is larger than size, complete or aborted
+
+        Returns:
+            False if nothing happened within timeout seconds
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._size > size or self._complete or self._aborted, timeout)
+
+
+class GrowingCapture:
+    """
+    VideoCapture-like reader of a GrowingFile
+
+    While the upload is incomplete, decoding near the end of the partial
+    file can produce a frame from a truncated packet, so every frame is
+    held back until `lookahead` further frames decoded successfully. When
+    the decoder reaches the end of the data, the unconfirmed frames are
+    dropped and the file is reopened at the first of them once it has
+    grown. After the upload completed, the capture is reopened one last
+    time and then reads the file directly.
+
+    Only read(), grab(), get(), set(CAP_PROP_POS_FRAMES), isOpened() and
+    release() are provided, which is all the extraction loops use.
+    """
+
+    def __init__(self, source: GrowingFile, lookahead: int = 2, stall_timeout: float = 600.0,
+                 on_wait: Optional[Callable[[], None]] = None, poll_interval: float = 1.0):
+        self.source = source
+        self.lookahead = max(1, lookahead)
+        self.stall_timeout = stall_timeout
+        # Called every poll_interval seconds while waiting for data; it may
+        # raise to stop waiting (e.g. when the reading job was cancelled)
+        self.on_wait = on_wait
+        self.poll_interval = poll_interval
+        self._cap = None
+        self._final = False  # The open capture saw the complete file
+        self._position = 0  # Frame number the next read() returns
+        self._position_msec = 0.0  # Timestamp of the frame last returned
+        self._buffer: Deque[Tuple[object, float]] = deque()
+        self._opened_size = 0
+        self._properties = {}
+        self._open()
+
+    def isOpened(self) -> bool:
+        return self._cap is not None
+
+    def read(self) -> Tuple[bool, object]:
+        entry = self._next()
+        if entry is None:
+            return False, None
+        frame, position_msec = entry
+        self._advance(position_msec)
+        return True, frame
+
+    def grab(self) -> bool:
+        if self._final and not self._buffer:
+            # Complete file: skipped frames need not be converted
+            if self._cap is None or not self._cap.grab():
+                return False
+            self._advance(self._cap.get(cv2.CAP_PROP_POS_MSEC))
+            return True
+        entry = self._next()
+        if entry is None:
+            return False
+        self._advance(entry[1])
+        return True
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self._position_msec
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self._position)
+        if self._final and self._cap is not None:
+            return self._cap.get(prop)
+        return self._properties.get(prop, 0.0)
+
+    def set(self, prop: int, value: float) -> bool:
+        if prop != cv2.CAP_PROP_POS_FRAMES:
+            return False
+        self._buffer.clear()
+        self._position = int(value)
+        if self._final:
+            return self._cap is not None and self._cap.set(cv2.CAP_PROP_POS_FRAMES, self._position)
+        self._reopen(self.source.size)
+        return self._cap is not None
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        self._buffer.clear()
+
+    def _advance(self, position_msec: float):
+        self._position += 1
+        self._position_msec = position_msec
+
+    def _next(self) -> Optional[Tuple[object, float]]:
+        """Next confirmed (frame, timestamp), or None at the end of the complete file"""
+        while True:
+            if self._buffer and (len(self._buffer) > self.lookahead or self._final):
+                return self._buffer.popleft()
+            if self._cap is None:
+                return None
+            if self._final:
+                ret, frame = self._cap.read()
+                return (frame, self._cap.get(cv2.CAP_PROP_POS_MSEC)) if ret else None
+
+            ret, frame = self._cap.read()
+            if ret:
+                self._buffer.append((frame, self._cap.get(cv2.CAP_PROP_POS_MSEC)))
+                continue
+            # End of the data on disk: unconfirmed frames are decoded again later
+            size = self._opened_size
+            self._buffer.clear()
+            self._wait_for_data(size)
+            self._reopen(size)
+
+    def _wait_for_data(self, size: int):
+        if self.source.complete:
+            return
+        deadline = time.monotonic() + self.stall_timeout
+        while not self.source.wait(size, min(self.poll_interval, max(deadline - time.monotonic(), 0))):
+            if time.monotonic() >= deadline:
+                raise SourceAborted(f"No upload data for {self.stall_timeout:.0f}s: {self.source.path}")
+            if self.on_wait is not None:
+                self.on_wait()
+        if self.source.aborted:
+            raise SourceAborted(f"Upload abandoned: {self.source.path}")
+
+    def _open(self):
+        """Wait until enough of the file is on disk for the container header to parse"""
+        while True:
+            if self.source.aborted:
+                raise SourceAborted(f"Upload abandoned: {self.source.path}")
+            if self._try_open() or self.source.complete:
+                return
+            self._wait_for_data(self._opened_size)
+
+    def _reopen(self, size: int):
+        """Reopen the file and seek back to the current position"""
+        while True:
+            if self._cap is not None:
+                self._cap.release()
+                self._cap = None
+            if self._try_open() and (self._position == 0 or
+                                     self._cap.set(cv2.CAP_PROP_POS_FRAMES, self._position)):
+                return
+            if self.source.complete:
+                # Complete file that cannot be positioned: nothing more to read
+                if self._cap is not None:
+                    self._cap.release()
+                    self._cap = None
+                return
+            self._wait_for_data(size)
+            size = self.source.size
+
+    def _try_open(self) -> bool:
+        final = self.source.complete
+        self._opened_size = self.source.size
+        cap = cv2.VideoCapture(self.source.path)
+        if not cap.isOpened():
+            cap.release()
+            return False
+        self._cap = cap
+        self._final = final
+        if not self._properties:
+            self._properties = {prop: cap.get(prop) for prop in (
+                cv2.CAP_PROP_FPS, cv2.CAP_PROP_FRAME_COUNT,
+                cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT)}
+        return True
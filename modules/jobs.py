@@ -0,0 +1,337 @@
+"""
+Background job runner for VisionLabel Pro
+Runs long video extractions on a local thread pool so HTTP requests return immediately;
+queued jobs are scheduled shortest first within per-user and CPU limits
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from .video_processor import ExtractionCancelled
+
+# Job states
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+FINISHED_STATES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+
+class Job:
+    """State and progress of a single background job"""
+
+    def __init__(self, job_id: str, owner_id: str = None, description: str = '',
+                 duration_estimate: float = 0.0, cpu_cost: int = 1):
+        self.id = job_id
+        self.owner_id = owner_id
+        self.description = description
+        # Scheduling inputs: expected run time (any consistent unit, e.g.
+        # seconds of video) and cores the job keeps busy
+        self.duration_estimate = duration_estimate
+        self.cpu_cost = max(1, cpu_cost)
+        # Run outside the scheduler (see JobRunner.submit)
+        self.detached = False
+        self.status = JOB_QUEUED
+        self.frames_decoded = 0
+        self.frames_written = 0
+        self.total_frames = 0
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.future: Optional[Future] = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def report_progress(self, frames_decoded: int, frames_written: int, total_frames: int):
+        """Progress callback handed to the job target; aborts if cancellation was requested"""
+        if self._cancel_event.is_set():
+            raise ExtractionCancelled(f"Job {self.id} cancelled")
+        self.frames_decoded = frames_decoded
+        self.frames_written = frames_written
+        self.total_frames = total_frames
+
+    def eta_seconds(self) -> Optional[float]:
+        """Estimate remaining run time from the decode rate so far"""
+        if self.status != JOB_RUNNING or not self.started_at:
+            return None
+        if self.frames_decoded <= 0 or self.total_frames <= 0:
+            return None
+        elapsed = time.monotonic() - self.started_at
+        remaining = max(self.total_frames - self.frames_decoded, 0)
+        return elapsed * remaining / self.frames_decoded
+
+    def to_dict(self) -> Dict:
+        """Convert job to a JSON-serialisable status dictionary"""
+        progress = 0.0
+        if self.status == JOB_COMPLETED:
+            progress = 100.0
+        elif self.total_frames > 0:
+            progress = min(self.frames_decoded / self.total_frames * 100, 100.0)
+
+        eta = self.eta_seconds()
+        return {
+            'job_id': self.id,
+            'description': self.description,
+            'status': self.status,
+            'frames_decoded': self.frames_decoded,
+            'frames_written': self.frames_written,
+            'total_frames': self.total_frames,
+            'progress': round(progress, 1),
+            'eta_seconds': round(eta, 1) if eta is not None else None,
+            'created_at': self.created_at,
+            'duration_estimate': self.duration_estimate,
+            'cpu_cost': self.cpu_cost,
+            'error': self.error,
+            'result': self.result
+        }
+
+
+class _QueuedJob:
+    """A submitted job waiting for the scheduler to start it"""
+
+    def __init__(self, job: Job, sequence: int, target: Callable[..., Any], args: tuple,
+                 kwargs: dict, on_complete: Optional[Callable[[Any], Any]]):
+        self.job = job
+        self.sequence = sequence
+        self.queued_at = time.monotonic()
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs
+        self.on_complete = on_complete
+
+
+class JobRunner:
+    """
+    Local thread-pool job runner (no external broker required)
+
+    Jobs do not start in submission order. Of the queued jobs whose owner
+    has fewer than per_user_limit jobs running, the one with the smallest
+    duration estimate starts first, as soon as a worker is free and its
+    cpu_cost fits in what is left of cpu_budget. Waiting lowers a job's
+    estimate by aging_rate per second so long jobs are not starved, and a
+    job that does not fit yet holds back the jobs behind it instead of
+    being overtaken forever. A job costing more than the whole budget runs
+    on its own.
+
+    Detached jobs, which mostly wait for input (e.g. extractions of uploads
+    still being received), bypass all of this: they run on a separate pool
+    of max_detached threads and take no worker, owner slot or cores from
+    the scheduled jobs.
+    """
+
+    def __init__(self, max_workers: int = 2, history_limit: int = 100,
+                 per_user_limit: int = None, cpu_budget: int = None,
+                 aging_rate: float = 1.0, max_detached: int = 4):
+        self.max_workers = max(1, max_workers)
+        self.history_limit = history_limit
+        self.per_user_limit = per_user_limit if per_user_limit and per_user_limit > 0 else None
+        self.cpu_budget = cpu_budget if cpu_budget and cpu_budget > 0 else None
+        self.aging_rate = aging_rate
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix='job-runner')
+        self._detached_executor = ThreadPoolExecutor(max_workers=max(1, max_detached),
+                                                     thread_name_prefix='job-runner-detached')
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._queue: List[_QueuedJob] = []
+        self._sequence = 0
+        self._active = 0
+        self._active_cost = 0
+        self._active_per_owner: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, target: Callable[..., Any], *args, owner_id: str = None,
+               description: str = '', on_complete: Callable[[Any], Any] = None,
+               duration_estimate: float = 0.0, cpu_cost: int = 1, detached: bool = False,
+               **kwargs) -> Job:
+        """
+        Queue a job
+
+        Args:
+            target: Callable run on a worker thread; receives the job's
+                progress callback as the progress_callback keyword argument
+            owner_id: User who submitted the job
+            description: Human readable job description
+            on_complete: Optional function mapping the target's return value
+                to the JSON-serialisable job result
+            duration_estimate: Expected run time used for shortest-job-first
+                ordering (equal estimates run in submission order)
+            cpu_cost: Cores the job keeps busy, counted against cpu_budget
+            detached: Start the job as soon as one of the max_detached
+                threads is free, outside the scheduler's limits
+
+        Returns:
+            The queued job
+        """
+        job = Job(uuid.uuid4().hex, owner_id=owner_id, description=description,
+                  duration_estimate=duration_estimate, cpu_cost=cpu_cost)
+        job.future = Future()
+        job.detached = detached
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune_history()
+            if detached:
+                self._detached_executor.submit(self._run, job, target, args, kwargs, on_complete)
+                return job
+            self._sequence += 1
+            self._queue.append(_QueuedJob(job, self._sequence, target, args, kwargs, on_complete))
+            self._dispatch()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by ID"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """Place of a queued job in the current start order (0 starts next), or None"""
+        with self._lock:
+            order = sorted(self._queue, key=self._priority)
+            for position, entry in enumerate(order):
+                if entry.job.id == job_id:
+                    return position
+        return None
+
+    def list_jobs(self, owner_id: str = None) -> list:
+        """List jobs, optionally only those of one owner"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        if owner_id is not None:
+            jobs = [job for job in jobs if job.owner_id == owner_id]
+        return jobs
+
+    def cancel(self, job_id: str, queued_only: bool = False) -> bool:
+        """
+        Request cancellation of a job
+
+        Queued jobs are dropped immediately; running jobs stop at their next
+        progress report.
+
+        Args:
+            job_id: Job to cancel
+            queued_only: Leave the job alone if it has already started
+
+        Returns:
+            False if the job does not exist or has already finished (or, with
+            queued_only, has already started)
+        """
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return False
+
+        with self._lock:
+            queued = [entry for entry in self._queue if entry.job is job]
+            if queued and job.future.cancel():
+                self._queue.remove(queued[0])
+                job.status = JOB_CANCELLED
+                job.finished_at = time.monotonic()
+                # A held-back job may have been waiting behind this one
+                self._dispatch()
+                return True
+            if job.detached and job.future.cancel():
+                # Still waiting for a detached thread; _run will skip it
+                job.status = JOB_CANCELLED
+                job.finished_at = time.monotonic()
+                return True
+        if queued_only:
+            return False
+        job._cancel_event.set()
+        return True
+
+    def shutdown(self, wait: bool = True):
+        """Cancel queued jobs and stop the worker threads"""
+        for job in self.list_jobs():
+            if job.status == JOB_QUEUED:
+                self.cancel(job.id)
+        self._executor.shutdown(wait=wait)
+        self._detached_executor.shutdown(wait=wait)
+
+    def _priority(self, entry: _QueuedJob, now: float = None):
+        """Sort key of a queued job: aged duration estimate, then submission order"""
+        waited = (now or time.monotonic()) - entry.queued_at
+        return entry.job.duration_estimate - self.aging_rate * waited, entry.sequence
+
+    def _may_start(self, job: Job) -> bool:
+        """Whether the owner's limit allows another running job (lock held)"""
+        return self.per_user_limit is None or job.owner_id is None or \
+            self._active_per_owner.get(job.owner_id, 0) < self.per_user_limit
+
+    def _fits_budget(self, job: Job) -> bool:
+        """Whether the job's cores fit next to the running jobs (lock held)"""
+        return self.cpu_budget is None or self._active_cost == 0 or \
+            self._active_cost + job.cpu_cost <= self.cpu_budget
+
+    def _dispatch(self):
+        """Start queued jobs while workers and CPU budget allow (lock held)"""
+        now = time.monotonic()
+        while self._active < self.max_workers:
+            eligible = [entry for entry in self._queue if self._may_start(entry.job)]
+            if not eligible:
+                return
+            entry = min(eligible, key=lambda e: self._priority(e, now))
+            if not self._fits_budget(entry.job):
+                return
+            self._queue.remove(entry)
+            job = entry.job
+            self._active += 1
+            self._active_cost += job.cpu_cost
+            if job.owner_id is not None:
+                self._active_per_owner[job.owner_id] = self._active_per_owner.get(job.owner_id, 0) + 1
+            self._executor.submit(self._run, job, entry.target, entry.args, entry.kwargs,
+                                  entry.on_complete)
+
+    def _release(self, job: Job):
+        """Return a finished job's worker, cores and owner slot, then start more jobs"""
+        with self._lock:
+            self._active -= 1
+            self._active_cost -= job.cpu_cost
+            if job.owner_id is not None:
+                self._active_per_owner[job.owner_id] -= 1
+                if not self._active_per_owner[job.owner_id]:
+                    del self._active_per_owner[job.owner_id]
+            self._dispatch()
+
+    def _run(self, job: Job, target: Callable[..., Any], args: tuple, kwargs: dict,
+             on_complete: Optional[Callable[[Any], Any]]):
+        """Worker-thread wrapper that records the outcome of a job"""
+        # Scheduled jobs are only cancelled through their future while queued,
+        # so this only fails for a detached job cancelled before it started
+        if not job.future.set_running_or_notify_cancel():
+            return
+        try:
+            if job.cancel_requested:
+                job.status = JOB_CANCELLED
+            else:
+                job.status = JOB_RUNNING
+                job.started_at = time.monotonic()
+                result = target(*args, progress_callback=job.report_progress, **kwargs)
+                job.result = on_complete(result) if on_complete else result
+                job.status = JOB_COMPLETED
+        except ExtractionCancelled:
+            job.status = JOB_CANCELLED
+        except Exception as e:
+            print(f"Error running job {job.id}: {e}")
+            job.error = str(e)
+            job.status = JOB_FAILED
+        finally:
+            job.finished_at = time.monotonic()
+            if not job.detached:
+                self._release(job)
+            job.future.set_result(None)
+
+    def _prune_history(self):
+        """Forget the oldest finished jobs beyond the history limit (lock held)"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED_STATES]
+        excess = len(self._jobs) - self.history_limit
+        for job_id in finished[:max(excess, 0)]:
+            del self._jobs[job_id]
@@ -0,0 +1,145 @@
+"""
+Compact frame manifest stored in a project's metadata.json
+Frame files are described by a filename pattern plus a count instead of a list
+of paths, and per-frame source numbers and timestamps are stored as packed arrays.
+The frame index side file records the decoded source frame number and
+presentation timestamp of every extracted frame.
+"""
+
+import base64
+import os
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# metadata.json layout version written by compact_metadata()
+MANIFEST_VERSION = 2
+DEFAULT_EXTENSION = '.jpg'
+
+PackedArray = Dict[str, Union[str, int]]
+
+# Frame index file written next to metadata.json: one record per extracted frame
+FRAME_INDEX_FILENAME = 'frame_index.npy'
+FRAME_INDEX_DTYPE = np.dtype([('frame_number', '<i8'), ('timestamp', '<f8')])
+
+
+def frame_pattern(extension: str = DEFAULT_EXTENSION) -> str:
+    """Filename pattern of extracted frames (printf style, relative to the project)"""
+    return f"frame_%06d{extension}"
+
+
+def pack_array(values: Sequence, dtype: str) -> PackedArray:
+    """Pack numbers into a JSON-friendly dict (little-endian bytes, base64)"""
+    array = np.asarray(values, dtype=np.dtype(dtype).newbyteorder('<'))
+    return {
+        'dtype': array.dtype.str,
+        'count': int(array.size),
+        'data': base64.b64encode(array.tobytes()).decode('ascii')
+    }
+
+
+def pack_increasing(values: Sequence) -> PackedArray:
+    """
+    Pack ascending integers as deltas in the smallest unsigned type
+    
+    Source frame numbers grow steadily, so their gaps usually fit in one
+    or two bytes instead of eight.
+    """
+    array = np.asarray(values, dtype=np.int64)
+    if array.size == 0:
+        return pack_array(array, '<i8')
+    deltas = np.diff(array)
+    if deltas.size and deltas.min() < 0:
+        return pack_array(array, '<i8')
+    largest = int(deltas.max()) if deltas.size else 0
+    dtype = next(t for t in ('<u1', '<u2', '<u4', '<u8') if largest <= np.iinfo(t).max)
+    packed = pack_array(deltas, dtype)
+    packed['count'] = int(array.size)
+    packed['start'] = int(array[0])
+    return packed
+
+
+def unpack_array(value) -> np.ndarray:
+    """Inverse of pack_array/pack_increasing; plain lists from old metadata are accepted"""
+    if isinstance(value, dict):
+        data = base64.b64decode(value['data'])
+        if 'start' in value:
+            deltas = np.frombuffer(data, dtype=np.dtype(value['dtype']), count=value['count'] - 1)
+            return np.concatenate(([value['start']], value['start'] + np.cumsum(deltas, dtype=np.int64)))
+        return np.frombuffer(data, dtype=np.dtype(value['dtype']), count=value['count'])
+    return np.asarray(value)
+
+
+def frame_filename(metadata: Dict, frame_index: int) -> str:
+    """Filename of a frame, for new (pattern) and old (path list) metadata"""
+    pattern = metadata.get('frame_pattern')
+    if pattern is None:
+        extension = metadata.get('encoding', {}).get('extension', DEFAULT_EXTENSION)
+        pattern = frame_pattern(extension)
+    return pattern % frame_index
+
+
+def frame_numbers(metadata: Dict) -> np.ndarray:
+    """Source frame number of every extracted frame"""
+    if 'frame_numbers' in metadata:
+        return unpack_array(metadata['frame_numbers']).astype(np.int64)
+    step = metadata.get('frame_step')
+    if step is None:
+        # Old interval projects only recorded the interval in seconds
+        step = max(1, int(metadata['fps'] * metadata['interval']))
+    return np.arange(metadata['extracted_count'], dtype=np.int64) * step
+
+
+def frame_timestamps(metadata: Dict) -> np.ndarray:
+    """Source timestamp (seconds) of every extracted frame"""
+    if 'frame_timestamps' in metadata:
+        return unpack_array(metadata['frame_timestamps']).astype(np.float64)
+    return np.round(frame_numbers(metadata) / metadata['fps'], 6)
+
+
+def compact_metadata(metadata: Dict) -> Dict:
+    """
+    Convert metadata to the compact manifest layout
+
+    The frame_paths list is replaced by frame_pattern (with extracted_count
+    as the count), frame_numbers lists become packed arrays and
+    frame_timestamps is only kept (packed) when it cannot be derived from
+    the frame numbers and frame rate.
+    """
+    compact = {key: value for key, value in metadata.items() if key != 'frame_paths'}
+    compact['manifest_version'] = MANIFEST_VERSION
+    compact['frame_pattern'] = frame_pattern(
+        metadata.get('encoding', {}).get('extension', DEFAULT_EXTENSION))
+    if isinstance(compact.get('frame_numbers'), list):
+        compact['frame_numbers'] = pack_increasing(compact['frame_numbers'])
+    if isinstance(compact.get('frame_timestamps'), list):
+        timestamps = compact.pop('frame_timestamps')
+        if not np.array_equal(np.asarray(timestamps, dtype=np.float64), frame_timestamps(compact)):
+            compact['frame_timestamps'] = pack_array(timestamps, '<f8')
+    return compact
+
+
+def save_frame_index(project_folder: str, entries: Iterable[Tuple[int, float]]) -> str:
+    """Write (frame_number, timestamp) records of a project's frames, in frame order"""
+    index_path = os.path.join(project_folder, FRAME_INDEX_FILENAME)
+    np.save(index_path, np.array(list(entries), dtype=FRAME_INDEX_DTYPE))
+    return index_path
+
+
+def load_frame_index(project_folder: str, metadata: Optional[Dict] = None) -> np.ndarray:
+    """
+    Load a project's frame index as a structured array
+
+    Projects extracted before the side file existed get an index rebuilt
+    from their metadata when it is given (timestamps are then derived from
+    the frame rate instead of decoded).
+    """
+    index_path = os.path.join(project_folder, FRAME_INDEX_FILENAME)
+    if os.path.exists(index_path):
+        return np.load(index_path)
+    if metadata is None:
+        raise FileNotFoundError(f"Frame index not found: {index_path}")
+    index = np.zeros(metadata['extracted_count'], dtype=FRAME_INDEX_DTYPE)
+    index['frame_number'] = frame_numbers(metadata)
+    index['timestamp'] = frame_timestamps(metadata)
+    return index
@@ -1,10 +1,21 @@
 from flask import Blueprint, render_template, request, jsonify, send_file, session, redirect, url_for, current_app
 from flask_login import login_required, current_user
+import atexit
+import hashlib
+import itertools
 import os
 import uuid
+from werkzeug.http import parse_content_range_header
 from werkzeug.utils import secure_filename
-from .video_processor import VideoProcessor
+from .video_processor import VideoProcessor, extraction_params, frame_version
+from .frame_encoder import FRAME_FORMATS, mimetype_for_path
+from .filmstrip import FilmstripCache
+from .frame_cache import FrameByteCache
 from .data_storage import LabelStorage
+from .uploads import (save_stream, resolve_import_path, resolve_import_folder, import_video,
+                      ChunkedUploads, UploadOffsetError, IMPORT_MODES)
+from .growing_capture import GrowingFile
+from .jobs import JobRunner, JOB_COMPLETED, FINISHED_STATES
 from config import Config
 import json
 
@@ -13,15 +24,122 @@ main_bp = Blueprint('main', __name__)
 # Initialize processors
 video_processor = None
 label_storage = None
+job_runner = None
+filmstrip_cache = None
+frame_cache = None
+chunked_uploads = None
 
 @main_bp.before_app_request
 def initialize_processors():
     """Initialize processors with app config"""
-    global video_processor, label_storage
+    global video_processor, label_storage, job_runner, filmstrip_cache, frame_cache, chunked_uploads
     if video_processor is None:
-        video_processor = VideoProcessor(current_app.config['FRAMES_FOLDER'])
+        video_processor = VideoProcessor(current_app.config['FRAMES_FOLDER'],
+                                         workers=current_app.config['EXTRACTION_WORKERS'],
+                                         min_segment_seconds=current_app.config['MIN_SEGMENT_SECONDS'],
+                                         encoder_threads=current_app.config['ENCODER_THREADS'],
+                                         pipeline_buffer_mb=current_app.config['PIPELINE_BUFFER_MB'],
+                                         capture_pool_size=current_app.config['CAPTURE_POOL_SIZE'],
+                                         capture_idle_seconds=current_app.config['CAPTURE_IDLE_SECONDS'],
+                                         jpeg_backend=current_app.config['JPEG_BACKEND'])
+        atexit.register(video_processor.close)
     if label_storage is None:
         label_storage = LabelStorage(current_app.config['DATASETS_FOLDER'])
+    if job_runner is None:
+        job_runner = JobRunner(current_app.config['JOB_WORKERS'],
+                               per_user_limit=current_app.config['JOBS_PER_USER'],
+                               cpu_budget=current_app.config['CPU_BUDGET'],
+                               max_detached=current_app.config['PROGRESSIVE_JOBS'])
+    if filmstrip_cache is None:
+        filmstrip_cache = FilmstripCache(video_processor)
+    if frame_cache is None:
+        frame_cache = FrameByteCache(current_app.config['FRAME_CACHE_ITEMS'],
+                                     int(current_app.config['FRAME_CACHE_MB'] * 1024 * 1024))
+    if chunked_uploads is None:
+        chunked_uploads = ChunkedUploads(current_app.config['UPLOAD_FOLDER'],
+                                         current_app.config['MAX_UPLOAD_SIZE'],
+                                         current_app.config['UPLOAD_EXPIRE_HOURS'] * 3600,
+                                         on_expire=_upload_expired)
+        chunked_uploads.start_expiry()
+
+def _upload_expired(upload):
+    """Stop the progressive extraction of an upload that expired"""
+    if upload.job_id is not None:
+        job_runner.cancel(upload.job_id)
+
+def _extraction_options(values, defaults=None):
+    """
+    Parse the sampling, filtering and encoding fields of an extraction request
+    
+    Missing fields fall back to the given defaults (the extraction_params()
+    of a project being re-sampled), then to the app config. An empty
+    dedupe_distance or quality_filter turns a default filter off.
+    
+    Returns:
+        Tuple containing (interval, options, encoding) keyword arguments
+        
+    Raises:
+        ValueError: With a message for the client if a field is invalid
+    """
+    config = current_app.config
+    defaults = defaults or {}
+    interval = float(values.get('interval', defaults.get('interval') or config['DEFAULT_FRAME_INTERVAL']))
+    
+    # Validate interval
+    if interval < config['MIN_FRAME_INTERVAL'] or interval > config['MAX_FRAME_INTERVAL']:
+        raise ValueError(f'Interval must be between {config["MIN_FRAME_INTERVAL"]} and {config["MAX_FRAME_INTERVAL"]} seconds')
+    
+    # Sampling mode: fixed interval or scene changes
+    sampling = values.get('sampling', defaults.get('sampling') or 'interval')
+    options = {}
+    if sampling == 'scene':
+        options['sampling'] = sampling
+        options['scene_threshold'] = float(values.get(
+            'scene_threshold', defaults.get('scene_threshold', config['DEFAULT_SCENE_THRESHOLD'])))
+        for gap in ('min_gap', 'max_gap'):
+            value = values.get(gap, defaults.get(gap))
+            if value:
+                options[gap] = float(value)
+    elif sampling == 'count':
+        options['sampling'] = sampling
+        options['target_count'] = int(values.get('target_count', defaults.get('target_count') or 0))
+        if options['target_count'] < 1:
+            raise ValueError('target_count must be a positive number of frames')
+    elif sampling != 'interval':
+        raise ValueError(f'Unknown sampling mode: {sampling}')
+    # Optional near-duplicate suppression ('default' uses the configured distance)
+    dedupe_distance = values.get('dedupe_distance', defaults.get('dedupe_distance'))
+    if dedupe_distance not in (None, ''):
+        options['dedupe_distance'] = config['DEFAULT_DEDUPE_DISTANCE'] \
+            if dedupe_distance == 'default' else int(dedupe_distance)
+    
+    # Optional blur/exposure filtering ('drop' or 'flag' low-quality frames)
+    quality_filter = values.get('quality_filter', defaults.get('quality_filter'))
+    if quality_filter:
+        if quality_filter not in ('drop', 'flag'):
+            raise ValueError(f'Unknown quality filter: {quality_filter}')
+        options['quality_filter'] = quality_filter
+        options['min_sharpness'] = float(values.get(
+            'min_sharpness', defaults.get('min_sharpness', config['DEFAULT_MIN_SHARPNESS'])))
+    
+    # Frame file format and quality
+    image_format = values.get('image_format', defaults.get('image_format') or config['FRAME_FORMAT'])
+    if image_format not in FRAME_FORMATS:
+        raise ValueError(f'Unknown frame format: {image_format}')
+    image_quality = int(values.get('image_quality', defaults.get('image_quality') or config['FRAME_QUALITY']))
+    if image_quality < 1 or image_quality > 100:
+        raise ValueError('Image quality must be between 1 and 100')
+    encoding = {'image_format': image_format, 'image_quality': image_quality}
+    return interval, options, encoding
+
+def _is_enabled(value):
+    """Interpret a form/JSON flag"""
+    return str(value).lower() in ('1', 'true', 'on', 'yes')
+
+def _extraction_result(result):
+    """Summarise an extract_frames result for the job status endpoint"""
+    project_id, frame_paths, metadata = result
+    return {'project_id': project_id, 'frame_count': len(frame_paths)}
 
 @main_bp.route('/')
 @login_required
@@ -33,7 +151,7 @@ def index():
 @main_bp.route('/upload', methods=['GET', 'POST'])
 @login_required
 def upload_video():
-    """Upload video and extract frames"""
+    """Upload video and start a background frame extraction job"""
     if request.method == 'GET':
         return render_template('upload.html')
     
@@ -48,40 +166,563 @@ def upload_video():
         return jsonify({'error': 'Invalid file type. Allowed: ' + ', '.join(current_app.config['ALLOWED_VIDEO_EXTENSIONS'])}), 400
     
     try:
-        # Save uploaded video
-        filename = secure_filename(file.filename)
-        unique_filename = f"{uuid.uuid4().hex[:8]}_{filename}"
-        video_path = os.path.join(current_app.config['UPLOAD_FOLDER'], unique_filename)
-        file.save(video_path)
-        
-        # Get processing parameters
-        interval = float(request.form.get('interval', current_app.config['DEFAULT_FRAME_INTERVAL']))
+        # Sampling, filtering and encoding parameters
+        try:
+            interval, options, encoding = _extraction_options(request.form)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         project_name = request.form.get('project_name', '').strip()
         
-        # Validate interval
-        if interval < current_app.config['MIN_FRAME_INTERVAL'] or interval > current_app.config['MAX_FRAME_INTERVAL']:
-            return jsonify({'error': f'Interval must be between {current_app.config["MIN_FRAME_INTERVAL"]} and {current_app.config["MAX_FRAME_INTERVAL"]} seconds'}), 400
+        # Lazy projects only probe the video; frames are decoded on first view
+        lazy = _is_enabled(request.form.get('lazy', current_app.config['LAZY_EXTRACTION']))
+        if lazy and options:
+            return jsonify({'error': 'Scene sampling and frame filtering cannot be combined with on-demand extraction'}), 400
         
-        # Extract frames
-        project_id, frame_paths, metadata = video_processor.extract_frames(
-            video_path, interval, project_name
-        )
+        # Save uploaded video, hashing it as it is written
+        filename = secure_filename(file.filename)
+        unique_filename = f"{uuid.uuid4().hex[:8]}_{filename}"
+        video_path = os.path.join(current_app.config['UPLOAD_FOLDER'], unique_filename)
+        source_sha256 = save_stream(file.stream, video_path)
         
-        # Store project in session
-        session['current_project'] = project_id
-        session['current_frame'] = 0
+        job, reused_project = _submit_extraction(video_path, source_sha256, interval, project_name,
+                                                 lazy, options, encoding, description=filename)
         
         return jsonify({
             'success': True,
-            'project_id': project_id,
-            'frame_count': len(frame_paths),
-            'metadata': metadata,
-            'redirect': url_for('main.annotate', project_id=project_id)
-        })
+            'job_id': job.id,
+            'status_url': url_for('main.get_job', job_id=job.id),
+            'reused_project': reused_project
+        }), 202
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _submit_extraction(video_path, source_sha256, interval, project_name, lazy, options,
+                       encoding, description=''):
+    """
+    Start the extraction job of an uploaded video
+    
+    If a video with the same content was uploaded before, the new copy is
+    removed in favour of the stored one, and an extraction with the same
+    settings is reused by hard-linking its frames instead of decoding again.
+    
+    Returns:
+        Tuple containing (job, ID of the reused project or None)
+    """
+    reused_project = None
+    if current_app.config['REUSE_EXTRACTIONS']:
+        stored_video = video_processor.find_source_video(source_sha256)
+        if stored_video and stored_video != video_path:
+            os.remove(video_path)
+            video_path = stored_video
+        params = extraction_params(interval, lazy, **options, **encoding)
+        reused_project = video_processor.find_extraction(source_sha256, params)
+    
+    if reused_project:
+        job = job_runner.submit(
+            video_processor.clone_project, reused_project, project_name, video_path,
+            owner_id=current_user.get_id(), description=description,
+            on_complete=_extraction_result
+        )
+    elif lazy:
+        job = job_runner.submit(
+            video_processor.create_lazy_project, video_path, interval, project_name,
+            owner_id=current_user.get_id(), description=description,
+            on_complete=_extraction_result, source_sha256=source_sha256, **options, **encoding
+        )
+    else:
+        # Smaller videos are extracted first; filtered and scene-sampled
+        # extractions are never split into parallel segments
+        duration = video_processor.estimate_duration(video_path)
+        job = job_runner.submit(
+            video_processor.extract_frames, video_path, interval, project_name,
+            owner_id=current_user.get_id(), description=description,
+            on_complete=_extraction_result, duration_estimate=duration,
+            cpu_cost=video_processor.extraction_cores(duration, parallel=not options),
+            source_sha256=source_sha256, **options, **encoding
+        )
+    return job, reused_project
+
+def _submit_import(source_path, mode, interval, project_name, lazy, options, encoding):
+    """
+    Import a server-side video and start its extraction job
+    
+    A hard link made for the import is removed again if the job cannot be
+    submitted or ends without completing, since no project uses it then.
+    
+    Returns:
+        Tuple containing (job, whether the video was hard-linked)
+    """
+    video_path = import_video(source_path, current_app.config['UPLOAD_FOLDER'], mode)
+    linked = video_path != source_path
+    try:
+        job, _ = _submit_extraction(video_path, None, interval, project_name, lazy, options,
+                                    encoding, description=os.path.basename(source_path))
+    except Exception:
+        if linked:
+            os.remove(video_path)
+        raise
+    
+    def discard_link(future):
+        if job.status != JOB_COMPLETED and os.path.exists(video_path):
+            os.remove(video_path)
+    
+    if linked:
+        job.future.add_done_callback(discard_link)
+    return job, linked
+
+def _upload_status(upload):
+    """Progress of a chunked upload plus the URLs the client needs next"""
+    status = {
+        'upload_id': upload.id,
+        'filename': upload.filename,
+        'offset': upload.offset,
+        'size': upload.size,
+        'complete': upload.complete,
+        'chunk_size': current_app.config['UPLOAD_CHUNK_MB'] * 1024 * 1024,
+        'upload_url': url_for('main.upload_chunk', upload_id=upload.id),
+        'finalize_url': url_for('main.finalize_upload', upload_id=upload.id)
+    }
+    if upload.job_id is not None:
+        project_id = upload.params['project_name']
+        status.update(job_id=upload.job_id,
+                      status_url=url_for('main.get_job', job_id=upload.job_id),
+                      project_id=project_id,
+                      project_url=url_for('main.annotate', project_id=project_id))
+    return status
+
+def _get_owned_upload(upload_id):
+    """Look up a chunked upload belonging to the current user"""
+    upload = chunked_uploads.get(upload_id)
+    if upload is None or upload.owner_id != current_user.get_id():
+        return None
+    return upload
+
+@main_bp.route('/api/uploads', methods=['POST'])
+@login_required
+def create_upload():
+    """
+    Start a resumable upload
+    
+    The JSON body names the file and its size in bytes and carries the same
+    extraction settings as the upload form; they are validated here so a
+    bad setting is reported before any video data is sent.
+    
+    Unless progressive is false (or the settings need the complete video),
+    the extraction job starts right away and decodes chunks as they
+    arrive; its frames can be viewed in the project while the upload goes
+    on. Such uploads are not checked against earlier uploads for reuse.
+    """
+    values = request.get_json(silent=True) or {}
+    filename = secure_filename(values.get('filename', ''))
+    if not filename:
+        return jsonify({'error': 'No file selected'}), 400
+    if not Config.allowed_file(filename, current_app.config['ALLOWED_VIDEO_EXTENSIONS']):
+        return jsonify({'error': 'Invalid file type. Allowed: ' + ', '.join(current_app.config['ALLOWED_VIDEO_EXTENSIONS'])}), 400
+    
+    try:
+        size = int(values.get('size', 0))
+        interval, options, encoding = _extraction_options(values)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    lazy = _is_enabled(values.get('lazy', current_app.config['LAZY_EXTRACTION']))
+    if lazy and options:
+        return jsonify({'error': 'Scene sampling and frame filtering cannot be combined with on-demand extraction'}), 400
+    
+    # Lazy projects and count sampling need the whole video before they start
+    progressive = _is_enabled(values.get('progressive', current_app.config['PROGRESSIVE_EXTRACTION'])) \
+        and not lazy and options.get('sampling') != 'count'
+    project_name = str(values.get('project_name', '')).strip()
+    if progressive:
+        # Named up front so the project can be opened while it is extracted
+        project_name = project_name or f"project_{uuid.uuid4().hex[:8]}"
+    
+    params = {
+        'interval': interval,
+        'project_name': project_name,
+        'lazy': lazy,
+        'options': options,
+        'encoding': encoding,
+        'progressive': progressive
+    }
+    try:
+        upload = chunked_uploads.create(filename, size, current_user.get_id(), params)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 413 if size > 0 else 400
+    
+    if progressive:
+        # The job mostly waits on the network, so it runs detached from the
+        # scheduled jobs' limits. It gives up on an upload paused for longer
+        # than PROGRESSIVE_STALL_SECONDS so it does not hold its thread, and
+        # finalize then extracts the complete file instead
+        upload.growing = GrowingFile(upload.path,
+                                     stall_timeout=current_app.config['PROGRESSIVE_STALL_SECONDS'])
+        job = job_runner.submit(
+            video_processor.extract_frames, upload.path, interval, project_name,
+            owner_id=current_user.get_id(), description=filename,
+            on_complete=_extraction_result, growing=upload.growing,
+            detached=True, **options, **encoding
+        )
+        upload.job_id = job.id
+    return jsonify(_upload_status(upload)), 201
+
+@main_bp.route('/api/uploads/<upload_id>', methods=['GET'])
+@login_required
+def get_upload(upload_id):
+    """Get the offset to resume a chunked upload from"""
+    upload = _get_owned_upload(upload_id)
+    if upload is None:
+        return jsonify({'error': 'Upload not found'}), 404
+    return jsonify(_upload_status(upload))
+
+@main_bp.route('/api/uploads/<upload_id>', methods=['PUT'])
+@login_required
+def upload_chunk(upload_id):
+    """
+    Append a chunk to an upload
+    
+    The body is the raw bytes starting at ?offset= (or the start of a
+    Content-Range header). A chunk that does not start at the current end
+    of the upload gets a 409 with the offset to continue from.
+    """
+    upload = _get_owned_upload(upload_id)
+    if upload is None:
+        return jsonify({'error': 'Upload not found'}), 404
+    
+    offset = request.args.get('offset', type=int)
+    content_range = parse_content_range_header(request.headers.get('Content-Range'))
+    if offset is None and content_range is not None:
+        offset = content_range.start
+    if offset is None:
+        return jsonify({'error': 'Chunk offset required (?offset= or Content-Range)'}), 400
+    
+    try:
+        chunked_uploads.append(upload, offset, request.stream)
+    except UploadOffsetError as e:
+        return jsonify({'error': str(e), 'offset': e.expected}), 409
+    except ValueError as e:
+        return jsonify({'error': str(e), 'offset': upload.offset}), 400
+    return jsonify(_upload_status(upload))
+
+@main_bp.route('/api/uploads/<upload_id>/finalize', methods=['POST'])
+@login_required
+def finalize_upload(upload_id):
+    """
+    Check a complete upload (optional JSON sha256) and start its extraction job
+    
+    For progressive uploads the running job is told the video is complete
+    and returned instead, unless that job already failed or is still
+    waiting for a progressive thread.
+    """
+    upload = _get_owned_upload(upload_id)
+    if upload is None:
+        return jsonify({'error': 'Upload not found'}), 404
+    if not upload.complete:
+        return jsonify({'error': 'Upload incomplete', 'offset': upload.offset}), 409
+    
+    values = request.get_json(silent=True) or {}
+    try:
+        source_sha256 = chunked_uploads.finish(upload, values.get('sha256'))
+    except ValueError as e:
+        chunked_uploads.abort(upload)
+        return jsonify({'error': str(e)}), 422
+    
+    params = upload.params
+    job = job_runner.get(upload.job_id) if upload.job_id is not None else None
+    if job is not None and job_runner.cancel(job.id, queued_only=True):
+        # Never started: the complete file is extracted with the scheduled jobs
+        job = None
+    if job is not None and (job.status not in FINISHED_STATES or job.status == JOB_COMPLETED):
+        # Extraction has been running since the upload started
+        reused_project = None
+    else:
+        # Not progressive, or the progressive job gave up (stalled upload,
+        # cancelled, forgotten or never started): extract the complete file now
+        job, reused_project = _submit_extraction(upload.path, source_sha256, params['interval'],
+                                                 params['project_name'], params['lazy'],
+                                                 params['options'], params['encoding'],
+                                                 description=upload.filename)
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status_url': url_for('main.get_job', job_id=job.id),
+        'reused_project': reused_project,
+        'sha256': source_sha256
+    }), 202
+
+@main_bp.route('/api/uploads/<upload_id>', methods=['DELETE'])
+@login_required
+def abort_upload(upload_id):
+    """Abandon a chunked upload and delete the received bytes"""
+    upload = _get_owned_upload(upload_id)
+    if upload is None:
+        return jsonify({'error': 'Upload not found'}), 404
+    chunked_uploads.abort(upload)
+    return jsonify({'success': True})
+
+@main_bp.route('/api/import', methods=['POST'])
+@login_required
+def import_server_video():
+    """
+    Start extracting a video that is already on the server
+    
+    The JSON body gives the absolute path of a video inside one of the
+    IMPORT_ROOTS folders, an optional mode ('link' or 'reference') and the
+    same extraction settings as the upload form. The video is hard-linked
+    or referenced instead of copied, and it is not hashed for duplicate
+    reuse since that would cost another full read of the file.
+    """
+    values = request.get_json(silent=True) or {}
+    roots = current_app.config['IMPORT_ROOTS']
+    if not roots:
+        return jsonify({'error': 'Server-side import is disabled (IMPORT_ROOTS is not set)'}), 403
+    
+    try:
+        source_path = resolve_import_path(str(values.get('path', '')), roots)
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 403
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    if not Config.allowed_file(source_path, current_app.config['ALLOWED_VIDEO_EXTENSIONS']):
+        return jsonify({'error': 'Invalid file type. Allowed: ' + ', '.join(current_app.config['ALLOWED_VIDEO_EXTENSIONS'])}), 400
+    
+    mode = values.get('mode', current_app.config['IMPORT_MODE'])
+    if mode not in IMPORT_MODES:
+        return jsonify({'error': f'Unknown import mode: {mode}'}), 400
+    try:
+        interval, options, encoding = _extraction_options(values)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    lazy = _is_enabled(values.get('lazy', current_app.config['LAZY_EXTRACTION']))
+    if lazy and options:
+        return jsonify({'error': 'Scene sampling and frame filtering cannot be combined with on-demand extraction'}), 400
+    
+    job, linked = _submit_import(source_path, mode, interval,
+                                 str(values.get('project_name', '')).strip(), lazy, options,
+                                 encoding)
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status_url': url_for('main.get_job', job_id=job.id),
+        'linked': linked
+    }), 202
+
+def _folder_files(directory, recursive):
+    """Yield the files of a folder in name order, sub-folders after their parent"""
+    if not recursive:
+        for name in sorted(os.listdir(directory)):
+            yield os.path.join(directory, name)
+        return
+    for folder, subfolders, names in os.walk(directory):
+        subfolders.sort()
+        for name in sorted(names):
+            yield os.path.join(folder, name)
+
+def _batch_videos(values, roots, max_files):
+    """
+    Resolve the videos named by a batch request
+    
+    The scan stops as soon as more than max_files videos are found, so an
+    oversized batch is refused without listing the whole folder tree.
+    
+    Returns:
+        Tuple containing (resolved video paths, [{'path', 'error'}] of rejected entries)
+        
+    Raises:
+        PermissionError: If the directory is outside the import roots
+        FileNotFoundError: If the directory does not exist
+        ValueError: If neither paths nor a directory were given
+    """
+    paths = values.get('paths') or []
+    if isinstance(paths, str):
+        paths = [paths]
+    directory = values.get('directory')
+    if not paths and not directory:
+        raise ValueError('No videos given (paths or directory)')
+    
+    candidates = [str(path) for path in paths]
+    if directory:
+        directory = resolve_import_folder(str(directory), roots)
+        candidates = itertools.chain(
+            candidates, _folder_files(directory, _is_enabled(values.get('recursive', False))))
+    
+    extensions = current_app.config['ALLOWED_VIDEO_EXTENSIONS']
+    videos, errors = [], []
+    for path in candidates:
+        if len(videos) > max_files:
+            break
+        if directory and not Config.allowed_file(path, extensions):
+            continue  # Other files in a scanned folder are skipped silently
+        try:
+            resolved = resolve_import_path(path, roots)
+        except (PermissionError, FileNotFoundError) as e:
+            errors.append({'path': path, 'error': str(e)})
+            continue
+        if not Config.allowed_file(resolved, extensions):
+            errors.append({'path': path, 'error': 'Invalid file type'})
+        elif resolved not in videos:
+            videos.append(resolved)
+    return videos, errors
+
+@main_bp.route('/api/batch', methods=['POST'])
+@login_required
+def batch_import():
+    """
+    Queue the extraction of many server-side videos in one request
+    
+    The JSON body lists absolute video paths (paths) and/or a folder to
+    scan (directory, plus recursive), all inside the IMPORT_ROOTS folders,
+    with the mode and extraction settings of /api/import applied to every
+    video. Each video gets its own job on the shared job runner, which
+    starts the shortest videos first within the per-user and CPU limits.
+    Videos that cannot be imported are reported in errors; the others are
+    queued regardless.
+    """
+    values = request.get_json(silent=True) or {}
+    roots = current_app.config['IMPORT_ROOTS']
+    if not roots:
+        return jsonify({'error': 'Server-side import is disabled (IMPORT_ROOTS is not set)'}), 403
+    
+    mode = values.get('mode', current_app.config['IMPORT_MODE'])
+    if mode not in IMPORT_MODES:
+        return jsonify({'error': f'Unknown import mode: {mode}'}), 400
+    try:
+        interval, options, encoding = _extraction_options(values)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    lazy = _is_enabled(values.get('lazy', current_app.config['LAZY_EXTRACTION']))
+    if lazy and options:
+        return jsonify({'error': 'Scene sampling and frame filtering cannot be combined with on-demand extraction'}), 400
+    
+    max_files = current_app.config['MAX_BATCH_FILES']
+    try:
+        videos, errors = _batch_videos(values, roots, max_files)
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 403
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if len(videos) > max_files:
+        return jsonify({'error': f'Batch has more than {max_files} videos'}), 413
+    
+    jobs = []
+    for source_path in videos:
+        job, _ = _submit_import(source_path, mode, interval, '', lazy, options, encoding)
+        jobs.append({
+            'path': source_path,
+            'job_id': job.id,
+            'status_url': url_for('main.get_job', job_id=job.id)
+        })
+    if not jobs:
+        return jsonify({'error': 'No videos to import', 'errors': errors}), 400
+    return jsonify({'success': True, 'jobs': jobs, 'errors': errors}), 202
+
+@main_bp.route('/api/jobs', methods=['GET'])
+@login_required
+def list_jobs():
+    """List the current user's jobs, queued ones with their place in the queue"""
+    jobs = []
+    for job in job_runner.list_jobs(current_user.get_id()):
+        status = job.to_dict()
+        status['queue_position'] = job_runner.queue_position(job.id)
+        jobs.append(status)
+    return jsonify({'jobs': jobs})
+
+def _get_owned_job(job_id):
+    """Look up a job belonging to the current user"""
+    job = job_runner.get(job_id)
+    if job is None or job.owner_id != current_user.get_id():
+        return None
+    return job
+
+@main_bp.route('/api/jobs/<job_id>', methods=['GET'])
+@login_required
+def get_job(job_id):
+    """Get progress of a background extraction job"""
+    job = _get_owned_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    status = job.to_dict()
+    status['queue_position'] = job_runner.queue_position(job_id)
+    if job.status == JOB_COMPLETED and job.result:
+        project_id = job.result['project_id']
+        status['redirect'] = url_for('main.annotate', project_id=project_id)
+        
+        # Store project in session
+        if session.get('current_project') != project_id:
+            session['current_project'] = project_id
+            session['current_frame'] = 0
+    
+    return jsonify(status)
+
+@main_bp.route('/api/jobs/<job_id>', methods=['DELETE'])
+@login_required
+def cancel_job(job_id):
+    """Cancel a queued or running extraction job"""
+    job = _get_owned_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    if not job_runner.cancel(job_id):
+        return jsonify({'error': f'Job already {job.status}'}), 409
+    
+    return jsonify({'success': True, 'job_id': job_id, 'status': job.status})
+
+def _resample_project(project_id, interval, progress_callback=None, **kwargs):
+    """Job target: re-sample a project and move its annotations to the new frames"""
+    previous = video_processor.get_frame_index(project_id)
+    project_id, frame_paths, metadata = video_processor.resample_project(
+        project_id, interval, progress_callback=progress_callback, **kwargs)
+    current = video_processor.get_frame_index(project_id)
+    
+    # Annotations follow their source timestamp (within half a source frame)
+    remapped = label_storage.remap_frames(project_id, previous['timestamp'], current['timestamp'],
+                                          frame_paths, tolerance=0.5 / metadata['fps'])
+    return {'project_id': project_id, 'frame_count': len(frame_paths),
+            'revision': metadata['revision'], 'annotated_frames': remapped}
+
+@main_bp.route('/api/project/<project_id>/resample', methods=['POST'])
+@login_required
+def resample_project(project_id):
+    """Re-sample an existing project from its stored video in a background job"""
+    try:
+        metadata = video_processor.get_project_metadata(project_id)
+    except FileNotFoundError:
+        return jsonify({'error': 'Project not found'}), 404
+    if not os.path.exists(metadata['video_path']):
+        return jsonify({'error': 'Source video of the project is no longer available'}), 409
+    
+    # Unspecified settings default to the project's current ones (projects
+    # written before extraction_params only record these few)
+    values = request.get_json(silent=True) or request.form
+    encoding = metadata.get('encoding', {})
+    defaults = {'interval': metadata.get('interval'), 'sampling': metadata.get('sampling'),
+                'image_format': encoding.get('format'), 'image_quality': encoding.get('quality')}
+    defaults.update(metadata.get('extraction_params', {}))
+    try:
+        interval, options, encoding = _extraction_options(values, defaults)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    lazy = _is_enabled(values.get('lazy', metadata.get('lazy', False)))
+    if lazy and options:
+        return jsonify({'error': 'Scene sampling and frame filtering cannot be combined with on-demand extraction'}), 400
+    
+    duration = 0.0 if lazy else metadata.get('duration', 0.0)
+    job = job_runner.submit(
+        _resample_project, project_id, interval,
+        owner_id=current_user.get_id(), description=f"Re-sample {metadata['video_name']}",
+        duration_estimate=duration,
+        cpu_cost=1 if lazy else video_processor.extraction_cores(duration, parallel=not options),
+        lazy=lazy, **options, **encoding
+    )
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status_url': url_for('main.get_job', job_id=job.id)
+    }), 202
+
 @main_bp.route('/project/<project_id>')
 def load_project(project_id):
     """Load existing project"""
@@ -107,17 +748,96 @@ def annotate(project_id):
         return render_template('annotate.html', 
                              project_id=project_id,
                              metadata=metadata,
+                             frame_version=frame_version(metadata),
                              current_frame=current_frame,
                              annotations=annotations.get('annotations', []))
     except FileNotFoundError:
         return render_template('error.html', error='Project not found'), 404
 
+def _send_frame(frame_path, mimetype=None):
+    """
+    Serve an extracted image with validators and long-lived cache headers
+    
+    Frame files never change once written (every extraction of a project,
+    including a re-sample, changes the ?v= frame_version() in frame URLs), so
+    the strong ETag is derived
+    from the file's path, size and mtime; matching conditional requests
+    get a 304 without the file being opened. Bodies of recently served
+    files come from the in-memory frame cache, keyed by the same path, size
+    and mtime so a rewritten file is never served stale.
+    """
+    stat = os.stat(frame_path)
+    cache_key = (frame_path, stat.st_size, stat.st_mtime_ns)
+    path_digest = hashlib.blake2b(frame_path.encode(), digest_size=8).hexdigest()
+    etag = f"{path_digest}-{stat.st_size:x}-{stat.st_mtime_ns:x}"
+    max_age = current_app.config['FRAME_CACHE_MAX_AGE']
+    
+    not_modified = request.if_none_match.contains(etag) if request.if_none_match else (
+        request.if_modified_since is not None and
+        int(stat.st_mtime) <= request.if_modified_since.timestamp()
+    )
+    if not_modified:
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        response.last_modified = stat.st_mtime
+    else:
+        data = frame_cache.get(cache_key)
+        if data is None:
+            with open(frame_path, 'rb') as f:
+                data = f.read()
+            frame_cache.put(cache_key, data)
+        response = current_app.response_class(data, mimetype=mimetype or mimetype_for_path(frame_path))
+        response.set_etag(etag)
+        response.last_modified = stat.st_mtime
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    response.cache_control.immutable = True
+    return response
+
+@main_bp.route('/api/frame-cache/stats')
+@login_required
+def get_frame_cache_stats():
+    """Hit/miss counters of the in-memory frame cache"""
+    return jsonify(frame_cache.stats())
+
 @main_bp.route('/api/frame/<project_id>/<int:frame_index>')
 def get_frame(project_id, frame_index):
-    """Get specific frame image"""
+    """Get specific frame image (?size=thumb|preview|full; ?v= frame version is ignored)"""
+    size = request.args.get('size', 'full')
+    if size != 'full' and size not in VideoProcessor.FRAME_VARIANTS:
+        return jsonify({'error': f'Unknown frame size: {size}'}), 400
     try:
-        frame_path = video_processor.get_frame_path(project_id, frame_index)
-        return send_file(frame_path, mimetype='image/jpeg')
+        frame_path = video_processor.materialize_frame(project_id, frame_index, size)
+        return _send_frame(frame_path)
+    except (FileNotFoundError, IndexError) as e:
+        return jsonify({'error': str(e)}), 404
+
+def _filmstrip_range():
+    """Parse ?start=&count= for the filmstrip endpoints"""
+    return request.args.get('start', 0, type=int), request.args.get('count', 100, type=int)
+
+@main_bp.route('/api/filmstrip/<project_id>')
+def get_filmstrip(project_id):
+    """Get the offset map of a filmstrip sprite (?start=0&count=100)"""
+    start, count = _filmstrip_range()
+    try:
+        sprite_path, offset_map = filmstrip_cache.get(project_id, start, count)
+    except (FileNotFoundError, IndexError) as e:
+        return jsonify({'error': str(e)}), 404
+    # Sprites are served as immutable; the version changes with every extraction
+    version = frame_version(video_processor.get_project_metadata(project_id))
+    offset_map['sprite_url'] = url_for('main.get_filmstrip_sprite', project_id=project_id,
+                                       start=offset_map['start'], count=offset_map['count'],
+                                       v=version)
+    return jsonify(offset_map)
+
+@main_bp.route('/api/filmstrip/<project_id>/sprite')
+def get_filmstrip_sprite(project_id):
+    """Get a filmstrip sprite image (?start=0&count=100)"""
+    start, count = _filmstrip_range()
+    try:
+        sprite_path, offset_map = filmstrip_cache.get(project_id, start, count)
+        return _send_frame(sprite_path, mimetype='image/jpeg')
     except (FileNotFoundError, IndexError) as e:
         return jsonify({'error': str(e)}), 404
 
@@ -220,6 +940,13 @@ def export_dataset(project_id, format_type):
         if format_type not in current_app.config['EXPORT_FORMATS']:
             return jsonify({'error': 'Invalid export format'}), 400
         
+        # Lazy projects only have the frames that were viewed on disk
+        metadata = video_processor.get_project_metadata(project_id)
+        if metadata.get('lazy'):
+            annotations = label_storage.get_annotations(project_id)
+            for frame_key in annotations.get('frames', {}):
+                video_processor.materialize_frame(project_id, int(frame_key))
+        
         export_path = label_storage.export_dataset(project_id, format_type)
         
         # Create ZIP file of export
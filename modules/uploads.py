@@ -0,0 +1,375 @@
+"""
+Storage of uploaded videos
+Uploads are hashed while they are written so duplicate content can be recognised,
+large files can be sent as resumable series of chunks, and videos already on the
+server can be imported from allow-listed folders without being copied
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional
+
+# Bytes read from an upload stream per write
+CHUNK_SIZE = 1024 * 1024
+
+# How an imported server-side video is registered: hard-linked into the
+# upload folder (falling back to a reference on another file system) or
+# used from where it is
+IMPORT_LINK = 'link'
+IMPORT_REFERENCE = 'reference'
+IMPORT_MODES = (IMPORT_LINK, IMPORT_REFERENCE)
+
+
+def save_stream(stream: BinaryIO, path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Write a stream to path and return the SHA-256 of its content
+
+    The digest is updated chunk by chunk as the file is written, so the
+    upload is never read back from disk to be hashed.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'wb') as f:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+
+def file_sha256(path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """SHA-256 of a file already on disk"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def resolve_import_path(path: str, roots: Optional[Iterable[str]]) -> str:
+    """
+    Resolve a server-side video path and check that it may be imported
+
+    Symbolic links and '..' are resolved before the check, so a path can
+    only name a file that really lies inside one of the roots.
+
+    Args:
+        path: Absolute path of the video on the server
+        roots: Folders imports are allowed from (None allows any path)
+
+    Raises:
+        PermissionError: If the path is outside every root (or none is configured)
+        FileNotFoundError: If the path is not an existing file
+    """
+    resolved = _resolve_in_roots(path, roots)
+    if not os.path.isfile(resolved):
+        raise FileNotFoundError(f"Video file not found: {path}")
+    return resolved
+
+
+def resolve_import_folder(path: str, roots: Optional[Iterable[str]]) -> str:
+    """
+    Resolve a server-side folder of videos and check that it may be imported
+
+    Raises:
+        PermissionError: If the folder is outside every root
+        FileNotFoundError: If the path is not an existing folder
+    """
+    resolved = _resolve_in_roots(path, roots)
+    if not os.path.isdir(resolved):
+        raise FileNotFoundError(f"Folder not found: {path}")
+    return resolved
+
+
+def _resolve_in_roots(path: str, roots: Optional[Iterable[str]]) -> str:
+    """Real path of an absolute path that must lie inside one of the roots"""
+    if not path or not os.path.isabs(path):
+        raise PermissionError(f"Import path must be absolute: {path}")
+    resolved = os.path.realpath(path)
+    if roots is not None:
+        allowed = [os.path.realpath(root) for root in roots if root]
+        if not any(os.path.commonpath([resolved, root]) == root for root in allowed):
+            raise PermissionError(f"Import path is outside the allowed folders: {path}")
+    return resolved
+
+
+def import_video(path: str, upload_folder: str, mode: str = IMPORT_LINK) -> str:
+    """
+    Register a server-side video for extraction without copying it
+
+    Hard links keep the video available to its project if the original is
+    moved or deleted; they only work within one file system, so a video on
+    another volume is referenced in place instead.
+
+    Args:
+        path: Resolved path from resolve_import_path()
+        upload_folder: Folder uploaded videos are stored in
+        mode: IMPORT_LINK or IMPORT_REFERENCE
+
+    Returns:
+        Path of the video the project should use
+    """
+    if mode not in IMPORT_MODES:
+        raise ValueError(f"Unknown import mode: {mode}")
+    if mode == IMPORT_LINK:
+        linked_path = os.path.join(upload_folder, f"{uuid.uuid4().hex[:8]}_{os.path.basename(path)}")
+        try:
+            os.makedirs(upload_folder, exist_ok=True)
+            os.link(path, linked_path)
+            return linked_path
+        except OSError:
+            pass
+    return path
+
+
+class UploadOffsetError(ValueError):
+    """Raised when a chunk does not start where the upload currently ends"""
+
+    def __init__(self, expected: int, received: int):
+        super().__init__(f"Chunk starts at byte {received}, upload is at byte {expected}")
+        self.expected = expected
+
+
+class UploadSession:
+    """State of one resumable upload"""
+
+    def __init__(self, upload_id: str, filename: str, path: str, size: int,
+                 owner_id: str = None, params: Dict = None, created_at: float = None):
+        self.id = upload_id
+        self.filename = filename
+        self.path = path
+        self.size = size
+        self.owner_id = owner_id
+        self.params = params or {}
+        self.created_at = created_at or time.time()
+        self.offset = 0
+        self.lock = threading.Lock()
+        # Extraction started while the upload is still being received
+        self.growing = None  # GrowingFile told about every chunk written
+        self.job_id = None
+        self._digest = None
+
+    @property
+    def complete(self) -> bool:
+        return self.offset >= self.size
+
+    def to_dict(self) -> Dict:
+        """Record saved next to the partial file (the offset is the file's size)"""
+        return {
+            'upload_id': self.id,
+            'filename': self.filename,
+            'path': self.path,
+            'size': self.size,
+            'owner_id': self.owner_id,
+            'params': self.params,
+            'created_at': self.created_at
+        }
+
+
+class ChunkedUploads:
+    """
+    Class to handle resumable uploads sent as a series of byte-offset chunks
+
+    Chunks are appended straight to the final video file while a SHA-256
+    digest is updated, so finishing an upload neither copies nor re-reads
+    it. Session records live in a folder under the upload folder, and the
+    partial file's size is the resume offset, so uploads survive restarts
+    (the digest is then rebuilt from the partial file once).
+    """
+
+    SESSIONS_FOLDER = '.sessions'
+    # Seconds between expiry sweeps once start_expiry() was called
+    EXPIRE_CHECK_SECONDS = 600.0
+
+    def __init__(self, upload_folder: str, max_size: int, expire_seconds: float = 24 * 3600,
+                 on_expire: Optional[Callable[[UploadSession], None]] = None):
+        self.upload_folder = upload_folder
+        self.max_size = max_size
+        self.expire_seconds = expire_seconds
+        # Called with every upload expire() is about to abort (e.g. to stop its extraction)
+        self.on_expire = on_expire
+        self._sessions: Dict[str, UploadSession] = {}
+        self._lock = threading.Lock()
+        self._stop_expiry = threading.Event()
+
+    def create(self, filename: str, size: int, owner_id: str = None,
+               params: Dict = None) -> UploadSession:
+        """
+        Start an upload of size bytes
+
+        Args:
+            filename: Sanitised client filename (kept as the file name suffix)
+            size: Total size announced by the client
+            owner_id: User starting the upload
+            params: Extraction settings to use once the upload is finished
+
+        Raises:
+            ValueError: If size is not positive or larger than max_size
+        """
+        if size <= 0 or size > self.max_size:
+            raise ValueError(f"Upload size must be between 1 and {self.max_size} bytes")
+        self.expire()
+
+        upload_id = uuid.uuid4().hex
+        path = os.path.join(self.upload_folder, f"{upload_id[:8]}_{filename}")
+        session = UploadSession(upload_id, filename, path, size, owner_id, params)
+        session._digest = hashlib.sha256()
+        os.makedirs(self._sessions_folder(), exist_ok=True)
+        open(path, 'wb').close()
+        with open(self._record_path(upload_id), 'w') as f:
+            json.dump(session.to_dict(), f)
+        with self._lock:
+            self._sessions[upload_id] = session
+        return session
+
+    def get(self, upload_id: str) -> Optional[UploadSession]:
+        """Look up an upload, reloading its record after a restart"""
+        with self._lock:
+            session = self._sessions.get(upload_id)
+            if session is not None:
+                return session
+            record_path = self._record_path(upload_id)
+            if not upload_id.isalnum() or not os.path.exists(record_path):
+                return None
+            with open(record_path, 'r') as f:
+                record = json.load(f)
+            if not os.path.exists(record['path']):
+                return None
+            session = UploadSession(record['upload_id'], record['filename'], record['path'],
+                                    record['size'], record.get('owner_id'),
+                                    record.get('params'), record.get('created_at'))
+            session.offset = os.path.getsize(session.path)
+            self._sessions[upload_id] = session
+            return session
+
+    def append(self, session: UploadSession, offset: int, stream: BinaryIO,
+               chunk_size: int = CHUNK_SIZE) -> int:
+        """
+        Append a request body to the upload
+
+        Bytes are committed as they are written, so a chunk cut off by a
+        dropped connection still advances the offset and the client resumes
+        from wherever it got to.
+
+        Returns:
+            The new offset
+
+        Raises:
+            UploadOffsetError: If offset is not the current end of the upload
+            ValueError: If the chunk would exceed the announced size
+        """
+        # A second request for the same range waits and then gets the new offset
+        with session.lock:
+            if offset != session.offset:
+                raise UploadOffsetError(session.offset, offset)
+            if session._digest is None:
+                session._digest = _digest_of(session.path, session.offset)
+            with open(session.path, 'r+b') as f:
+                f.seek(session.offset)
+                f.truncate()
+                while True:
+                    chunk = stream.read(chunk_size)
+                    if not chunk:
+                        break
+                    if session.offset + len(chunk) > session.size:
+                        raise ValueError(f"Upload is larger than the announced {session.size} bytes")
+                    f.write(chunk)
+                    session._digest.update(chunk)
+                    session.offset += len(chunk)
+                    if session.growing is not None:
+                        f.flush()
+                        session.growing.grew(session.offset)
+            return session.offset
+
+    def finish(self, session: UploadSession, sha256: str = None) -> str:
+        """
+        Close a complete upload and return its SHA-256
+
+        Raises:
+            ValueError: If bytes are missing or the client's checksum differs
+        """
+        with session.lock:
+            if not session.complete:
+                raise ValueError(f"Upload incomplete: {session.offset} of {session.size} bytes received")
+            if session._digest is None:
+                session._digest = _digest_of(session.path, session.offset)
+            digest = session._digest.hexdigest()
+            if sha256 and sha256.lower() != digest:
+                raise ValueError("Checksum mismatch: the uploaded file is corrupt")
+            self._forget(session.id)
+            if session.growing is not None:
+                session.growing.finish(digest)
+            return digest
+
+    def abort(self, session: UploadSession):
+        """Drop an upload and its partial file"""
+        self._forget(session.id)
+        if session.growing is not None:
+            session.growing.abort()
+        if os.path.exists(session.path):
+            os.remove(session.path)
+
+    def expire(self) -> List[UploadSession]:
+        """Abort uploads that were started more than expire_seconds ago and return them"""
+        folder = self._sessions_folder()
+        if not os.path.isdir(folder):
+            return []
+        cutoff = time.time() - self.expire_seconds
+        expired = []
+        for name in os.listdir(folder):
+            session = self.get(os.path.splitext(name)[0])
+            if session is not None and session.created_at < cutoff and not session.lock.locked():
+                if self.on_expire is not None:
+                    self.on_expire(session)
+                self.abort(session)
+                expired.append(session)
+        return expired
+
+    def start_expiry(self, interval: float = None):
+        """Run expire() every interval seconds (default: EXPIRE_CHECK_SECONDS) on a daemon thread"""
+        interval = interval or self.EXPIRE_CHECK_SECONDS
+        threading.Thread(target=self._expire_every, args=(interval,),
+                         name='upload-expiry', daemon=True).start()
+
+    def stop_expiry(self):
+        """Stop the expiry thread started by start_expiry()"""
+        self._stop_expiry.set()
+
+    def _expire_every(self, interval: float):
+        while not self._stop_expiry.wait(interval):
+            try:
+                self.expire()
+            except Exception as e:
+                print(f"Error expiring uploads: {e}")
+
+    def _forget(self, upload_id: str):
+        with self._lock:
+            self._sessions.pop(upload_id, None)
+        record_path = self._record_path(upload_id)
+        if os.path.exists(record_path):
+            os.remove(record_path)
+
+    def _sessions_folder(self) -> str:
+        return os.path.join(self.upload_folder, self.SESSIONS_FOLDER)
+
+    def _record_path(self, upload_id: str) -> str:
+        return os.path.join(self._sessions_folder(), f"{upload_id}.json")
+
+
+def _digest_of(path: str, length: int):
+    """SHA-256 object fed with the first length bytes of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest
@@ -1,18 +1,162 @@
 import cv2
+import numpy as np
 import os
+import math
 import uuid
-from typing import List, Tuple
+import shutil
+import queue
+import threading
+import time
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 import json
 from datetime import datetime
 
+from .capture_pool import CapturePool
+from .frame_encoder import FrameEncoder, FORMAT_JPEG, FORMAT_PNG, BACKEND_OPENCV, DEFAULT_QUALITY
+from .manifest import (compact_metadata, frame_filename, load_frame_index, save_frame_index,
+                       FRAME_INDEX_FILENAME)
+from .frame_hash import dhash, hamming_distances, save_hash_index, load_hash_index
+from .growing_capture import GrowingCapture, GrowingFile, SourceAborted
+
+# Frame sampling strategies
+STRATEGY_AUTO = 'auto'
+STRATEGY_GRAB = 'grab'
+STRATEGY_SEEK = 'seek'
+SAMPLING_STRATEGIES = (STRATEGY_AUTO, STRATEGY_GRAB, STRATEGY_SEEK)
+
+# Frame sampling modes
+SAMPLING_INTERVAL = 'interval'
+SAMPLING_SCENE = 'scene'
+SAMPLING_COUNT = 'count'
+SAMPLING_MODES = (SAMPLING_INTERVAL, SAMPLING_SCENE, SAMPLING_COUNT)
+
+# What to do with blurry or badly exposed frames
+QUALITY_DROP = 'drop'
+QUALITY_FLAG = 'flag'
+QUALITY_ACTIONS = (QUALITY_DROP, QUALITY_FLAG)
+
+# progress_callback(frames_decoded, frames_written, total_frames)
+ProgressCallback = Callable[[int, int, int], None]
+
+
+class ExtractionCancelled(Exception):
+    """Raised from a progress callback to abort a running extraction"""
+
+
+def extraction_params(interval: float = 1.0, lazy: bool = False,
+                      sampling: str = SAMPLING_INTERVAL, scene_threshold: float = 0.15,
+                      min_gap: float = None, max_gap: float = None,
+                      dedupe_distance: int = None, quality_filter: str = None,
+                      min_sharpness: float = 100.0, target_count: int = None,
+                      image_format: str = FORMAT_JPEG, image_quality: int = None) -> dict:
+    """
+    Settings that determine which frames an extraction writes, and how
+    
+    Settings that have no effect (the interval in count mode, the scene
+    threshold in interval mode, ...) are left out, so two extractions with
+    equal params produce the same frames from the same video.
+    """
+    params = {'sampling': sampling, 'lazy': bool(lazy), 'image_format': image_format}
+    if sampling == SAMPLING_SCENE:
+        params.update(scene_threshold=scene_threshold, min_gap=min_gap, max_gap=max_gap)
+    elif sampling == SAMPLING_COUNT:
+        params['target_count'] = target_count
+    else:
+        params['interval'] = interval
+    if dedupe_distance is not None:
+        params['dedupe_distance'] = dedupe_distance
+    if quality_filter is not None:
+        params.update(quality_filter=quality_filter, min_sharpness=min_sharpness)
+    if image_format != FORMAT_PNG:
+        params['image_quality'] = DEFAULT_QUALITY if image_quality is None else int(image_quality)
+    return params
+
+
+def frame_version(metadata: dict) -> str:
+    """
+    Token for the ?v= parameter of frame and sprite URLs, which are cached as immutable
+    
+    Every extraction, re-sample and clone writes a new extraction_id, so a
+    project ID that is reused for other frames gets new URLs. Projects
+    written before extraction IDs fall back to their revision.
+    """
+    return metadata.get('extraction_id') or str(metadata.get('revision', 0))
+
+
 class VideoProcessor:
     """Class to handle video processing and frame extraction"""
     
-    def __init__(self, frames_folder: str):
+    # Packets inspected when probing the keyframe spacing of a video
+    KEYFRAME_PROBE_PACKETS = 600
+    # Fixed cost of a seek (demuxer seek + decoder flush), in decoded frames
+    SEEK_OVERHEAD_FRAMES = 4
+    # Scene detection: frames analysed per second and analysis image width
+    SCENE_ANALYSIS_FPS = 10.0
+    SCENE_SIGNATURE_WIDTH = 64
+    SCENE_HISTOGRAM_BINS = 32
+    # Near-duplicate suppression compares against this many recently kept frames
+    DEDUPE_WINDOW = 16
+    # Quality scoring: analysis image width, exposure limits on the mean
+    # brightness (0-255) and largest share of crushed/blown-out pixels
+    QUALITY_ANALYSIS_WIDTH = 320
+    MIN_BRIGHTNESS = 25.0
+    MAX_BRIGHTNESS = 230.0
+    MAX_CLIPPED_RATIO = 0.5
+    # Downscaled copies written alongside every frame: size name -> long edge (px)
+    FRAME_VARIANTS = {'thumb': 256, 'preview': 1280}
+    # Parsed metadata.json files kept in memory (least recently used dropped)
+    METADATA_CACHE_SIZE = 32
+    # Extraction during upload: seconds between metadata.json updates listing
+    # the frames written so far, and how long an upload may send nothing
+    # (unless its GrowingFile sets its own limit)
+    PUBLISH_INTERVAL = 1.0
+    UPLOAD_STALL_SECONDS = 600.0
+    # Seconds between cancellation checks while segments run in other processes
+    SEGMENT_POLL_INTERVAL = 0.5
+    # Bitrate assumed when scheduling a video by its file size (8 Mbit/s)
+    ESTIMATE_BYTES_PER_SECOND = 1_000_000
+    
+    def __init__(self, frames_folder: str, workers: int = 1,
+                 min_segment_seconds: float = 30.0, encoder_threads: int = 1,
+                 pipeline_buffer_mb: float = 256.0, capture_pool_size: int = 8,
+                 capture_idle_seconds: float = 60.0, jpeg_backend: str = BACKEND_OPENCV):
         self.frames_folder = frames_folder
+        self.workers = max(1, workers)
+        self.min_segment_seconds = min_segment_seconds
+        self.encoder_threads = max(1, encoder_threads)
+        self.pipeline_buffer_mb = pipeline_buffer_mb
+        # Open captures reused for random-access decoding (lazy frames etc.)
+        self.capture_pool = CapturePool(capture_pool_size, capture_idle_seconds)
+        # JPEG encoder used by new projects ('opencv', 'turbojpeg' or 'auto')
+        self.jpeg_backend = jpeg_backend
+        # project_id -> (mtime_ns, size, metadata); revalidated with one stat()
+        self._metadata_cache: 'OrderedDict[str, Tuple[int, int, dict]]' = OrderedDict()
+        self._metadata_lock = threading.Lock()
+        # source_sha256 -> project IDs, built by one scan on the first lookup
+        # and then kept up to date as projects are created and deleted
+        self._source_index: Optional[Dict[str, set]] = None
+        # Projects with a re-sampling run in progress
+        self._resampling = set()
         
     def extract_frames(self, video_path: str, interval: float = 1.0, 
-                      project_name: str = None) -> Tuple[str, List[str], dict]:
+                      project_name: str = None,
+                      strategy: str = STRATEGY_AUTO,
+                      progress_callback: Optional[ProgressCallback] = None,
+                      sampling: str = SAMPLING_INTERVAL,
+                      scene_threshold: float = 0.15,
+                      min_gap: float = None,
+                      max_gap: float = None,
+                      dedupe_distance: int = None,
+                      quality_filter: str = None,
+                      min_sharpness: float = 100.0,
+                      target_count: int = None,
+                      image_format: str = FORMAT_JPEG,
+                      image_quality: int = None,
+                      source_sha256: str = None,
+                      growing: Optional[GrowingFile] = None) -> Tuple[str, List[str], dict]:
         """
         Extract frames from video at specified intervals
         
@@ -20,53 +164,184 @@ class VideoProcessor:
             video_path: Path to the video file
             interval: Time interval between frames in seconds
             project_name: Name for the project/session
+            strategy: Frame sampling strategy ('auto', 'grab' or 'seek')
+            progress_callback: Called as frames are written with
+                (frames_decoded, frames_written, total_frames); raising
+                ExtractionCancelled from it aborts and removes the project
+            sampling: 'interval' for fixed-interval sampling, 'scene' to keep
+                a frame only when the content changes, 'count' for
+                target_count evenly spaced frames (interval is ignored by
+                both)
+            scene_threshold: Change score (0-1) that starts a new scene
+            min_gap: Scene mode: minimum seconds between kept frames
+            max_gap: Scene mode: keep a frame at least this often (seconds)
+            dedupe_distance: Skip frames whose perceptual hash is within this
+                Hamming distance of a recently kept frame (None disables);
+                the hashes are saved as frame_hashes.npy
+            quality_filter: 'drop' to skip blurry or badly exposed frames,
+                'flag' to keep them but list them in the metadata (None
+                disables quality scoring)
+            min_sharpness: Laplacian variance below which a frame is blurry
+            target_count: Count mode: number of frames to extract
+            image_format: Frame file format ('jpeg', 'webp' or 'png')
+            image_quality: JPEG/WebP quality (1-100, default 95)
+            source_sha256: Content hash of the video, recorded so later
+                uploads of the same file can reuse this extraction
+            growing: Upload progress of a video that is still being written;
+                decoding waits for more data instead of stopping at the end
+                of the partial file, and metadata.json is updated as frames
+                are written so they can be viewed before extraction ends
+                (count sampling needs the complete video)
             
         Returns:
             Tuple containing (project_id, frame_paths, metadata)
         """
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"Video file not found: {video_path}")
+        
+        if not interval > 0 or math.isinf(interval):
+            raise ValueError(f"Interval must be a positive number of seconds: {interval}")
+        
+        if strategy not in SAMPLING_STRATEGIES:
+            raise ValueError(f"Unknown sampling strategy: {strategy}")
+        
+        if sampling not in SAMPLING_MODES:
+            raise ValueError(f"Unknown sampling mode: {sampling}")
+        
+        if sampling == SAMPLING_COUNT and (not isinstance(target_count, int) or target_count < 1):
+            raise ValueError(f"Count sampling needs a positive target_count: {target_count}")
+        
+        if quality_filter is not None and quality_filter not in QUALITY_ACTIONS:
+            raise ValueError(f"Unknown quality filter: {quality_filter}")
+        
+        if growing is not None and sampling == SAMPLING_COUNT:
+            raise ValueError("Count sampling needs the complete video")
+        
+        encoder = FrameEncoder(image_format, image_quality, self.jpeg_backend)
             
         # Generate unique project ID
         project_id = project_name or f"project_{uuid.uuid4().hex[:8]}"
         project_folder = os.path.join(self.frames_folder, project_id)
-        os.makedirs(project_folder, exist_ok=True)
         
-        # Open video
-        cap = cv2.VideoCapture(video_path)
+        # Open video (waiting for the container header of a growing upload).
+        # While a paused upload is waited for, the last progress report is
+        # repeated so that a cancelled job still stops
+        last_progress = [0, 0, 0]
+        
+        def report_waiting():
+            if progress_callback:
+                progress_callback(*last_progress)
+        
+        cap = cv2.VideoCapture(video_path) if growing is None else GrowingCapture(
+            growing, stall_timeout=growing.stall_timeout or self.UPLOAD_STALL_SECONDS,
+            on_wait=report_waiting)
         if not cap.isOpened():
             raise ValueError(f"Could not open video file: {video_path}")
+        # Created only for a video that opened, so a failed one leaves nothing behind
+        os.makedirs(project_folder, exist_ok=True)
         
         # Get video properties
         fps = cap.get(cv2.CAP_PROP_FPS)
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration = total_frames / fps
+        duration = total_frames / fps if fps > 0 else 0.0
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
+        # The frame count in the header of a partial file may be missing or
+        # short, so a growing upload is decoded to its end
+        decode_frames = 0 if growing is not None else total_frames
         
         # Calculate frame interval
-        frame_interval = int(fps * interval)
+        if sampling == SAMPLING_COUNT:
+            target_frames = self.target_frame_numbers(total_frames, target_count)
+            frame_interval = max(1, total_frames // target_count)
+        else:
+            frame_interval = max(1, int(fps * interval))
         
-        extracted_frames = []
-        frame_count = 0
-        extracted_count = 0
+        if sampling == SAMPLING_SCENE or growing is not None:
+            # Every analysed frame must be decoded in order, and a growing
+            # upload can only be read front to back
+            strategy = STRATEGY_GRAB
+        elif strategy == STRATEGY_AUTO:
+            keyframe_interval = None
+            if frame_interval > 1:
+                keyframe_interval = self.probe_keyframe_interval(video_path)
+            strategy = self.choose_sampling_strategy(frame_interval, keyframe_interval)
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-                
-            # Extract frame at specified interval
-            if frame_count % frame_interval == 0:
-                frame_filename = f"frame_{extracted_count:06d}.jpg"
-                frame_path = os.path.join(project_folder, frame_filename)
-                
-                # Save frame
-                cv2.imwrite(frame_path, frame)
-                extracted_frames.append(frame_path)
-                extracted_count += 1
-                
-            frame_count += 1
-        
-        cap.release()
+        # Scene detection, quality scoring and de-duplication run sequentially
+        # and record which source frames were kept
+        filtered = (sampling != SAMPLING_INTERVAL or dedupe_distance is not None or
+                    quality_filter is not None)
+        segments = [(0, total_frames)] if filtered or growing is not None else \
+            self.plan_segments(total_frames, fps, frame_interval)
+        frame_index = []
+        frame_hashes = []
+        frame_quality = {}
+        created_at = datetime.now().isoformat()
+        extraction_id = uuid.uuid4().hex
+        if growing is not None:
+            progress_callback = self._publish_progress(progress_callback, project_folder, {
+                'project_id': project_id,
+                'video_path': video_path,
+                'video_name': os.path.basename(video_path),
+                'fps': fps,
+                'total_frames': total_frames,
+                'duration': duration,
+                'width': width,
+                'height': height,
+                'interval': interval,
+                'sampling': sampling,
+                'sampling_strategy': strategy,
+                'encoding': encoder.to_dict(),
+                'variants': dict(self.FRAME_VARIANTS),
+                'frame_step': frame_interval,
+                'extracting': True,
+                'extraction_id': extraction_id,
+                'created_at': created_at
+            }, frame_index if filtered else None, last_progress)
+        try:
+            if progress_callback:
+                progress_callback(0, 0, total_frames)
+            if filtered:
+                if sampling == SAMPLING_SCENE:
+                    frames = self._iter_scene_frames(cap, decode_frames, fps, scene_threshold,
+                                                     min_gap, max_gap)
+                elif sampling == SAMPLING_COUNT:
+                    frames = self._iter_frame_numbers(cap, target_frames, strategy)
+                else:
+                    frames = self._iter_sampled_frames(cap, frame_interval, decode_frames, strategy)
+                if quality_filter is not None:
+                    frames = self._filter_quality(frames, quality_filter, min_sharpness,
+                                                  frame_quality)
+                if dedupe_distance is not None:
+                    frames = self._filter_duplicates(frames, dedupe_distance, frame_hashes)
+                extracted_frames = self._write_frames(
+                    cap, _record_frame_index(cap, frames, frame_index), project_folder,
+                    total_frames, progress_callback, encoder=encoder,
+                    pipelined=growing is None
+                )
+            elif len(segments) > 1:
+                extracted_frames = self._extract_segments_parallel(
+                    video_path, project_folder, segments, frame_interval, strategy,
+                    progress_callback, encoder, frame_index
+                )
+            else:
+                extracted_frames = self._write_sampled_frames(
+                    cap, project_folder, frame_interval, 0, decode_frames, strategy,
+                    progress_callback, encoder=encoder, frame_index=frame_index,
+                    pipelined=growing is None
+                )
+            if growing is not None:
+                # Properties of the complete file
+                total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or total_frames
+                duration = total_frames / fps if fps > 0 else 0.0
+                source_sha256 = source_sha256 or growing.sha256
+        except Exception:
+            # Cancelled, abandoned upload or failed write: no partial project is kept
+            shutil.rmtree(project_folder, ignore_errors=True)
+            raise
+        finally:
+            cap.release()
+        extracted_count = len(extracted_frames)
         
         # Create metadata
         metadata = {
@@ -76,34 +351,1188 @@ class VideoProcessor:
             'fps': fps,
             'total_frames': total_frames,
             'duration': duration,
+            'width': width,
+            'height': height,
             'interval': interval,
+            'sampling': sampling,
+            'sampling_strategy': strategy,
+            'encoding': encoder.to_dict(),
+            'variants': dict(self.FRAME_VARIANTS),
             'extracted_count': extracted_count,
-            'created_at': datetime.now().isoformat(),
-            'frame_paths': extracted_frames
+            'frame_index': FRAME_INDEX_FILENAME,
+            'source_sha256': source_sha256,
+            'extraction_params': extraction_params(
+                interval, False, sampling, scene_threshold, min_gap, max_gap, dedupe_distance,
+                quality_filter, min_sharpness, target_count, image_format, encoder.quality),
+            'extraction_id': extraction_id,
+            'created_at': created_at
         }
+        save_frame_index(project_folder, frame_index)
+        frame_numbers = [frame_number for frame_number, _ in frame_index]
+        if sampling == SAMPLING_SCENE:
+            metadata['scene_threshold'] = scene_threshold
+        elif sampling == SAMPLING_COUNT:
+            metadata['target_count'] = target_count
+        else:
+            metadata['frame_step'] = frame_interval
+        if filtered:
+            metadata['frame_numbers'] = frame_numbers
+            metadata['frame_timestamps'] = [timestamp for _, timestamp in frame_index]
+        if dedupe_distance is not None:
+            save_hash_index(project_folder, frame_hashes)
+            metadata['dedupe_distance'] = dedupe_distance
+            metadata['hash_index'] = 'frame_hashes.npy'
+        if quality_filter is not None:
+            # Scores of the frames that were written, in frame order
+            scores = [frame_quality[n] for n in frame_numbers]
+            metadata['quality_filter'] = quality_filter
+            metadata['min_sharpness'] = min_sharpness
+            metadata['frame_quality'] = scores
+            metadata['low_quality_frames'] = [i for i, q in enumerate(scores) if q['issues']]
+        metadata = compact_metadata(metadata)
+        
+        # Save metadata (replaced atomically when it is already being read)
+        if growing is not None:
+            self._write_metadata(project_folder, metadata)
+        else:
+            metadata_path = os.path.join(project_folder, 'metadata.json')
+            with open(metadata_path, 'w') as f:
+                json.dump(metadata, f, indent=2)
+        self._index_source(project_id, source_sha256)
+        
+        return project_id, extracted_frames, metadata
+    
+    def _publish_progress(self, progress_callback: Optional[ProgressCallback],
+                          project_folder: str, metadata: dict,
+                          frame_index: Optional[List[Tuple[int, float]]] = None,
+                          last_progress: Optional[list] = None) -> ProgressCallback:
+        """
+        Wrap a progress callback to list the frames written so far in metadata.json
+        
+        Frames are written in order before they are counted, so the first
+        frames_written frames can be served while extraction goes on. The
+        file is rewritten at most every PUBLISH_INTERVAL seconds; frame_index
+        is given when the source frame numbers are not evenly spaced, and
+        last_progress is updated in place with every report's counts.
+        """
+        state = {'published_at': None}
+        
+        def publish(frames_decoded: int, frames_written: int, total_frames: int):
+            if last_progress is not None:
+                last_progress[:] = (frames_decoded, frames_written, total_frames)
+            now = time.monotonic()
+            if frames_written and (state['published_at'] is None or
+                                   now - state['published_at'] >= self.PUBLISH_INTERVAL):
+                state['published_at'] = now
+                partial = dict(metadata, extracted_count=frames_written)
+                if frame_index is not None:
+                    partial['frame_numbers'] = [n for n, _ in frame_index[:frames_written]]
+                    partial['frame_timestamps'] = [t for _, t in frame_index[:frames_written]]
+                self._write_metadata(project_folder, compact_metadata(partial))
+            if progress_callback:
+                progress_callback(frames_decoded, frames_written, total_frames)
+        return publish
+    
+    def _write_metadata(self, project_folder: str, metadata: dict):
+        """Replace a project's metadata.json without readers seeing a partial file"""
+        metadata_path = os.path.join(project_folder, 'metadata.json')
+        temp_path = f"{metadata_path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(temp_path, metadata_path)
+    
+    def create_lazy_project(self, video_path: str, interval: float = 1.0,
+                            project_name: str = None,
+                            progress_callback: Optional[ProgressCallback] = None,
+                            image_format: str = FORMAT_JPEG,
+                            image_quality: int = None,
+                            source_sha256: str = None) -> Tuple[str, List[str], dict]:
+        """
+        Create a project whose frames are decoded on first access
+        
+        Only the video properties are probed; the sampled frame numbers and
+        timestamps are recorded in the metadata and each frame is written to
+        its usual path by materialize_frame() when it is first requested.
+        
+        Args:
+            video_path: Path to the video file
+            interval: Time interval between frames in seconds
+            project_name: Name for the project/session
+            progress_callback: Called once with (total_frames, 0, total_frames)
+            image_format: Frame file format ('jpeg', 'webp' or 'png')
+            image_quality: JPEG/WebP quality (1-100, default 95)
+            source_sha256: Content hash of the video (see extract_frames)
+            
+        Returns:
+            Tuple containing (project_id, frame_paths, metadata); the frame
+            files do not exist yet
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+        
+        if not interval > 0 or math.isinf(interval):
+            raise ValueError(f"Interval must be a positive number of seconds: {interval}")
+        
+        encoder = FrameEncoder(image_format, image_quality, self.jpeg_backend)
+        
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video file: {video_path}")
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
+        cap.release()
+        
+        if fps <= 0 or total_frames <= 0:
+            raise ValueError(f"Video has no usable frame count or frame rate: {video_path}")
+        
+        project_id = project_name or f"project_{uuid.uuid4().hex[:8]}"
+        project_folder = os.path.join(self.frames_folder, project_id)
+        os.makedirs(project_folder, exist_ok=True)
+        
+        frame_interval = max(1, int(fps * interval))
+        frame_numbers = range(0, total_frames, frame_interval)
+        frame_paths = [os.path.join(project_folder, f"frame_{i:06d}{encoder.extension}")
+                       for i in range(len(frame_numbers))]
+        
+        metadata = {
+            'project_id': project_id,
+            'video_path': video_path,
+            'video_name': os.path.basename(video_path),
+            'fps': fps,
+            'total_frames': total_frames,
+            'duration': total_frames / fps,
+            'width': width,
+            'height': height,
+            'interval': interval,
+            'frame_step': frame_interval,
+            'lazy': True,
+            'encoding': encoder.to_dict(),
+            'variants': dict(self.FRAME_VARIANTS),
+            'extracted_count': len(frame_paths),
+            'frame_index': FRAME_INDEX_FILENAME,
+            'source_sha256': source_sha256,
+            'extraction_params': extraction_params(interval, True, image_format=image_format,
+                                                   image_quality=encoder.quality),
+            'extraction_id': uuid.uuid4().hex,
+            'created_at': datetime.now().isoformat()
+        }
+        # Nothing is decoded yet, so timestamps are nominal (frame number / fps)
+        save_frame_index(project_folder, [(n, round(n / fps, 6)) for n in frame_numbers])
+        metadata = compact_metadata(metadata)
         
-        # Save metadata
         metadata_path = os.path.join(project_folder, 'metadata.json')
         with open(metadata_path, 'w') as f:
             json.dump(metadata, f, indent=2)
+        self._index_source(project_id, source_sha256)
         
-        return project_id, extracted_frames, metadata
+        if progress_callback:
+            progress_callback(total_frames, 0, total_frames)
+        
+        return project_id, frame_paths, metadata
+    
+    def resample_project(self, project_id: str, interval: float = 1.0,
+                         progress_callback: Optional[ProgressCallback] = None,
+                         lazy: bool = None, image_format: str = None,
+                         image_quality: int = None, **options) -> Tuple[str, List[str], dict]:
+        """
+        Re-run frame sampling of an existing project from its stored source video
+        
+        The new frames are extracted into a staging folder that replaces the
+        project folder once extraction succeeded, so the old frames stay
+        readable until then and a failed or cancelled run leaves the project
+        untouched. The metadata keeps the project's creation date and gets an
+        incremented 'revision' for building cache-busting frame URLs.
+        
+        Args:
+            project_id: Project identifier
+            interval: Time interval between frames in seconds
+            progress_callback: Passed on to the extraction
+            lazy: Create an on-demand project (default: same as before)
+            image_format: Frame file format (default: same as before)
+            image_quality: JPEG/WebP quality (default: same as before)
+            **options: Sampling and filtering options of extract_frames()
+        
+        Returns:
+            Tuple containing (project_id, frame_paths, metadata)
+        """
+        previous = self.get_project_metadata(project_id)
+        video_path = previous['video_path']
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"Source video not found: {video_path}")
+        
+        encoding = previous.get('encoding', {})
+        image_format = image_format or encoding.get('format', FORMAT_JPEG)
+        image_quality = image_quality or encoding.get('quality')
+        if lazy is None:
+            lazy = previous.get('lazy', False)
+        if lazy and options:
+            raise ValueError("Scene sampling and frame filtering cannot be combined with "
+                             "on-demand extraction")
+        
+        with self._metadata_lock:
+            if project_id in self._resampling:
+                raise ValueError(f"Project is already being re-sampled: {project_id}")
+            self._resampling.add(project_id)
+        
+        project_folder = os.path.join(self.frames_folder, project_id)
+        staging_id = f"{project_id}.resample_{uuid.uuid4().hex[:8]}"
+        staging_folder = os.path.join(self.frames_folder, staging_id)
+        try:
+            if lazy:
+                _, frame_paths, metadata = self.create_lazy_project(
+                    video_path, interval, staging_id, progress_callback,
+                    image_format=image_format, image_quality=image_quality,
+                    source_sha256=previous.get('source_sha256')
+                )
+            else:
+                _, frame_paths, metadata = self.extract_frames(
+                    video_path, interval, staging_id, progress_callback=progress_callback,
+                    image_format=image_format, image_quality=image_quality,
+                    source_sha256=previous.get('source_sha256'), **options
+                )
+            
+            metadata['project_id'] = project_id
+            metadata['created_at'] = previous.get('created_at', metadata['created_at'])
+            metadata['resampled_at'] = datetime.now().isoformat()
+            metadata['revision'] = previous.get('revision', 0) + 1
+            with open(os.path.join(staging_folder, 'metadata.json'), 'w') as f:
+                json.dump(metadata, f, indent=2)
+            
+            # Swap the folders; the old frames are removed only after the rename
+            replaced_folder = f"{project_folder}.replaced_{uuid.uuid4().hex[:8]}"
+            os.replace(project_folder, replaced_folder)
+            os.replace(staging_folder, project_folder)
+            shutil.rmtree(replaced_folder, ignore_errors=True)
+            self.capture_pool.discard(video_path)
+        except BaseException:
+            shutil.rmtree(staging_folder, ignore_errors=True)
+            raise
+        finally:
+            with self._metadata_lock:
+                self._metadata_cache.pop(project_id, None)
+                self._resampling.discard(project_id)
+        
+        frame_paths = [os.path.join(project_folder, os.path.basename(path)) for path in frame_paths]
+        return project_id, frame_paths, metadata
+    
+    def _projects_with_source(self, source_sha256: str) -> Iterator[dict]:
+        """
+        Metadata of the projects extracted from a video with this content hash
+        
+        Only the projects the source index lists for the hash are read.
+        Entries whose project was deleted or re-extracted (possibly by
+        another process) are dropped; projects another process created
+        are not seen until the next restart, which only misses a reuse.
+        """
+        if not source_sha256:
+            return
+        for project_id in self._indexed_projects(source_sha256):
+            try:
+                metadata = self.get_project_metadata(project_id)
+            except (FileNotFoundError, NotADirectoryError, ValueError):
+                metadata = {}
+            # Skip staging folders of a re-sample in progress
+            if metadata.get('project_id') == project_id and \
+                    metadata.get('source_sha256') == source_sha256:
+                yield metadata
+            else:
+                self._unindex_source(project_id, source_sha256)
+    
+    def _indexed_projects(self, source_sha256: str) -> List[str]:
+        """Project IDs listed under a content hash, scanning the projects once"""
+        with self._metadata_lock:
+            index = self._source_index
+        if index is None:
+            index = {}
+            if os.path.isdir(self.frames_folder):
+                for project_id in os.listdir(self.frames_folder):
+                    metadata_path = os.path.join(self.frames_folder, project_id, 'metadata.json')
+                    try:
+                        with open(metadata_path, 'r') as f:
+                            metadata = json.load(f)
+                    except (OSError, ValueError):
+                        continue
+                    if metadata.get('source_sha256') and metadata.get('project_id') == project_id:
+                        index.setdefault(metadata['source_sha256'], set()).add(project_id)
+            with self._metadata_lock:
+                if self._source_index is None:
+                    self._source_index = index
+                index = self._source_index
+        with self._metadata_lock:
+            return sorted(index.get(source_sha256, ()))
+    
+    def _index_source(self, project_id: str, source_sha256: Optional[str]):
+        """Record a new project under its video's content hash"""
+        if not source_sha256:
+            return
+        with self._metadata_lock:
+            # Before the first lookup the scan will find the project anyway
+            if self._source_index is not None:
+                self._source_index.setdefault(source_sha256, set()).add(project_id)
+    
+    def _unindex_source(self, project_id: str, source_sha256: str = None):
+        """Forget a project under one content hash (or under every hash)"""
+        with self._metadata_lock:
+            if self._source_index is None:
+                return
+            hashes = [source_sha256] if source_sha256 else list(self._source_index)
+            for sha256 in hashes:
+                projects = self._source_index.get(sha256)
+                if projects is not None:
+                    projects.discard(project_id)
+                    if not projects:
+                        del self._source_index[sha256]
+    
+    def find_extraction(self, source_sha256: str, params: dict) -> Optional[str]:
+        """
+        Find a project extracted from the same video content with the same settings
+        
+        Args:
+            source_sha256: Content hash of the uploaded video
+            params: extraction_params() of the requested extraction
+        
+        Returns:
+            The project ID, or None
+        """
+        for metadata in self._projects_with_source(source_sha256):
+            if metadata.get('extraction_params') == params:
+                return metadata['project_id']
+        return None
+    
+    def find_source_video(self, source_sha256: str) -> Optional[str]:
+        """Path of a stored video with this content hash, if a project still has one"""
+        for metadata in self._projects_with_source(source_sha256):
+            if os.path.exists(metadata['video_path']):
+                return metadata['video_path']
+        return None
+    
+    def clone_project(self, source_project_id: str, project_name: str = None,
+                      video_path: str = None,
+                      progress_callback: Optional[ProgressCallback] = None
+                      ) -> Tuple[str, List[str], dict]:
+        """
+        Create a project that shares the extracted files of another one
+        
+        Frame files are never modified in place (new files are renamed into
+        place), so they are hard-linked instead of decoded again or copied;
+        file systems without hard links get copies. metadata.json is written
+        fresh, so both projects can change independently afterwards.
+        
+        Args:
+            source_project_id: Project whose frames are reused
+            project_name: Name for the new project
+            video_path: Video of the new project (default: the source's)
+            progress_callback: Called once with (total_frames, written, total_frames)
+        
+        Returns:
+            Tuple containing (project_id, frame_paths, metadata)
+        """
+        source = self.get_project_metadata(source_project_id)
+        source_folder = os.path.join(self.frames_folder, source_project_id)
+        project_id = project_name or f"project_{uuid.uuid4().hex[:8]}"
+        project_folder = os.path.join(self.frames_folder, project_id)
+        if project_id == source_project_id:
+            # Re-uploaded under the same name: the project already has the frames
+            project_folder, metadata = source_folder, source
+        elif os.path.exists(project_folder):
+            raise ValueError(f"Project already exists: {project_id}")
+        else:
+            metadata = self._link_project(source, project_id, video_path)
+        
+        frame_paths = [os.path.join(project_folder, frame_filename(metadata, i))
+                       for i in range(metadata['extracted_count'])]
+        if progress_callback:
+            progress_callback(metadata['total_frames'], len(frame_paths), metadata['total_frames'])
+        return project_id, frame_paths, metadata
+    
+    def _link_project(self, source: dict, project_id: str, video_path: Optional[str]) -> dict:
+        """Hard-link (or copy) a project's files into a new project and write its metadata"""
+        source_folder = os.path.join(self.frames_folder, source['project_id'])
+        project_folder = os.path.join(self.frames_folder, project_id)
+        try:
+            for root, _, files in os.walk(source_folder):
+                destination = os.path.join(project_folder, os.path.relpath(root, source_folder))
+                os.makedirs(destination, exist_ok=True)
+                for name in files:
+                    if root == source_folder and name == 'metadata.json' or '.tmp' in name:
+                        continue
+                    try:
+                        os.link(os.path.join(root, name), os.path.join(destination, name))
+                    except OSError:
+                        shutil.copy2(os.path.join(root, name), os.path.join(destination, name))
+        
+            metadata = {key: value for key, value in source.items()
+                        if key not in ('revision', 'resampled_at')}
+            metadata.update(project_id=project_id, cloned_from=source['project_id'],
+                            extraction_id=uuid.uuid4().hex, created_at=datetime.now().isoformat())
+            if video_path:
+                metadata['video_path'] = video_path
+                metadata['video_name'] = os.path.basename(video_path)
+            with open(os.path.join(project_folder, 'metadata.json'), 'w') as f:
+                json.dump(metadata, f, indent=2)
+        except BaseException:
+            shutil.rmtree(project_folder, ignore_errors=True)
+            raise
+        self._index_source(project_id, metadata.get('source_sha256'))
+        return metadata
+    
+    def materialize_frame(self, project_id: str, frame_index: int, size: str = 'full') -> str:
+        """
+        Get the path to a frame file, decoding it first for lazy projects
+        
+        The decoded frame is written to a temporary file and renamed into
+        place, so concurrent requests for the same frame never see a
+        partially written image.
+        
+        Args:
+            project_id: Project identifier
+            frame_index: Index of the frame
+            size: 'full' or one of FRAME_VARIANTS ('thumb', 'preview');
+                variants missing on disk (older projects) are generated from
+                the full frame, and frames already smaller than a variant
+                are served at full size
+        """
+        if size != 'full' and size not in self.FRAME_VARIANTS:
+            raise ValueError(f"Unknown frame size: {size}")
+        
+        frame_path = self.get_frame_path(project_id, frame_index)
+        if size != 'full':
+            variant_path = self.variant_path(frame_path, size)
+            if os.path.exists(variant_path):
+                return variant_path
+            if self._variant_skipped(self.get_project_metadata(project_id), size):
+                size = 'full'
+        if os.path.exists(frame_path):
+            if size == 'full':
+                return frame_path
+            frame = cv2.imread(frame_path, cv2.IMREAD_COLOR)
+            if frame is None:
+                raise FileNotFoundError(f"Frame file unreadable: {frame_path}")
+            encoder = FrameEncoder.from_settings(self.get_project_metadata(project_id).get('encoding'))
+            return self._save_variant(encoder, frame_path, frame, size) or frame_path
+        
+        metadata = self.get_project_metadata(project_id)
+        if not metadata.get('lazy'):
+            raise FileNotFoundError(f"Frame file missing: {frame_path}")
+        
+        frame_number = frame_index * metadata['frame_step']
+        ret, frame = self.read_frame(metadata['video_path'], frame_number)
+        if not ret:
+            raise IndexError(f"Frame {frame_index} could not be decoded")
+        
+        encoder = FrameEncoder.from_settings(metadata.get('encoding'))
+        self._save_frame(encoder, frame_path, frame, atomic=True)
+        if size != 'full' and os.path.exists(self.variant_path(frame_path, size)):
+            return self.variant_path(frame_path, size)
+        return frame_path
+    
+    def _variant_skipped(self, metadata: dict, size: str) -> bool:
+        """
+        Whether a project's frames are too small to have a variant of this size
+        
+        Uses the frame size recorded in the metadata, so such requests are
+        answered with the full frame without decoding it first; projects
+        from before the size was recorded report False.
+        """
+        width, height = metadata.get('width', 0), metadata.get('height', 0)
+        return width > 0 and height > 0 and max(width, height) <= self.FRAME_VARIANTS[size]
+    
+    def variant_path(self, frame_path: str, size: str) -> str:
+        """Path of a downscaled variant of a frame (one subfolder per size)"""
+        return os.path.join(os.path.dirname(frame_path), size, os.path.basename(frame_path))
+    
+    def read_frame(self, video_path: str, frame_number: int) -> Tuple[bool, object]:
+        """
+        Decode a single source frame using a pooled capture
+        
+        Consecutive requests decode forward from the previous position
+        instead of seeking again.
+        
+        Raises:
+            FileNotFoundError: If the source video cannot be opened
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"Source video unavailable: {video_path}")
+        try:
+            return self.capture_pool.read_frame(video_path, frame_number)
+        except ValueError as e:
+            raise FileNotFoundError(str(e))
+    
+    def probe_keyframe_interval(self, video_path: str) -> Optional[float]:
+        """
+        Estimate the keyframe spacing of a video without decoding it
+        
+        Reads raw (undecoded) packets from the start of the stream and
+        measures the distance between keyframes. Requires the FFmpeg backend.
+        
+        Args:
+            video_path: Path to the video file
+            
+        Returns:
+            Median number of frames between keyframes, or None if unknown
+        """
+        key_frame_prop = getattr(cv2, 'CAP_PROP_LRF_HAS_KEY_FRAME', None)
+        if key_frame_prop is None:
+            return None
+        
+        try:
+            cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1])
+        except cv2.error:
+            return None
+        
+        keyframes = []
+        packets = 0
+        try:
+            if not cap.isOpened():
+                return None
+            while packets < self.KEYFRAME_PROBE_PACKETS and cap.grab():
+                if cap.get(key_frame_prop):
+                    keyframes.append(packets)
+                packets += 1
+        except cv2.error:
+            return None
+        finally:
+            cap.release()
+        
+        if not keyframes:
+            return None
+        if len(keyframes) == 1:
+            # A single keyframe in the probe window: spacing is at least that long
+            return float(max(packets, 1))
+        
+        gaps = sorted(b - a for a, b in zip(keyframes, keyframes[1:]))
+        return float(gaps[len(gaps) // 2])
+    
+    def probe_duration(self, video_path: str) -> float:
+        """
+        Duration of a video in seconds from its container header (0.0 if unknown)
+        
+        Nothing is decoded, but the container is still opened and parsed;
+        estimate_duration() is the cheaper guess used to schedule jobs.
+        """
+        cap = cv2.VideoCapture(video_path)
+        try:
+            if not cap.isOpened():
+                return 0.0
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            total_frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        finally:
+            cap.release()
+        return total_frames / fps if fps > 0 and total_frames > 0 else 0.0
+    
+    def estimate_duration(self, video_path: str) -> float:
+        """
+        Rough duration of a video in seconds from its file size (0.0 if unknown)
+        
+        Only stats the file, so it is cheap enough to run in a request for
+        every video of a batch; the extraction reads the real duration once
+        it opens the video.
+        """
+        try:
+            return os.path.getsize(video_path) / self.ESTIMATE_BYTES_PER_SECOND
+        except OSError:
+            return 0.0
+    
+    def extraction_cores(self, duration: float, parallel: bool = True) -> int:
+        """
+        Cores an extraction of a video of this duration keeps busy
+        
+        Long videos are split across up to `workers` processes (as in
+        plan_segments()); otherwise one thread decodes while the encoder
+        threads write frames. Used to fit extraction jobs into a CPU budget.
+        
+        Args:
+            duration: Video duration in seconds
+            parallel: False for extractions that always run sequentially
+                (scene sampling, filtering, growing uploads)
+        """
+        if parallel and self.workers > 1 and duration > 0:
+            segments = self.workers
+            if self.min_segment_seconds > 0:
+                segments = min(segments, int(duration // self.min_segment_seconds))
+            if segments > 1:
+                return segments
+        return 1 + self.encoder_threads if self.encoder_threads > 1 else 1
+    
+    def choose_sampling_strategy(self, frame_interval: int,
+                                 keyframe_interval: Optional[float]) -> str:
+        """
+        Pick the cheapest way to reach every sampled frame
+        
+        Grabbing still decodes every skipped frame but avoids the colour
+        conversion; a seek lands on the preceding keyframe and decodes
+        forward, costing on average half a GOP plus the seek itself.
+        
+        Args:
+            frame_interval: Number of source frames between sampled frames
+            keyframe_interval: Frames between keyframes, or None if unknown
+            
+        Returns:
+            'grab' or 'seek'
+        """
+        if frame_interval <= 1 or keyframe_interval is None:
+            return STRATEGY_GRAB
+        
+        grab_cost = frame_interval - 1
+        seek_cost = keyframe_interval / 2 + self.SEEK_OVERHEAD_FRAMES
+        return STRATEGY_SEEK if seek_cost < grab_cost else STRATEGY_GRAB
+    
+    def target_frame_numbers(self, total_frames: int, count: int) -> List[int]:
+        """
+        Evenly spaced frame numbers for count sampling
+        
+        The first frame is always included; a count larger than the video
+        yields every frame once.
+        """
+        if total_frames <= 0:
+            return []
+        count = min(count, total_frames)
+        return [i * total_frames // count for i in range(count)]
+    
+    def plan_segments(self, total_frames: int, fps: float,
+                      frame_interval: int) -> List[Tuple[int, int]]:
+        """
+        Split a video into frame ranges that can be decoded independently
+        
+        Every range starts on a sampled frame, so frame numbering is the
+        same whichever range a frame ends up in. Ranges are never shorter
+        than min_segment_seconds; short videos get a single range.
+        
+        Args:
+            total_frames: Number of frames in the video
+            fps: Frames per second of the video
+            frame_interval: Number of source frames between sampled frames
+            
+        Returns:
+            List of (start_frame, end_frame) tuples, end exclusive
+        """
+        if total_frames <= 0 or fps <= 0 or self.workers <= 1:
+            return [(0, total_frames)]
+        
+        duration = total_frames / fps
+        max_segments = self.workers
+        if self.min_segment_seconds > 0:
+            max_segments = int(duration // self.min_segment_seconds)
+        sample_count = -(-total_frames // frame_interval)
+        segment_count = max(1, min(self.workers, max_segments, sample_count))
+        if segment_count == 1:
+            return [(0, total_frames)]
+        
+        segments = []
+        for i in range(segment_count):
+            first_sample = sample_count * i // segment_count
+            last_sample = sample_count * (i + 1) // segment_count
+            start_frame = first_sample * frame_interval
+            end_frame = min(last_sample * frame_interval, total_frames)
+            segments.append((start_frame, end_frame))
+        return segments
+    
+    def _extract_segments_parallel(self, video_path: str, project_folder: str,
+                                   segments: List[Tuple[int, int]], frame_interval: int,
+                                   strategy: str,
+                                   progress_callback: Optional[ProgressCallback] = None,
+                                   encoder: FrameEncoder = None,
+                                   frame_index: Optional[List[Tuple[int, float]]] = None
+                                   ) -> List[str]:
+        """
+        Extract every segment in its own process and merge the results
+        
+        If a segment stops early (unreadable frame), frames written by later
+        segments are removed so the output matches a sequential extraction.
+        Progress is reported as whole segments complete, and at least every
+        SEGMENT_POLL_INTERVAL seconds so a cancellation is noticed while the
+        segments run; the workers then stop at their next sampled frame. The
+        (frame_number, timestamp) records of the kept frames are appended to
+        frame_index.
+        """
+        total_frames = segments[-1][1]
+        encoder = encoder or FrameEncoder()
+        # Spawned workers do not inherit OpenCV/Flask thread state from the parent
+        context = multiprocessing.get_context('spawn')
+        with context.Manager() as manager:
+            cancel_event = manager.Event()
+            executor = ProcessPoolExecutor(max_workers=len(segments), mp_context=context)
+            try:
+                futures = [
+                    executor.submit(_extract_segment, self.frames_folder, video_path, project_folder,
+                                    start_frame, end_frame, frame_interval, strategy,
+                                    f"segment_{index:03d}_", encoder.to_dict(), cancel_event)
+                    for index, (start_frame, end_frame) in enumerate(segments)
+                ]
+                frames_decoded = frames_written = 0
+                pending = set(futures)
+                while pending:
+                    done, pending = wait(pending, timeout=self.SEGMENT_POLL_INTERVAL,
+                                         return_when=FIRST_COMPLETED)
+                    for future in done:
+                        start_frame, end_frame = segments[futures.index(future)]
+                        frames_decoded += end_frame - start_frame
+                        frames_written += len(future.result()[0])
+                    if progress_callback:
+                        progress_callback(frames_decoded, frames_written, total_frames)
+                results = [future.result() for future in futures]
+            except BaseException:
+                # Cancelled or a segment failed: stop the other segments too
+                cancel_event.set()
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+            executor.shutdown()
+        
+        # Rename segment-local files into one consecutive frame_%06d sequence
+        extracted_frames = []
+        truncated = False
+        for (start_frame, end_frame), (segment_paths, segment_index) in zip(segments, results):
+            if truncated:
+                for segment_path in segment_paths:
+                    for path in self._frame_files(segment_path):
+                        if os.path.exists(path):
+                            os.remove(path)
+                continue
+            for segment_path in segment_paths:
+                frame_path = os.path.join(project_folder,
+                                          f"frame_{len(extracted_frames):06d}{encoder.extension}")
+                for source, destination in zip(self._frame_files(segment_path),
+                                               self._frame_files(frame_path)):
+                    if os.path.exists(source):
+                        os.replace(source, destination)
+                extracted_frames.append(frame_path)
+            if frame_index is not None:
+                frame_index.extend(segment_index)
+            if len(segment_paths) < len(range(start_frame, end_frame, frame_interval)):
+                truncated = True
+        return extracted_frames
+    
+    def _frame_files(self, frame_path: str) -> List[str]:
+        """A frame file followed by the paths of its variants"""
+        return [frame_path] + [self.variant_path(frame_path, size) for size in self.FRAME_VARIANTS]
+    
+    def _write_sampled_frames(self, cap, project_folder: str, frame_interval: int,
+                              start_frame: int, end_frame: int, strategy: str,
+                              progress_callback: Optional[ProgressCallback] = None,
+                              name_prefix: str = 'frame_',
+                              encoder: FrameEncoder = None,
+                              frame_index: Optional[List[Tuple[int, float]]] = None,
+                              pipelined: bool = True) -> List[str]:
+        """Decode and save the sampled frames of [start_frame, end_frame)"""
+        frames = self._iter_sampled_frames(cap, frame_interval, end_frame, strategy, start_frame)
+        if frame_index is not None:
+            frames = _record_frame_index(cap, frames, frame_index)
+        return self._write_frames(cap, frames, project_folder, end_frame,
+                                  progress_callback, name_prefix, encoder, pipelined)
+    
+    def _write_frames(self, cap, frames: Iterator[Tuple[int, object]], project_folder: str,
+                      total_frames: int, progress_callback: Optional[ProgressCallback] = None,
+                      name_prefix: str = 'frame_',
+                      encoder: FrameEncoder = None, pipelined: bool = True) -> List[str]:
+        """
+        Save (frame_number, frame) pairs as consecutively numbered images
+        
+        With pipelined=False frames are written on the calling thread, so
+        frames_written in progress reports always counts the leading frames.
+        """
+        encoder = encoder or FrameEncoder()
+        for size in self.FRAME_VARIANTS:
+            os.makedirs(os.path.join(project_folder, size), exist_ok=True)
+        if pipelined and self.encoder_threads > 1:
+            return self._write_frames_pipelined(cap, frames, project_folder, total_frames,
+                                                progress_callback, name_prefix, encoder)
+        
+        extracted_frames = []
+        for frame_number, frame in frames:
+            frame_filename = f"{name_prefix}{len(extracted_frames):06d}{encoder.extension}"
+            frame_path = os.path.join(project_folder, frame_filename)
+            
+            # Save frame and its downscaled variants
+            self._save_frame(encoder, frame_path, frame)
+            extracted_frames.append(frame_path)
+            if progress_callback:
+                progress_callback(frame_number + 1, len(extracted_frames), total_frames)
+        return extracted_frames
+    
+    def _save_frame(self, encoder: FrameEncoder, frame_path: str, frame, atomic: bool = False):
+        """
+        Write a frame and its downscaled variants from one decoded image
+        
+        With atomic=True every file is written to a temporary name and
+        renamed into place (for frames written while they may be served).
+        """
+        for size in self.FRAME_VARIANTS:
+            self._save_variant(encoder, frame_path, frame, size, atomic)
+        if atomic:
+            temp_path = f"{frame_path}.{uuid.uuid4().hex[:8]}.tmp{encoder.extension}"
+            encoder.write(temp_path, frame)
+            os.replace(temp_path, frame_path)
+        else:
+            encoder.write(frame_path, frame)
+    
+    def _save_variant(self, encoder: FrameEncoder, frame_path: str, frame, size: str,
+                      atomic: bool = True) -> Optional[str]:
+        """Write one downscaled variant; None if the frame is already that small"""
+        long_edge = self.FRAME_VARIANTS[size]
+        height, width = frame.shape[:2]
+        scale = long_edge / max(height, width)
+        if scale >= 1:
+            return None
+        
+        variant = cv2.resize(frame, (max(1, round(width * scale)), max(1, round(height * scale))),
+                             interpolation=cv2.INTER_AREA)
+        variant_path = self.variant_path(frame_path, size)
+        if atomic:
+            os.makedirs(os.path.dirname(variant_path), exist_ok=True)
+            temp_path = f"{variant_path}.{uuid.uuid4().hex[:8]}.tmp{encoder.extension}"
+            encoder.write(temp_path, variant)
+            os.replace(temp_path, variant_path)
+        else:
+            encoder.write(variant_path, variant)
+        return variant_path
+    
+    def pipeline_queue_size(self, cap) -> int:
+        """Number of decoded frames that fit in the pipeline buffer"""
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
+        frame_bytes = width * height * 3
+        if frame_bytes <= 0:
+            return self.encoder_threads * 2
+        buffer_bytes = self.pipeline_buffer_mb * 1024 * 1024
+        return max(1, int(buffer_bytes // frame_bytes))
+    
+    def _write_frames_pipelined(self, cap, frames: Iterator[Tuple[int, object]],
+                                project_folder: str, total_frames: int,
+                                progress_callback: Optional[ProgressCallback] = None,
+                                name_prefix: str = 'frame_',
+                                encoder: FrameEncoder = None) -> List[str]:
+        """
+        Decode on the calling thread while a pool of threads encodes and writes
+        
+        Decoded frames go through a bounded queue, so the decoder blocks once
+        pipeline_buffer_mb worth of frames is waiting to be encoded. OpenCV
+        releases the GIL inside imwrite, so encoders run truly in parallel.
+        """
+        encoder = encoder or FrameEncoder()
+        frame_queue = queue.Queue(maxsize=self.pipeline_queue_size(cap))
+        lock = threading.Lock()
+        state = {'written': 0, 'error': None}
+        
+        def encode_worker():
+            while True:
+                item = frame_queue.get()
+                if item is None:
+                    return
+                frame_path, frame = item
+                try:
+                    self._save_frame(encoder, frame_path, frame)
+                except Exception as e:
+                    with lock:
+                        state['error'] = state['error'] or e
+                with lock:
+                    state['written'] += 1
+        
+        encoders = [threading.Thread(target=encode_worker, name=f'frame-encoder-{i}', daemon=True)
+                    for i in range(self.encoder_threads)]
+        for thread in encoders:
+            thread.start()
+        
+        extracted_frames = []
+        try:
+            for frame_number, frame in frames:
+                if state['error'] is not None:
+                    break
+                frame_filename = f"{name_prefix}{len(extracted_frames):06d}{encoder.extension}"
+                frame_path = os.path.join(project_folder, frame_filename)
+                
+                # Blocks while the encoders are behind (back-pressure)
+                frame_queue.put((frame_path, frame))
+                extracted_frames.append(frame_path)
+                if progress_callback:
+                    progress_callback(frame_number + 1, state['written'], total_frames)
+        finally:
+            for _ in encoders:
+                frame_queue.put(None)
+            for thread in encoders:
+                thread.join()
+        
+        if state['error'] is not None:
+            raise state['error']
+        return extracted_frames
+    
+    def frame_signature(self, frame) -> np.ndarray:
+        """Downscaled grayscale copy of a frame used for change detection"""
+        height, width = frame.shape[:2]
+        signature_width = min(self.SCENE_SIGNATURE_WIDTH, width)
+        signature_height = max(1, round(height * signature_width / width))
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, (signature_width, signature_height), interpolation=cv2.INTER_AREA)
+    
+    def scene_change_score(self, previous: np.ndarray, current: np.ndarray) -> float:
+        """
+        Score how much the content changed between two frame signatures
+        
+        The larger of the mean absolute pixel difference and the histogram
+        distance, both normalised to 0-1: the pixel term catches motion, the
+        histogram term catches cuts and lighting changes.
+        """
+        pixel_diff = np.abs(previous.astype(np.int16) - current.astype(np.int16)).mean() / 255.0
+        
+        shift = 8 - int(math.log2(self.SCENE_HISTOGRAM_BINS))
+        previous_hist = np.bincount((previous >> shift).ravel(), minlength=self.SCENE_HISTOGRAM_BINS)
+        current_hist = np.bincount((current >> shift).ravel(), minlength=self.SCENE_HISTOGRAM_BINS)
+        hist_diff = 0.5 * np.abs(previous_hist / previous.size - current_hist / current.size).sum()
+        
+        return float(max(pixel_diff, hist_diff))
+    
+    def frame_quality(self, frame, min_sharpness: float = 100.0) -> dict:
+        """
+        Score the sharpness and exposure of a frame
+        
+        Computed on a downscaled grayscale copy: sharpness is the variance of
+        the Laplacian (low for blurred frames), exposure is judged from the
+        mean brightness and the share of crushed (<=5) or blown-out (>=250)
+        pixels.
+        
+        Returns:
+            Dictionary with sharpness, brightness, dark_ratio, bright_ratio
+            and issues (subset of 'blurry', 'underexposed', 'overexposed')
+        """
+        height, width = frame.shape[:2]
+        analysis_width = min(self.QUALITY_ANALYSIS_WIDTH, width)
+        analysis_height = max(1, round(height * analysis_width / width))
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        small = cv2.resize(gray, (analysis_width, analysis_height), interpolation=cv2.INTER_AREA)
+        
+        sharpness = float(cv2.Laplacian(small, cv2.CV_64F).var())
+        brightness = float(small.mean())
+        dark_ratio = float(np.count_nonzero(small <= 5) / small.size)
+        bright_ratio = float(np.count_nonzero(small >= 250) / small.size)
+        
+        issues = []
+        if sharpness < min_sharpness:
+            issues.append('blurry')
+        if brightness < self.MIN_BRIGHTNESS or dark_ratio > self.MAX_CLIPPED_RATIO:
+            issues.append('underexposed')
+        if brightness > self.MAX_BRIGHTNESS or bright_ratio > self.MAX_CLIPPED_RATIO:
+            issues.append('overexposed')
+        
+        return {
+            'sharpness': round(sharpness, 2),
+            'brightness': round(brightness, 2),
+            'dark_ratio': round(dark_ratio, 4),
+            'bright_ratio': round(bright_ratio, 4),
+            'issues': issues
+        }
+    
+    def _filter_quality(self, frames: Iterator[Tuple[int, object]], action: str,
+                        min_sharpness: float, frame_quality: dict) -> Iterator[Tuple[int, object]]:
+        """
+        Score each frame, dropping low-quality ones when action is 'drop'
+        
+        Scores of the frames passed on are stored in frame_quality keyed by
+        source frame number.
+        """
+        for frame_number, frame in frames:
+            quality = self.frame_quality(frame, min_sharpness)
+            if quality['issues'] and action == QUALITY_DROP:
+                continue
+            frame_quality[frame_number] = quality
+            yield frame_number, frame
+    
+    def _filter_duplicates(self, frames: Iterator[Tuple[int, object]], max_distance: int,
+                           frame_hashes: List[int]) -> Iterator[Tuple[int, object]]:
+        """
+        Drop frames that are near-duplicates of recently kept frames
+        
+        The dHash of every kept frame is appended to frame_hashes, so the
+        list ends up aligned with the extracted frame numbering.
+        """
+        recent = np.zeros(self.DEDUPE_WINDOW, dtype=np.uint64)
+        recent_count = 0
+        for frame_number, frame in frames:
+            frame_hash = dhash(frame)
+            window = recent[:min(recent_count, self.DEDUPE_WINDOW)]
+            if window.size and hamming_distances(window, frame_hash).min() <= max_distance:
+                continue
+            recent[recent_count % self.DEDUPE_WINDOW] = frame_hash
+            recent_count += 1
+            frame_hashes.append(frame_hash)
+            yield frame_number, frame
+    
+    def find_similar_frames(self, project_id: str, frame_index: int,
+                            max_distance: int = 10) -> List[Tuple[int, int]]:
+        """
+        Find frames of a project that look like a given frame
+        
+        Args:
+            project_id: Project identifier
+            frame_index: Index of the reference frame
+            max_distance: Largest Hamming distance counted as similar
+            
+        Returns:
+            List of (frame_index, distance) sorted by distance, excluding
+            the reference frame
+        """
+        hashes = load_hash_index(os.path.join(self.frames_folder, project_id))
+        if frame_index < 0 or frame_index >= len(hashes):
+            raise IndexError(f"Frame index {frame_index} out of range")
+        
+        distances = hamming_distances(hashes, int(hashes[frame_index]))
+        matches = np.flatnonzero(distances <= max_distance)
+        return sorted(((int(i), int(distances[i])) for i in matches if i != frame_index),
+                      key=lambda match: (match[1], match[0]))
+    
+    def _iter_scene_frames(self, cap, total_frames: int, fps: float, threshold: float,
+                           min_gap: float = None, max_gap: float = None
+                           ) -> Iterator[Tuple[int, object]]:
+        """
+        Yield (frame_number, frame) whenever the content changes
+        
+        Each analysed frame is compared with the last kept frame, so slow
+        drift is caught as well as hard cuts. Frames between analysis points
+        and inside min_gap are only grabbed, never decoded to BGR.
+        """
+        analysis_step = max(1, int(fps / self.SCENE_ANALYSIS_FPS)) if fps > 0 else 1
+        min_gap_frames = max(1, int(round(min_gap * fps))) if min_gap else 1
+        max_gap_frames = max(1, int(round(max_gap * fps))) if max_gap else None
+        
+        last_kept = None
+        last_signature = None
+        frame_number = 0
+        while total_frames <= 0 or frame_number < total_frames:
+            since_kept = frame_number - last_kept if last_kept is not None else None
+            analyse = last_kept is None or (
+                since_kept >= min_gap_frames and
+                (frame_number % analysis_step == 0 or
+                 (max_gap_frames is not None and since_kept >= max_gap_frames))
+            )
+            if not analyse:
+                if not cap.grab():
+                    break
+                frame_number += 1
+                continue
+            
+            ret, frame = cap.read()
+            if not ret:
+                break
+            signature = self.frame_signature(frame)
+            if (last_kept is None or
+                    (max_gap_frames is not None and since_kept >= max_gap_frames) or
+                    self.scene_change_score(last_signature, signature) >= threshold):
+                last_kept = frame_number
+                last_signature = signature
+                yield frame_number, frame
+            frame_number += 1
+    
+    def _iter_sampled_frames(self, cap, frame_interval: int, total_frames: int,
+                             strategy: str, start_frame: int = 0) -> Iterator[Tuple[int, object]]:
+        """
+        Yield (frame_number, frame) for every sampled frame of an open capture
+        
+        Only sampled frames are fully decoded: the 'grab' strategy advances
+        over skipped frames with grab(), the 'seek' strategy jumps straight
+        to each sampled frame with CAP_PROP_POS_FRAMES. Decoding stops at
+        total_frames (exclusive) when it is known.
+        """
+        if strategy == STRATEGY_SEEK and total_frames > 0:
+            for frame_number in range(start_frame, total_frames, frame_interval):
+                if frame_number and not cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number):
+                    break
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield frame_number, frame
+            return
+        
+        if start_frame and not cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame):
+            return
+        
+        frame_number = start_frame
+        while total_frames <= 0 or frame_number < total_frames:
+            if frame_number % frame_interval == 0:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield frame_number, frame
+            elif not cap.grab():
+                break
+            frame_number += 1
+    
+    def _iter_frame_numbers(self, cap, frame_numbers: List[int],
+                            strategy: str) -> Iterator[Tuple[int, object]]:
+        """
+        Yield (frame_number, frame) for an ascending list of frame numbers
+        
+        The 'seek' strategy jumps straight to each frame; 'grab' advances
+        over the frames in between without decoding them.
+        """
+        position = 0
+        for frame_number in frame_numbers:
+            if strategy == STRATEGY_SEEK:
+                if frame_number != position and not cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number):
+                    break
+            else:
+                while position < frame_number and cap.grab():
+                    position += 1
+                if position < frame_number:
+                    break
+            ret, frame = cap.read()
+            if not ret:
+                break
+            position = frame_number + 1
+            yield frame_number, frame
     
     def get_project_metadata(self, project_id: str) -> dict:
-        """Load project metadata"""
+        """
+        Load project metadata
+        
+        Parsed files are cached and revalidated against the file's mtime and
+        size, so repeated lookups cost a stat() instead of a JSON parse. The
+        returned dictionary is a shallow copy; nested lists are shared and
+        must not be modified.
+        """
         metadata_path = os.path.join(self.frames_folder, project_id, 'metadata.json')
-        if not os.path.exists(metadata_path):
+        try:
+            stat = os.stat(metadata_path)
+        except OSError:
             raise FileNotFoundError(f"Project metadata not found: {project_id}")
-            
+        
+        with self._metadata_lock:
+            cached = self._metadata_cache.get(project_id)
+            if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                self._metadata_cache.move_to_end(project_id)
+                return dict(cached[2])
+        
         with open(metadata_path, 'r') as f:
-            return json.load(f)
+            metadata = json.load(f)
+        
+        with self._metadata_lock:
+            self._metadata_cache[project_id] = (stat.st_mtime_ns, stat.st_size, metadata)
+            self._metadata_cache.move_to_end(project_id)
+            while len(self._metadata_cache) > self.METADATA_CACHE_SIZE:
+                self._metadata_cache.popitem(last=False)
+        return dict(metadata)
     
     def get_frame_path(self, project_id: str, frame_index: int) -> str:
-        """Get path to specific frame"""
+        """
+        Get path to specific frame
+        
+        Frames are numbered consecutively, so the path is built from the
+        manifest's filename pattern instead of a list of paths.
+        """
         metadata = self.get_project_metadata(project_id)
-        if frame_index < 0 or frame_index >= len(metadata['frame_paths']):
+        if frame_index < 0 or frame_index >= metadata['extracted_count']:
             raise IndexError(f"Frame index {frame_index} out of range")
-        return metadata['frame_paths'][frame_index]
+        return os.path.join(self.frames_folder, project_id, frame_filename(metadata, frame_index))
+    
+    def get_frame_index(self, project_id: str) -> np.ndarray:
+        """
+        Get the source frame number and timestamp of every extracted frame
+        
+        Returns:
+            Structured array with 'frame_number' and 'timestamp' (seconds)
+            fields, one record per frame index
+        """
+        metadata = self.get_project_metadata(project_id)
+        return load_frame_index(os.path.join(self.frames_folder, project_id), metadata)
     
     def list_projects(self) -> List[dict]:
         """List all available projects"""
@@ -133,7 +1562,73 @@ class VideoProcessor:
         import shutil
         
         project_path = os.path.join(self.frames_folder, project_id)
+        try:
+            # Pooled handles would keep the video open after it is gone
+            self.capture_pool.discard(self.get_project_metadata(project_id)['video_path'])
+        except (OSError, ValueError, KeyError):
+            pass
+        with self._metadata_lock:
+            self._metadata_cache.pop(project_id, None)
+        self._unindex_source(project_id)
         if os.path.exists(project_path):
             shutil.rmtree(project_path)
             return True
-        return False 
\ No newline at end of file
+        return False
+    
+    def close(self):
+        """Release the pooled video handles (e.g. when the server stops)"""
+        self.capture_pool.close()
+
+
+def _record_frame_index(cap, frames: Iterator[Tuple[int, object]],
+                        frame_index: List[Tuple[int, float]]) -> Iterator[Tuple[int, object]]:
+    """
+    Pass frames through, remembering their source frame numbers and timestamps
+    
+    Each frame arrives right after it was decoded, so the capture position
+    is that frame's presentation timestamp. Backends that do not report one
+    fall back to frame_number / fps.
+    """
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    for frame_number, frame in frames:
+        position = cap.get(cv2.CAP_PROP_POS_MSEC)
+        if isinstance(position, (int, float)) and (position > 0 or frame_number == 0):
+            timestamp = position / 1000.0
+        elif isinstance(fps, (int, float)) and fps > 0:
+            timestamp = frame_number / fps
+        else:
+            timestamp = 0.0
+        frame_index.append((frame_number, round(timestamp, 6)))
+        yield frame_number, frame
+
+
+def _extract_segment(frames_folder: str, video_path: str, project_folder: str,
+                     start_frame: int, end_frame: int, frame_interval: int,
+                     strategy: str, name_prefix: str, encoding: dict = None,
+                     cancel_event=None) -> Tuple[List[str], List[Tuple[int, float]]]:
+    """
+    Process-pool entry point: extract one segment with its own VideoCapture
+    
+    Returns the segment's frame paths and their (frame_number, timestamp)
+    records. Raises ExtractionCancelled at the next sampled frame once
+    cancel_event (an Event shared with the parent) is set.
+    """
+    def check_cancelled(frames_decoded: int, frames_written: int, total_frames: int):
+        if cancel_event.is_set():
+            raise ExtractionCancelled(f"Segment {name_prefix} cancelled")
+    
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video file: {video_path}")
+    try:
+        processor = VideoProcessor(frames_folder)
+        frame_index = []
+        paths = processor._write_sampled_frames(cap, project_folder, frame_interval,
+                                                start_frame, end_frame, strategy,
+                                                progress_callback=check_cancelled if cancel_event else None,
+                                                name_prefix=name_prefix,
+                                                encoder=FrameEncoder.from_settings(encoding),
+                                                frame_index=frame_index)
+        return paths, frame_index
+    finally:
+        cap.release()
@@ -6,6 +6,8 @@ class AnnotationWorkspace {
         this.projectId = container.dataset.projectId;
         this.currentFrame = parseInt(container.dataset.currentFrame) || 0;
         this.totalFrames = parseInt(container.dataset.totalFrames) || 0;
+        // Frames are cached as immutable; every extraction of a project has a new version
+        this.frameVersion = container.dataset.frameVersion || '0';
         this.annotations = [];
         this.selectedAnnotation = null;
         this.autoSave = true;
@@ -267,7 +269,7 @@ class AnnotationWorkspace {
         // Update image source
         const image = document.getElementById('annotationImage');
         if (image) {
-            image.src = `/api/frame/${this.projectId}/${frameIndex}`;
+            image.src = `/api/frame/${this.projectId}/${frameIndex}?v=${this.frameVersion}`;
         }
         
         // Load annotations for new frame
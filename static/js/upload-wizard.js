@@ -221,6 +221,23 @@ class UploadWizard {
             formData.append('video', this.selectedFile);
             formData.append('project_name', projectName);
             formData.append('frame_interval', frameInterval);
+            formData.append('lazy', document.getElementById('lazyExtraction').checked);
+            formData.append('image_format', document.getElementById('imageFormat').value);
+            
+            const samplingMode = document.getElementById('samplingMode').value;
+            formData.append('sampling', samplingMode);
+            if (samplingMode === 'scene') {
+                formData.append('min_gap', frameInterval);
+            } else if (samplingMode === 'count') {
+                formData.append('target_count', document.getElementById('targetCount').value);
+            }
+            if (document.getElementById('skipDuplicates').checked) {
+                formData.append('dedupe_distance', 'default');
+            }
+            const qualityFilter = document.getElementById('qualityFilter').value;
+            if (qualityFilter) {
+                formData.append('quality_filter', qualityFilter);
+            }
             
             const response = await fetch('/upload', {
                 method: 'POST',
@@ -229,7 +246,8 @@ class UploadWizard {
             
             if (response.ok) {
                 const result = await response.json();
-                this.showSuccess(result);
+                const job = await this.waitForJob(result.status_url);
+                this.showSuccess(job.result);
             } else {
                 const error = await response.json();
                 throw new Error(error.error || 'Upload failed');
@@ -242,6 +260,36 @@ class UploadWizard {
         }
     }
     
+    async waitForJob(statusUrl) {
+        const progressBar = document.getElementById('uploadProgress');
+        const progressText = document.getElementById('progressText');
+        
+        while (true) {
+            const response = await fetch(statusUrl);
+            const job = await response.json();
+            
+            if (!response.ok) {
+                throw new Error(job.error || 'Lost track of the extraction job');
+            }
+            
+            progressBar.style.width = `${job.progress}%`;
+            if (job.status === 'queued') {
+                progressText.textContent = 'Waiting for a free worker...';
+            } else if (job.status === 'running') {
+                const eta = job.eta_seconds !== null ? ` (about ${Math.ceil(job.eta_seconds)}s left)` : '';
+                progressText.textContent = `Extracted ${job.frames_written.toLocaleString()} frames${eta}`;
+            } else if (job.status === 'completed') {
+                return job;
+            } else if (job.status === 'cancelled') {
+                throw new Error('Extraction was cancelled');
+            } else {
+                throw new Error(job.error || 'Extraction failed');
+            }
+            
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+    }
+    
     showSuccess(result) {
         document.getElementById('processingStatus').classList.add('hidden');
         document.getElementById('successState').classList.remove('hidden');
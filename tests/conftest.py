@@ -165,6 +165,62 @@ def mock_video_file():
     os.unlink(temp_file.name)
 
 
+@pytest.fixture
+def avi_video_file():
+    """
+    Create a 90-frame MJPEG AVI, a container that can be read while it is written.
+    
+    Returns:
+        str: Path to the video file
+    """
+    temp_file = tempfile.NamedTemporaryFile(mode='wb', suffix='.avi', delete=False)
+    temp_file.close()
+    
+    out = cv2.VideoWriter(temp_file.name, cv2.VideoWriter_fourcc(*'MJPG'), 30.0, (320, 240))
+    for i in range(90):
+        frame = np.full((240, 320, 3), (i * 2, 255 - i * 2, 128), dtype=np.uint8)
+        cv2.putText(frame, f'{i}', (100, 140), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+        out.write(frame)
+    out.release()
+    
+    yield temp_file.name
+    os.unlink(temp_file.name)
+
+
+@pytest.fixture
+def slow_upload(tmp_path):
+    """
+    Factory copying a video to a new file in small chunks on a background thread.
+    
+    Returns:
+        Callable: slow_upload(video_path, chunk_size=8192) -> (GrowingFile, thread)
+    """
+    from modules.growing_capture import GrowingFile
+    import threading
+    import time
+    
+    def start(video_path, chunk_size=8192, delay=0.002):
+        with open(video_path, 'rb') as f:
+            data = f.read()
+        target = str(tmp_path / f"upload_{os.path.basename(video_path)}")
+        open(target, 'wb').close()
+        growing = GrowingFile(target)
+        
+        def write():
+            with open(target, 'ab') as f:
+                for offset in range(0, len(data), chunk_size):
+                    f.write(data[offset:offset + chunk_size])
+                    f.flush()
+                    growing.grew(f.tell())
+                    time.sleep(delay)
+            growing.finish('feed')
+        
+        thread = threading.Thread(target=write, daemon=True)
+        thread.start()
+        return growing, thread
+    return start
+
+
 @pytest.fixture
 def video_processor(app):
     """
@@ -0,0 +1,254 @@
+"""
+Unit tests for VisionLabel Pro pooled VideoCapture handles.
+
+This module tests the capture pool including:
+- Handle reuse and LRU trimming
+- Forward decoding versus seeking
+- Idle eviction and failure handling
+- Frame accuracy against sequential decoding
+"""
+
+import pytest
+import threading
+import time
+from unittest.mock import patch, MagicMock
+import cv2
+import numpy as np
+
+from modules.capture_pool import CapturePool, PooledCapture
+
+
+def make_mock_capture():
+    """Create a mock capture whose reads always succeed"""
+    mock_cap = MagicMock()
+    mock_cap.isOpened.return_value = True
+    mock_cap.read.return_value = (True, np.zeros((4, 4, 3), dtype=np.uint8))
+    mock_cap.grab.return_value = True
+    mock_cap.set.return_value = True
+    return mock_cap
+
+
+@pytest.mark.unit
+class TestPooledCapture:
+    """Test positioning of a single pooled capture"""
+
+    def test_sequential_read_decodes_forward(self):
+        """Test that a short forward gap is covered by grabbing"""
+        mock_cap = make_mock_capture()
+        handle = PooledCapture('/videos/a.mp4', mock_cap)
+        handle.position = 30
+
+        ret, _ = handle.read_frame(40, max_forward_frames=120)
+
+        assert ret is True
+        assert mock_cap.grab.call_count == 10
+        mock_cap.set.assert_not_called()
+        assert handle.position == 41
+
+    def test_backward_read_seeks(self):
+        """Test that going backwards seeks"""
+        mock_cap = make_mock_capture()
+        handle = PooledCapture('/videos/a.mp4', mock_cap)
+        handle.position = 300
+
+        handle.read_frame(10, max_forward_frames=120)
+
+        mock_cap.set.assert_called_once_with(cv2.CAP_PROP_POS_FRAMES, 10)
+        mock_cap.grab.assert_not_called()
+
+    def test_far_forward_read_seeks(self):
+        """Test that a long forward jump seeks instead of decoding"""
+        mock_cap = make_mock_capture()
+        handle = PooledCapture('/videos/a.mp4', mock_cap)
+
+        handle.read_frame(5000, max_forward_frames=120)
+
+        mock_cap.set.assert_called_once_with(cv2.CAP_PROP_POS_FRAMES, 5000)
+
+    def test_failed_read_invalidates_position(self):
+        """Test that a failed read leaves the handle unusable"""
+        mock_cap = make_mock_capture()
+        mock_cap.read.return_value = (False, None)
+        handle = PooledCapture('/videos/a.mp4', mock_cap)
+
+        ret, frame = handle.read_frame(0, max_forward_frames=120)
+
+        assert ret is False
+        assert handle.position == -1
+
+    def test_failed_positioning_invalidates_position(self):
+        """Test that a failed seek or grab leaves the handle unusable"""
+        mock_cap = make_mock_capture()
+        mock_cap.set.return_value = False
+        handle = PooledCapture('/videos/a.mp4', mock_cap)
+
+        assert handle.read_frame(5000, max_forward_frames=120) == (False, None)
+        assert handle.position == -1
+
+        mock_cap.grab.return_value = False
+        handle.position = 0
+        assert handle.read_frame(10, max_forward_frames=120) == (False, None)
+        assert handle.position == -1
+
+
+@pytest.mark.unit
+class TestCapturePool:
+    """Test checkout, reuse and eviction"""
+
+    @patch('cv2.VideoCapture')
+    def test_handle_reused_between_requests(self, mock_capture):
+        """Test that a video is opened once for consecutive requests"""
+        mock_capture.side_effect = lambda path: make_mock_capture()
+        pool = CapturePool(max_handles=4)
+
+        pool.read_frame('/videos/a.mp4', 0)
+        pool.read_frame('/videos/a.mp4', 30)
+        pool.read_frame('/videos/a.mp4', 60)
+
+        assert mock_capture.call_count == 1
+        assert pool.stats['reused'] == 2
+        assert len(pool) == 1
+
+    @patch('cv2.VideoCapture')
+    def test_handle_at_end_is_not_reused(self, mock_capture):
+        """Test that a handle that grabbed past the end is released"""
+        mock_cap = make_mock_capture()
+        mock_cap.grab.return_value = False
+        mock_capture.return_value = mock_cap
+        pool = CapturePool(max_handles=4)
+
+        assert pool.read_frame('/videos/a.mp4', 10) == (False, None)
+
+        assert len(pool) == 0
+        mock_cap.release.assert_called_once()
+
+    @patch('cv2.VideoCapture')
+    def test_lru_trimming(self, mock_capture):
+        """Test that the least recently used handle is released"""
+        captures = {}
+
+        def open_capture(path):
+            captures[path] = make_mock_capture()
+            return captures[path]
+
+        mock_capture.side_effect = open_capture
+        pool = CapturePool(max_handles=2)
+
+        pool.read_frame('/videos/a.mp4', 0)
+        pool.read_frame('/videos/b.mp4', 0)
+        pool.read_frame('/videos/c.mp4', 0)
+
+        assert len(pool) == 2
+        captures['/videos/a.mp4'].release.assert_called_once()
+        captures['/videos/c.mp4'].release.assert_not_called()
+
+    @patch('cv2.VideoCapture')
+    def test_idle_eviction(self, mock_capture):
+        """Test that idle handles are released after the timeout"""
+        mock_cap = make_mock_capture()
+        mock_capture.return_value = mock_cap
+        pool = CapturePool(max_handles=4, idle_timeout=0)
+
+        pool.read_frame('/videos/a.mp4', 0)
+
+        assert pool.evict_idle() == 1
+        assert len(pool) == 0
+        mock_cap.release.assert_called_once()
+
+    @patch('cv2.VideoCapture')
+    def test_idle_handles_released_without_traffic(self, mock_capture):
+        """Test that the eviction timer releases handles when no checkout follows"""
+        mock_cap = make_mock_capture()
+        mock_capture.return_value = mock_cap
+        pool = CapturePool(max_handles=4, idle_timeout=0)
+        pool.MIN_EVICTION_DELAY = 0.05
+
+        pool.read_frame('/videos/a.mp4', 0)
+
+        for _ in range(50):
+            if len(pool) == 0:
+                break
+            time.sleep(0.05)
+        assert len(pool) == 0
+        mock_cap.release.assert_called_once()
+
+    @patch('cv2.VideoCapture')
+    def test_discard_and_close(self, mock_capture):
+        """Test that handles of one video, then all handles, can be released"""
+        captures = {}
+
+        def open_capture(path):
+            captures[path] = make_mock_capture()
+            return captures[path]
+
+        mock_capture.side_effect = open_capture
+        pool = CapturePool(max_handles=4)
+        pool.read_frame('/videos/a.mp4', 0)
+        pool.read_frame('/videos/b.mp4', 0)
+
+        pool.discard('/videos/a.mp4')
+
+        assert len(pool) == 1
+        captures['/videos/a.mp4'].release.assert_called_once()
+        pool.close()
+        assert len(pool) == 0
+        captures['/videos/b.mp4'].release.assert_called_once()
+        assert pool._eviction_timer is None
+
+    @patch('cv2.VideoCapture')
+    def test_open_failure(self, mock_capture):
+        """Test that unopenable videos raise ValueError and leak nothing"""
+        mock_cap = MagicMock()
+        mock_cap.isOpened.return_value = False
+        mock_capture.return_value = mock_cap
+        pool = CapturePool()
+
+        with pytest.raises(ValueError):
+            pool.read_frame('/videos/missing.mp4', 0)
+
+        assert len(pool) == 0
+
+    @patch('cv2.VideoCapture')
+    def test_concurrent_checkouts_get_separate_handles(self, mock_capture):
+        """Test that a checked-out handle is never shared"""
+        mock_capture.side_effect = lambda path: make_mock_capture()
+        pool = CapturePool(max_handles=4)
+        barrier = threading.Barrier(2)
+        handles = []
+
+        def worker():
+            with pool.checkout('/videos/a.mp4', 0) as handle:
+                handles.append(handle)
+                barrier.wait(5)
+
+        threads = [threading.Thread(target=worker) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert handles[0] is not handles[1]
+        assert len(pool) == 2
+
+
+@pytest.mark.integration
+class TestCapturePoolIntegration:
+    """Test pooled decoding against a real video"""
+
+    def test_random_access_matches_sequential_decode(self, mock_video_file):
+        """Test that pooled reads return the same pixels as a linear decode"""
+        cap = cv2.VideoCapture(mock_video_file)
+        reference = []
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            reference.append(frame)
+        cap.release()
+
+        pool = CapturePool(max_handles=2, max_forward_frames=10)
+        for frame_number in [0, 5, 6, 40, 12, 89]:
+            ret, frame = pool.read_frame(mock_video_file, frame_number)
+            assert ret is True
+            assert np.array_equal(frame, reference[frame_number])
+        pool.close()
@@ -8,6 +8,7 @@ This module tests all data storage functionality including:
 - JSON file operations and error handling
 - Dataset statistics and analytics
 - File system operations and cleanup
+- Moving annotations to re-sampled frames
 """
 
 import pytest
@@ -16,6 +17,7 @@ import json
 import tempfile
 import shutil
 import zipfile
+import numpy as np
 from unittest.mock import patch, mock_open, MagicMock
 from datetime import datetime
 
@@ -484,6 +486,51 @@ class TestProjectManagement:
             assert loaded_metadata[key] == value
 
 
+@pytest.mark.unit
+class TestAnnotationRemapping:
+    """Test moving annotations to re-sampled frames"""
+    
+    def test_annotations_follow_timestamps(self, label_storage, sample_annotations):
+        """Test that annotated frames move to the frame with the same timestamp"""
+        label_storage.save_annotation('remap', 1, '/old/frame_000001.jpg', sample_annotations)
+        label_storage.save_annotation('remap', 2, '/old/frame_000002.jpg', sample_annotations)
+        new_paths = [f'/new/frame_{i:06d}.jpg' for i in range(6)]
+        
+        result = label_storage.remap_frames('remap', [0.0, 1.0, 2.0], np.arange(6) * 0.5,
+                                            new_paths, tolerance=0.02)
+        
+        assert result == {'matched': 2, 'unmatched': 0}
+        frames = label_storage.get_annotations('remap')['frames']
+        assert sorted(frames) == ['2', '4']
+        assert frames['2']['frame_path'] == '/new/frame_000002.jpg'
+        assert frames['4']['timestamp'] == 2.0
+        assert frames['4']['annotations'] == sample_annotations
+    
+    def test_unmatched_frames_are_kept(self, label_storage, sample_annotations):
+        """Test that labels of dropped frames come back when the frame returns"""
+        label_storage.save_annotation('remap', 1, '/old/frame_000001.jpg', sample_annotations)
+        
+        result = label_storage.remap_frames('remap', [0.0, 0.5, 1.0], [0.0, 1.0],
+                                            ['/a.jpg', '/b.jpg'], tolerance=0.02)
+        
+        assert result == {'matched': 0, 'unmatched': 1}
+        stored = label_storage.get_annotations('remap')
+        assert stored['frames'] == {}
+        assert stored['unmatched_frames'][0]['timestamp'] == 0.5
+        
+        result = label_storage.remap_frames('remap', [0.0, 1.0], [0.0, 0.5, 1.0],
+                                            ['/a.jpg', '/b.jpg', '/c.jpg'], tolerance=0.02)
+        
+        assert result == {'matched': 1, 'unmatched': 0}
+        assert label_storage.get_annotations('remap', 1)['annotations'] == sample_annotations
+    
+    def test_project_without_annotations(self, label_storage):
+        """Test that remapping a project without labels is a no-op"""
+        result = label_storage.remap_frames('unlabelled', [0.0], [0.0], ['/a.jpg'], tolerance=0.02)
+        
+        assert result == {'matched': 0, 'unmatched': 0}
+
+
 @pytest.mark.integration
 class TestDataStorageIntegration:
     """Integration tests for data storage system"""
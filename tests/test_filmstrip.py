@@ -0,0 +1,121 @@
+"""
+Unit tests for VisionLabel Pro filmstrip sprites.
+
+This module tests filmstrip sprite sheets including:
+- Sprite layout and offset maps
+- Range clamping and validation
+- On-disk caching of built sprites
+- Sprites for lazily extracted projects
+"""
+
+import pytest
+import os
+from unittest.mock import patch
+import cv2
+
+from modules.filmstrip import FilmstripCache
+
+
+@pytest.fixture
+def extracted_project(video_processor, mock_video_file):
+    """
+    Extract a 13-frame project from the mock video.
+    
+    Returns:
+        str: Project ID
+    """
+    project_id, frame_paths, metadata = video_processor.extract_frames(
+        mock_video_file, interval=0.25, project_name='filmstrip_test'
+    )
+    return project_id
+
+
+@pytest.mark.unit
+class TestFilmstripLayout:
+    """Test sprite assembly"""
+    
+    def test_offset_map_matches_sprite(self, video_processor, extracted_project):
+        """Test that every tile offset lies inside the sprite image"""
+        cache = FilmstripCache(video_processor)
+        sprite_path, offset_map = cache.get(extracted_project, start=0, count=12)
+        
+        sprite = cv2.imread(sprite_path)
+        assert sprite.shape[:2] == (offset_map['sprite_height'], offset_map['sprite_width'])
+        assert offset_map['columns'] == 10
+        assert sprite.shape[0] == 2 * FilmstripCache.TILE_HEIGHT
+        assert [f['frame_index'] for f in offset_map['frames']] == list(range(12))
+        
+        tile = offset_map['frames'][11]
+        assert (tile['x'], tile['y']) == (offset_map['tile_width'], FilmstripCache.TILE_HEIGHT)
+        assert tile['width'] == 96  # 640x480 frames at 72 px high
+    
+    def test_count_clamped_to_project_end(self, video_processor, extracted_project):
+        """Test that ranges past the last frame are shortened"""
+        cache = FilmstripCache(video_processor)
+        sprite_path, offset_map = cache.get(extracted_project, start=10, count=100)
+        
+        assert offset_map['count'] == 3
+        assert offset_map['frames'][-1]['frame_index'] == 12
+    
+    def test_start_out_of_range(self, video_processor, extracted_project):
+        """Test that a start index outside the project is rejected"""
+        cache = FilmstripCache(video_processor)
+        
+        with pytest.raises(IndexError):
+            cache.get(extracted_project, start=13)
+        with pytest.raises(IndexError):
+            cache.get(extracted_project, start=-1)
+    
+    def test_missing_project(self, video_processor):
+        """Test that unknown projects raise FileNotFoundError"""
+        with pytest.raises(FileNotFoundError):
+            FilmstripCache(video_processor).get('missing')
+
+
+@pytest.mark.unit
+class TestFilmstripCaching:
+    """Test on-disk caching"""
+    
+    def test_second_request_uses_cache(self, video_processor, extracted_project):
+        """Test that a cached sprite is not rebuilt"""
+        cache = FilmstripCache(video_processor)
+        first_path, first_map = cache.get(extracted_project, start=0, count=5)
+        
+        with patch.object(cache, '_build') as mock_build:
+            second_path, second_map = cache.get(extracted_project, start=0, count=5)
+        
+        mock_build.assert_not_called()
+        assert second_path == first_path
+        assert second_map == first_map
+    
+    def test_resample_drops_sprites(self, video_processor, extracted_project):
+        """Test that sprites of the old frames are rebuilt after a re-sample"""
+        cache = FilmstripCache(video_processor)
+        sprite_path, offset_map = cache.get(extracted_project, start=0, count=5)
+        
+        video_processor.resample_project(extracted_project, interval=0.5)
+        
+        assert not os.path.exists(sprite_path)
+        with patch.object(cache, '_build', wraps=cache._build) as build:
+            cache.get(extracted_project, start=0, count=5)
+        build.assert_called_once()
+    
+    def test_delete_drops_sprites(self, video_processor, extracted_project):
+        """Test that deleting a project leaves none of its sprites on disk"""
+        cache = FilmstripCache(video_processor)
+        sprite_path, offset_map = cache.get(extracted_project, start=0, count=5)
+        
+        video_processor.delete_project(extracted_project)
+        
+        assert not os.path.exists(os.path.dirname(sprite_path))
+    
+    def test_lazy_project_sprite(self, video_processor, mock_video_file):
+        """Test that sprites of lazy projects decode only the frames they need"""
+        project_id, frame_paths, metadata = video_processor.create_lazy_project(
+            mock_video_file, interval=0.5
+        )
+        
+        sprite_path, offset_map = FilmstripCache(video_processor).get(project_id, start=2, count=2)
+        
+        assert offset_map['count'] == 2
+        assert [os.path.exists(p) for p in frame_paths] == [False, False, True, True, False, False]
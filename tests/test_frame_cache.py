@@ -0,0 +1,88 @@
+"""
+Unit tests for VisionLabel Pro in-memory frame cache.
+
+This module tests the frame byte cache including:
+- Hit/miss accounting
+- LRU eviction by item count and total bytes
+- Oversized values and clearing
+"""
+
+import pytest
+
+from modules.frame_cache import FrameByteCache
+
+
+@pytest.mark.unit
+class TestFrameByteCache:
+    """Test the LRU frame byte cache"""
+    
+    def test_hit_and_miss_counters(self):
+        """Test that lookups are counted"""
+        cache = FrameByteCache(max_items=4, max_bytes=1024)
+        cache.put('a', b'frame-a')
+        
+        assert cache.get('a') == b'frame-a'
+        assert cache.get('b') is None
+        
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses']) == (1, 1)
+        assert stats['hit_rate'] == 0.5
+    
+    def test_evicts_least_recently_used_by_count(self):
+        """Test that the item limit evicts the least recently used entry"""
+        cache = FrameByteCache(max_items=2, max_bytes=1024)
+        cache.put('a', b'1')
+        cache.put('b', b'2')
+        cache.get('a')
+        cache.put('c', b'3')
+        
+        assert cache.get('b') is None
+        assert cache.get('a') == b'1'
+        assert cache.get('c') == b'3'
+        assert cache.stats()['evictions'] == 1
+    
+    def test_evicts_by_total_bytes(self):
+        """Test that the byte limit is enforced"""
+        cache = FrameByteCache(max_items=100, max_bytes=10)
+        cache.put('a', b'x' * 4)
+        cache.put('b', b'x' * 4)
+        cache.put('c', b'x' * 4)
+        
+        assert len(cache) == 2
+        assert cache.stats()['bytes'] == 8
+        assert cache.get('a') is None
+    
+    def test_replacing_key_updates_size(self):
+        """Test that re-putting a key does not double count its bytes"""
+        cache = FrameByteCache(max_items=10, max_bytes=100)
+        cache.put('a', b'x' * 40)
+        cache.put('a', b'x' * 10)
+        
+        assert cache.stats()['bytes'] == 10
+        assert len(cache) == 1
+    
+    def test_oversized_value_not_cached(self):
+        """Test that values larger than the cache are skipped"""
+        cache = FrameByteCache(max_items=10, max_bytes=10)
+        cache.put('small', b'x')
+        
+        assert cache.put('big', b'x' * 11) is False
+        assert cache.get('small') == b'x'
+    
+    def test_disabled_cache(self):
+        """Test that a zero-item cache stores nothing"""
+        cache = FrameByteCache(max_items=0)
+        
+        assert cache.put('a', b'1') is False
+        assert cache.get('a') is None
+    
+    def test_clear(self):
+        """Test that clearing drops entries but keeps counters"""
+        cache = FrameByteCache()
+        cache.put('a', b'1')
+        cache.get('a')
+        cache.clear()
+        
+        assert len(cache) == 0
+        assert cache.stats()['bytes'] == 0
+        assert cache.stats()['hits'] == 1
@@ -0,0 +1,119 @@
+"""
+Unit tests for VisionLabel Pro frame encoding.
+
+This module tests frame encoding including:
+- Format, quality and backend validation
+- JPEG, WebP and PNG output
+- Settings round trip through project metadata
+- Mimetype lookup for served frames
+"""
+
+import pytest
+import os
+import tempfile
+import shutil
+import cv2
+import numpy as np
+
+from modules import frame_encoder
+from modules.frame_encoder import FrameEncoder, mimetype_for_path
+
+
+def make_frame():
+    """Create a small frame with some detail"""
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    cv2.circle(frame, (80, 60), 40, (40, 180, 220), -1)
+    cv2.putText(frame, 'VL', (20, 110), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+    return frame
+
+
+@pytest.mark.unit
+class TestFrameEncoderSettings:
+    """Test encoder configuration"""
+    
+    def test_defaults_match_opencv(self):
+        """Test that the default encoder writes JPEG at OpenCV's default quality"""
+        encoder = FrameEncoder()
+        
+        assert encoder.extension == '.jpg'
+        assert encoder.mimetype == 'image/jpeg'
+        assert encoder.quality == 95
+        assert encoder.encode(make_frame()) == cv2.imencode('.jpg', make_frame())[1].tobytes()
+    
+    def test_invalid_settings(self):
+        """Test that unknown formats, backends and qualities are rejected"""
+        with pytest.raises(ValueError):
+            FrameEncoder('gif')
+        with pytest.raises(ValueError):
+            FrameEncoder('jpeg', jpeg_backend='mozjpeg')
+        with pytest.raises(ValueError):
+            FrameEncoder('jpeg', quality=0)
+    
+    def test_auto_backend_falls_back_to_opencv(self, monkeypatch):
+        """Test that 'auto' uses OpenCV when libjpeg-turbo is missing"""
+        monkeypatch.setattr(frame_encoder, 'TurboJPEG', None)
+        
+        assert FrameEncoder('jpeg', jpeg_backend='auto').backend == 'opencv'
+        with pytest.raises(ValueError):
+            FrameEncoder('jpeg', jpeg_backend='turbojpeg')
+    
+    def test_settings_round_trip(self):
+        """Test rebuilding an encoder from metadata"""
+        encoder = FrameEncoder('webp', quality=70)
+        rebuilt = FrameEncoder.from_settings(encoder.to_dict())
+        
+        assert rebuilt.to_dict() == encoder.to_dict()
+        assert FrameEncoder.from_settings(None).to_dict() == FrameEncoder().to_dict()
+    
+    def test_mimetype_for_path(self):
+        """Test mimetype lookup from frame file names"""
+        assert mimetype_for_path('/f/frame_000001.jpg') == 'image/jpeg'
+        assert mimetype_for_path('/f/frame_000001.webp') == 'image/webp'
+        assert mimetype_for_path('/f/frame_000001.PNG') == 'image/png'
+        assert mimetype_for_path('/f/frame_000001.bin') == 'application/octet-stream'
+
+
+@pytest.mark.unit
+class TestFrameEncoderOutput:
+    """Test written frame files"""
+    
+    def setup_method(self):
+        self.folder = tempfile.mkdtemp()
+    
+    def teardown_method(self):
+        shutil.rmtree(self.folder)
+    
+    @pytest.mark.parametrize('image_format', ['jpeg', 'webp', 'png'])
+    def test_written_frames_decode(self, image_format):
+        """Test that every format produces a readable image"""
+        encoder = FrameEncoder(image_format)
+        frame_path = os.path.join(self.folder, f"frame_000000{encoder.extension}")
+        
+        encoder.write(frame_path, make_frame())
+        
+        decoded = cv2.imread(frame_path)
+        assert decoded.shape == (120, 160, 3)
+    
+    def test_failed_write_raises(self):
+        """Test that a frame that could not be written is reported"""
+        frame_path = os.path.join(self.folder, 'missing', 'frame_000000.jpg')
+        
+        with pytest.raises(OSError, match='Could not write frame'):
+            FrameEncoder().write(frame_path, make_frame())
+    
+    def test_png_is_lossless(self):
+        """Test that PNG frames keep exact pixel values"""
+        frame = make_frame()
+        frame_path = os.path.join(self.folder, 'frame_000000.png')
+        
+        FrameEncoder('png').write(frame_path, frame)
+        
+        assert np.array_equal(cv2.imread(frame_path), frame)
+    
+    def test_lower_quality_is_smaller(self):
+        """Test that the quality setting reaches the encoder"""
+        rng = np.random.default_rng(0)
+        frame = rng.integers(0, 256, (120, 160, 3), dtype=np.uint8)
+        
+        assert len(FrameEncoder('jpeg', 50).encode(frame)) < len(FrameEncoder('jpeg', 95).encode(frame))
+        assert len(FrameEncoder('webp', 50).encode(frame)) < len(FrameEncoder('webp', 95).encode(frame))
@@ -0,0 +1,109 @@
+"""
+Unit tests for VisionLabel Pro perceptual frame hashing.
+
+This module tests frame hashing including:
+- dHash stability under re-encoding and resizing
+- Hamming distance computation
+- Hash index persistence
+"""
+
+import pytest
+import os
+import tempfile
+import shutil
+import cv2
+import numpy as np
+
+from modules.frame_hash import dhash, hamming_distances, save_hash_index, load_hash_index
+
+
+def make_textured_frame(seed=0):
+    """Create a smooth random texture that survives downscaling"""
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 256, (12, 16, 3), dtype=np.uint8)
+    return cv2.resize(small, (640, 480), interpolation=cv2.INTER_CUBIC)
+
+
+@pytest.mark.unit
+class TestDHash:
+    """Test difference hash computation"""
+    
+    def test_hash_is_64_bit(self):
+        """Test that the hash fits in 64 bits"""
+        value = dhash(make_textured_frame())
+        
+        assert 0 <= value < 2 ** 64
+    
+    def test_recompressed_frame_is_near_duplicate(self):
+        """Test that JPEG recompression barely changes the hash"""
+        frame = make_textured_frame()
+        _, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 40])
+        recompressed = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+        
+        distance = hamming_distances(np.array([dhash(frame)], dtype=np.uint64), dhash(recompressed))
+        assert distance[0] <= 4
+    
+    def test_resized_frame_is_near_duplicate(self):
+        """Test that resolution changes barely change the hash"""
+        frame = make_textured_frame()
+        resized = cv2.resize(frame, (320, 240), interpolation=cv2.INTER_AREA)
+        
+        distance = hamming_distances(np.array([dhash(frame)], dtype=np.uint64), dhash(resized))
+        assert distance[0] <= 4
+    
+    def test_different_frames_are_far_apart(self):
+        """Test that unrelated frames differ in many bits"""
+        distance = hamming_distances(np.array([dhash(make_textured_frame(1))], dtype=np.uint64),
+                                     dhash(make_textured_frame(2)))
+        assert distance[0] > 10
+    
+    def test_grayscale_input(self):
+        """Test that single-channel frames hash like their colour source"""
+        frame = make_textured_frame()
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        
+        assert dhash(gray) == dhash(frame)
+
+
+@pytest.mark.unit
+class TestHammingDistance:
+    """Test vectorised Hamming distances"""
+    
+    def test_known_distances(self):
+        """Test distances against hand-computed values"""
+        hashes = np.array([0, 1, 0b1011, 2 ** 64 - 1], dtype=np.uint64)
+        
+        assert list(hamming_distances(hashes, 0)) == [0, 1, 3, 64]
+    
+    def test_high_bit_values(self):
+        """Test that values above 2**63 are handled"""
+        hashes = np.array([2 ** 63], dtype=np.uint64)
+        
+        assert list(hamming_distances(hashes, 2 ** 63 + 1)) == [1]
+
+
+@pytest.mark.unit
+class TestHashIndex:
+    """Test hash index persistence"""
+    
+    def test_round_trip(self):
+        """Test saving and loading a project's hashes"""
+        project_folder = tempfile.mkdtemp()
+        try:
+            hashes = [0, 12345, 2 ** 64 - 1]
+            save_hash_index(project_folder, hashes)
+            
+            loaded = load_hash_index(project_folder)
+            assert loaded.dtype == np.uint64
+            assert [int(h) for h in loaded] == hashes
+        finally:
+            shutil.rmtree(project_folder)
+    
+    def test_missing_index(self):
+        """Test that a missing index raises FileNotFoundError"""
+        project_folder = tempfile.mkdtemp()
+        try:
+            with pytest.raises(FileNotFoundError):
+                load_hash_index(project_folder)
+        finally:
+            shutil.rmtree(project_folder)
@@ -0,0 +1,168 @@
+"""
+Unit tests for VisionLabel Pro decoding of videos that are still being uploaded.
+
+This module tests the growing capture including:
+- Waiting for, completing and abandoning a growing file
+- Frame and timestamp accuracy against decoding the complete file
+- Waiting for the container header
+- Abandoned and stalled uploads
+"""
+
+import pytest
+import threading
+import time
+import cv2
+import numpy as np
+
+from modules.growing_capture import GrowingFile, GrowingCapture, SourceAborted
+
+
+def read_all(cap, every=1):
+    """Read every `every`-th frame, grabbing the others, until the capture ends"""
+    frames = []
+    frame_number = 0
+    while True:
+        if frame_number % every == 0:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append((frame_number, frame, cap.get(cv2.CAP_PROP_POS_MSEC)))
+        elif not cap.grab():
+            break
+        frame_number += 1
+    return frames
+
+
+@pytest.mark.unit
+class TestGrowingFile:
+    """Test the progress shared between an upload and its readers"""
+    
+    def test_wait_for_growth(self, tmp_path):
+        """Test that readers are woken when the file grows"""
+        path = tmp_path / 'video.avi'
+        path.write_bytes(b'x' * 10)
+        growing = GrowingFile(str(path))
+        
+        assert growing.size == 10
+        assert growing.wait(10, timeout=0.01) is False
+        
+        threading.Timer(0.05, growing.grew, args=(20,)).start()
+        assert growing.wait(10, timeout=5) is True
+        assert growing.size == 20
+    
+    def test_finish_and_abort(self, tmp_path):
+        """Test that completion and abandonment end a wait"""
+        path = tmp_path / 'video.avi'
+        path.write_bytes(b'x' * 30)
+        growing = GrowingFile(str(path))
+        
+        growing.finish('abc')
+        assert growing.complete and growing.size == 30 and growing.sha256 == 'abc'
+        assert growing.wait(30, timeout=0.01) is True
+        
+        aborted = GrowingFile(str(path))
+        aborted.abort()
+        assert aborted.aborted
+        assert aborted.wait(30, timeout=0.01) is True
+
+
+@pytest.mark.unit
+class TestGrowingCapture:
+    """Test reading a video while it is being written"""
+    
+    def test_frames_match_complete_file(self, avi_video_file, slow_upload):
+        """Test that every frame and timestamp equals a read of the finished file"""
+        expected = read_all(cv2.VideoCapture(avi_video_file))
+        growing, writer = slow_upload(avi_video_file)
+        
+        cap = GrowingCapture(growing)
+        frames = read_all(cap)
+        writer.join()
+        
+        assert len(frames) == len(expected) == 90
+        for (n, frame, msec), (_, expected_frame, expected_msec) in zip(frames, expected):
+            assert np.array_equal(frame, expected_frame), n
+            assert msec == expected_msec
+        assert cap.get(cv2.CAP_PROP_FRAME_COUNT) == 90
+    
+    def test_grab_skips_frames(self, avi_video_file, slow_upload):
+        """Test that grabbed frames keep the frame numbering in step"""
+        expected = read_all(cv2.VideoCapture(avi_video_file), every=7)
+        growing, writer = slow_upload(avi_video_file, chunk_size=4096)
+        
+        frames = read_all(GrowingCapture(growing), every=7)
+        writer.join()
+        
+        assert [n for n, _, _ in frames] == [n for n, _, _ in expected]
+        assert all(np.array_equal(a[1], b[1]) for a, b in zip(frames, expected))
+    
+    def test_waits_for_header(self, avi_video_file, tmp_path):
+        """Test that opening waits until the container header is on disk"""
+        with open(avi_video_file, 'rb') as f:
+            data = f.read()
+        path = tmp_path / 'upload.avi'
+        path.write_bytes(b'')
+        growing = GrowingFile(str(path))
+        
+        def finish():
+            time.sleep(0.1)
+            path.write_bytes(data)
+            growing.finish()
+        threading.Thread(target=finish).start()
+        
+        cap = GrowingCapture(growing)
+        assert cap.isOpened()
+        assert len(read_all(cap)) == 90
+    
+    def test_complete_file(self, avi_video_file):
+        """Test that a finished upload is read directly"""
+        growing = GrowingFile(avi_video_file)
+        growing.finish()
+        cap = GrowingCapture(growing)
+        
+        assert cap.set(cv2.CAP_PROP_POS_FRAMES, 80)
+        assert len(read_all(cap)) == 10
+    
+    def test_abandoned_upload(self, avi_video_file, tmp_path):
+        """Test that readers stop when the upload is abandoned"""
+        with open(avi_video_file, 'rb') as f:
+            data = f.read()
+        path = tmp_path / 'upload.avi'
+        path.write_bytes(data[:len(data) // 2])
+        growing = GrowingFile(str(path))
+        cap = GrowingCapture(growing)
+        
+        threading.Timer(0.1, growing.abort).start()
+        with pytest.raises(SourceAborted):
+            read_all(cap)
+    
+    def test_stalled_upload(self, avi_video_file, tmp_path):
+        """Test that readers give up when no data arrives"""
+        with open(avi_video_file, 'rb') as f:
+            data = f.read()
+        path = tmp_path / 'upload.avi'
+        path.write_bytes(data[:len(data) // 2])
+        cap = GrowingCapture(GrowingFile(str(path)), stall_timeout=0.1)
+        
+        with pytest.raises(SourceAborted):
+            read_all(cap)
+    
+    def test_waiting_reader_can_be_stopped(self, avi_video_file, tmp_path):
+        """Test that on_wait is polled while waiting and may stop the reader"""
+        with open(avi_video_file, 'rb') as f:
+            data = f.read()
+        path = tmp_path / 'upload.avi'
+        path.write_bytes(data[:len(data) // 2])
+        calls = []
+        
+        def on_wait():
+            calls.append(time.monotonic())
+            if len(calls) == 3:
+                raise RuntimeError('cancelled')
+        
+        cap = GrowingCapture(GrowingFile(str(path)), stall_timeout=60.0,
+                             on_wait=on_wait, poll_interval=0.01)
+        
+        with pytest.raises(RuntimeError):
+            read_all(cap)
+        assert len(calls) == 3
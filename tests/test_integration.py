@@ -43,9 +43,14 @@ class TestEndToEndWorkflows:
                     'project_name': 'Workflow Test'
                 })
             
-            assert upload_response.status_code == 200
+            assert upload_response.status_code == 202
             upload_data = json.loads(upload_response.data)
-            project_id = upload_data['project_id']
+            
+            # Wait for the background extraction job
+            from modules import routes
+            routes.job_runner.get(upload_data['job_id']).future.result(timeout=30)
+            job_data = json.loads(authenticated_client.get(upload_data['status_url']).data)
+            project_id = job_data['result']['project_id']
             
             # 2. Verify frames were extracted
             project_folder = os.path.join(app.config['FRAMES_FOLDER'], project_id)
@@ -184,8 +189,13 @@ class TestEndToEndWorkflows:
                         'interval': '1.0'
                     })
                 
-                # Should handle gracefully
-                assert upload_response.status_code in [400, 500]
+                # Should handle gracefully: accepted, then the job fails
+                assert upload_response.status_code == 202
+                upload_data = json.loads(upload_response.data)
+                from modules import routes
+                routes.job_runner.get(upload_data['job_id']).future.result(timeout=30)
+                job_data = json.loads(authenticated_client.get(upload_data['status_url']).data)
+                assert job_data['status'] == 'failed'
                 
                 os.unlink(corrupted_video.name)
             
@@ -0,0 +1,341 @@
+"""
+Unit tests for VisionLabel Pro background job runner.
+
+This module tests the local extraction job runner including:
+- Job submission and result recording
+- Progress reporting and ETA estimation
+- Cancellation of queued and running jobs
+- Failure handling and job history limits
+- Shortest-job-first scheduling within per-user and CPU limits
+"""
+
+import pytest
+import threading
+import time
+
+from modules.jobs import (JobRunner, Job, JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED, JOB_RUNNING,
+                         JOB_QUEUED)
+from modules.video_processor import ExtractionCancelled
+
+
+@pytest.fixture
+def job_runner():
+    """
+    Create a JobRunner with a single worker thread.
+
+    Returns:
+        JobRunner: Job runner that is shut down after the test
+    """
+    runner = JobRunner(max_workers=1)
+    yield runner
+    runner.shutdown()
+
+
+@pytest.mark.unit
+class TestJobExecution:
+    """Test job submission and completion"""
+
+    def test_submit_records_result(self, job_runner):
+        """Test that a completed job stores the target's return value"""
+        def target(value, progress_callback=None):
+            progress_callback(10, 5, 10)
+            return value * 2
+
+        job = job_runner.submit(target, 21, owner_id='user-1')
+        job.future.result(timeout=5)
+
+        assert job.status == JOB_COMPLETED
+        assert job.result == 42
+        assert job.frames_decoded == 10
+        assert job.frames_written == 5
+        assert job.to_dict()['progress'] == 100.0
+
+    def test_on_complete_transforms_result(self, job_runner):
+        """Test that on_complete maps the result before storing it"""
+        job = job_runner.submit(lambda progress_callback=None: ('p1', ['a', 'b'], {}),
+                                on_complete=lambda r: {'project_id': r[0]})
+        job.future.result(timeout=5)
+
+        assert job.result == {'project_id': 'p1'}
+
+    def test_failed_job_records_error(self, job_runner):
+        """Test that exceptions mark the job as failed"""
+        def target(progress_callback=None):
+            raise ValueError("Could not open video file")
+
+        job = job_runner.submit(target)
+        job.future.result(timeout=5)
+
+        assert job.status == JOB_FAILED
+        assert 'Could not open video file' in job.error
+
+    def test_get_and_list_jobs(self, job_runner):
+        """Test job lookup by ID and owner"""
+        job_a = job_runner.submit(lambda progress_callback=None: None, owner_id='a')
+        job_b = job_runner.submit(lambda progress_callback=None: None, owner_id='b')
+        job_b.future.result(timeout=5)
+
+        assert job_runner.get(job_a.id) is job_a
+        assert job_runner.get('missing') is None
+        assert job_runner.list_jobs(owner_id='b') == [job_b]
+
+    def test_history_limit_prunes_finished_jobs(self):
+        """Test that old finished jobs are forgotten"""
+        runner = JobRunner(max_workers=1, history_limit=2)
+        try:
+            jobs = []
+            for _ in range(4):
+                job = runner.submit(lambda progress_callback=None: None)
+                job.future.result(timeout=5)
+                jobs.append(job)
+
+            assert runner.get(jobs[0].id) is None
+            assert runner.get(jobs[-1].id) is jobs[-1]
+        finally:
+            runner.shutdown()
+
+
+@pytest.mark.unit
+class TestJobProgress:
+    """Test progress reporting"""
+
+    def test_eta_from_decode_rate(self):
+        """Test ETA estimation while running"""
+        job = Job('job-1')
+        job.status = JOB_RUNNING
+        job.started_at = time.monotonic() - 10
+
+        job.report_progress(0, 0, 100)
+        assert job.eta_seconds() is None
+
+        job.report_progress(25, 5, 100)
+        assert job.eta_seconds() == pytest.approx(30, abs=1)
+
+    def test_progress_percentage(self):
+        """Test progress percentage in the status dictionary"""
+        job = Job('job-1')
+        job.status = JOB_RUNNING
+        job.report_progress(30, 1, 120)
+
+        status = job.to_dict()
+        assert status['progress'] == 25.0
+        assert status['frames_decoded'] == 30
+        assert status['total_frames'] == 120
+
+
+@pytest.mark.unit
+class TestJobCancellation:
+    """Test job cancellation"""
+
+    def test_cancel_running_job(self, job_runner):
+        """Test that a running job stops at its next progress report"""
+        started = threading.Event()
+        release = threading.Event()
+
+        def target(progress_callback=None):
+            progress_callback(0, 0, 100)
+            started.set()
+            release.wait(5)
+            progress_callback(50, 10, 100)
+            return 'finished'
+
+        job = job_runner.submit(target)
+        assert started.wait(5)
+        assert job_runner.cancel(job.id) is True
+        release.set()
+        job.future.result(timeout=5)
+
+        assert job.status == JOB_CANCELLED
+        assert job.result is None
+
+    def test_cancel_queued_job(self, job_runner):
+        """Test that a queued job never runs once cancelled"""
+        release = threading.Event()
+        blocker = job_runner.submit(lambda progress_callback=None: release.wait(5))
+        ran = []
+        queued = job_runner.submit(lambda progress_callback=None: ran.append(True))
+
+        assert job_runner.cancel(queued.id) is True
+        release.set()
+        blocker.future.result(timeout=5)
+
+        assert queued.status == JOB_CANCELLED
+        assert ran == []
+
+    def test_cancel_queued_only(self, job_runner):
+        """Test that queued_only drops a waiting job but leaves a started one running"""
+        release = threading.Event()
+        running = job_runner.submit(lambda progress_callback=None: release.wait(5) and 'done')
+        queued = job_runner.submit(lambda progress_callback=None: None)
+
+        assert job_runner.cancel(queued.id, queued_only=True) is True
+        assert queued.status == JOB_CANCELLED
+        assert job_runner.cancel(running.id, queued_only=True) is False
+        release.set()
+        running.future.result(timeout=5)
+        assert running.status == JOB_COMPLETED
+        assert running.cancel_requested is False
+
+    def test_cancel_finished_job(self, job_runner):
+        """Test that finished jobs cannot be cancelled"""
+        job = job_runner.submit(lambda progress_callback=None: None)
+        job.future.result(timeout=5)
+
+        assert job_runner.cancel(job.id) is False
+        assert job_runner.cancel('missing') is False
+
+    def test_report_progress_raises_after_cancel(self):
+        """Test that the progress callback raises once cancellation is requested"""
+        job = Job('job-1')
+        job._cancel_event.set()
+
+        with pytest.raises(ExtractionCancelled):
+            job.report_progress(1, 1, 10)
+
+
+def _blocker(release):
+    """Job target that runs until release is set"""
+    return lambda progress_callback=None: release.wait(5)
+
+
+@pytest.mark.unit
+class TestJobScheduling:
+    """Test the order and limits queued jobs are started with"""
+
+    def _recorder(self, order, name):
+        return lambda progress_callback=None: order.append(name)
+
+    def test_shortest_job_first(self, job_runner):
+        """Test that queued jobs start in order of their duration estimate"""
+        release = threading.Event()
+        blocker = job_runner.submit(_blocker(release))
+        order = []
+        jobs = [job_runner.submit(self._recorder(order, name), duration_estimate=estimate)
+                for name, estimate in (('long', 600), ('short', 5), ('medium', 60), ('short2', 5))]
+
+        assert [job_runner.queue_position(job.id) for job in jobs] == [3, 0, 2, 1]
+        assert job_runner.queue_position(blocker.id) is None
+        release.set()
+        for job in jobs:
+            job.future.result(timeout=5)
+
+        assert order == ['short', 'short2', 'medium', 'long']
+
+    def test_waiting_jobs_age(self):
+        """Test that a long job is eventually preferred over newer short ones"""
+        runner = JobRunner(max_workers=1, aging_rate=1000.0)
+        try:
+            release = threading.Event()
+            runner.submit(_blocker(release))
+            order = []
+            long_job = runner.submit(self._recorder(order, 'long'), duration_estimate=60)
+            time.sleep(0.1)
+            short_job = runner.submit(self._recorder(order, 'short'), duration_estimate=1)
+            release.set()
+            short_job.future.result(timeout=5)
+            long_job.future.result(timeout=5)
+
+            assert order == ['long', 'short']
+        finally:
+            runner.shutdown()
+
+    def test_per_user_limit(self):
+        """Test that one user's jobs do not occupy every worker"""
+        runner = JobRunner(max_workers=2, per_user_limit=1)
+        try:
+            release = threading.Event()
+            first = runner.submit(_blocker(release), owner_id='alice')
+            second = runner.submit(_blocker(release), owner_id='alice', duration_estimate=0)
+            other = runner.submit(_blocker(release), owner_id='bob', duration_estimate=100)
+            time.sleep(0.1)
+
+            assert first.status == JOB_RUNNING
+            assert second.status == JOB_QUEUED
+            assert other.status == JOB_RUNNING
+            release.set()
+            second.future.result(timeout=5)
+            assert second.status == JOB_COMPLETED
+        finally:
+            runner.shutdown()
+
+    def test_cpu_budget(self):
+        """Test that running jobs never exceed the CPU budget together"""
+        runner = JobRunner(max_workers=4, cpu_budget=4)
+        try:
+            release = threading.Event()
+            wide = runner.submit(_blocker(release), cpu_cost=3)
+            narrow = runner.submit(_blocker(release), cpu_cost=1, duration_estimate=10)
+            held = runner.submit(_blocker(release), cpu_cost=2, duration_estimate=20)
+            time.sleep(0.1)
+
+            assert (wide.status, narrow.status, held.status) == (JOB_RUNNING, JOB_RUNNING, JOB_QUEUED)
+            release.set()
+            held.future.result(timeout=5)
+        finally:
+            runner.shutdown()
+
+    def test_blocked_job_is_not_overtaken(self):
+        """Test that a job waiting for cores holds back the jobs behind it"""
+        runner = JobRunner(max_workers=4, cpu_budget=4)
+        try:
+            release = threading.Event()
+            runner.submit(_blocker(release), cpu_cost=2)
+            wide = runner.submit(_blocker(release), cpu_cost=4, duration_estimate=1)
+            narrow = runner.submit(_blocker(release), cpu_cost=1, duration_estimate=2)
+            time.sleep(0.1)
+
+            assert (wide.status, narrow.status) == (JOB_QUEUED, JOB_QUEUED)
+            release.set()
+            narrow.future.result(timeout=5)
+        finally:
+            runner.shutdown()
+
+    def test_job_larger_than_budget_runs_alone(self):
+        """Test that a job costing more than the whole budget still runs"""
+        runner = JobRunner(max_workers=2, cpu_budget=2)
+        try:
+            job = runner.submit(lambda progress_callback=None: 'done', cpu_cost=8)
+            job.future.result(timeout=5)
+
+            assert job.result == 'done'
+        finally:
+            runner.shutdown()
+
+    def test_cancel_releases_held_back_jobs(self):
+        """Test that cancelling a job waiting for cores lets the next one start"""
+        runner = JobRunner(max_workers=2, cpu_budget=2)
+        try:
+            release = threading.Event()
+            runner.submit(_blocker(release), cpu_cost=1)
+            wide = runner.submit(_blocker(release), cpu_cost=2, duration_estimate=1)
+            narrow = runner.submit(_blocker(release), cpu_cost=1, duration_estimate=2)
+            time.sleep(0.1)
+            assert narrow.status == JOB_QUEUED
+
+            runner.cancel(wide.id)
+            time.sleep(0.1)
+            assert narrow.status == JOB_RUNNING
+            release.set()
+        finally:
+            runner.shutdown()
+
+    def test_detached_jobs_bypass_the_scheduler(self):
+        """Test that detached jobs take no worker, owner slot or cores"""
+        runner = JobRunner(max_workers=1, per_user_limit=1, cpu_budget=1, max_detached=1)
+        try:
+            release = threading.Event()
+            detached = runner.submit(_blocker(release), owner_id='alice', detached=True)
+            waiting = runner.submit(_blocker(release), owner_id='alice', detached=True)
+            scheduled = runner.submit(lambda progress_callback=None: 'done', owner_id='alice')
+            scheduled.future.result(timeout=5)
+
+            assert scheduled.result == 'done'
+            assert detached.status == JOB_RUNNING
+            assert waiting.status == JOB_QUEUED
+            assert runner.cancel(waiting.id) is True
+            assert waiting.status == JOB_CANCELLED
+            release.set()
+            detached.future.result(timeout=5)
+            assert detached.status == JOB_COMPLETED
+        finally:
+            runner.shutdown()
@@ -0,0 +1,173 @@
+"""
+Unit tests for the VisionLabel Pro command line.
+
+This module tests the headless commands including:
+- Importing a single local video
+- Collecting videos from files and folders
+- Ingesting many videos in parallel
+- Parsing the import and ingest options
+"""
+
+import pytest
+import json
+import os
+import shutil
+import sys
+from unittest.mock import patch
+
+import main
+from config import Config
+
+
+@pytest.fixture
+def footage(tmp_path, avi_video_file):
+    """Folder with two videos, one in a sub-folder, and a file that is not a video"""
+    root = tmp_path / 'footage'
+    (root / 'day2').mkdir(parents=True)
+    shutil.copy(avi_video_file, root / 'a.avi')
+    shutil.copy(avi_video_file, root / 'day2' / 'b.avi')
+    (root / 'notes.txt').write_bytes(b'x')
+    return root
+
+
+@pytest.fixture
+def folders(tmp_path):
+    """Point the frames and upload folders at the test directory"""
+    frames, uploads = tmp_path / 'frames', tmp_path / 'uploads'
+    with patch.object(Config, 'FRAMES_FOLDER', str(frames)), \
+            patch.object(Config, 'UPLOAD_FOLDER', str(uploads)), \
+            patch.object(Config, 'IMPORT_MODE', 'link'):
+        yield frames, uploads
+
+
+@pytest.mark.unit
+class TestFindVideos:
+    """Test collecting the videos named on the command line"""
+    
+    def test_folder_scan(self, footage):
+        """Test that folders yield their videos, sub-folders only when recursive"""
+        assert main.find_videos([str(footage)]) == [str(footage / 'a.avi')]
+        assert main.find_videos([str(footage)], recursive=True) == [
+            str(footage / 'a.avi'), str(footage / 'day2' / 'b.avi')]
+    
+    def test_duplicates_are_dropped(self, footage):
+        """Test that a video named twice, directly or through its folder, is listed once"""
+        videos = main.find_videos([str(footage / 'a.avi'), str(footage),
+                                   str(footage / 'day2' / '..' / 'a.avi')])
+        
+        assert videos == [str(footage / 'a.avi')]
+    
+    def test_named_files_are_kept(self, footage):
+        """Test that explicitly named files are kept whatever their extension"""
+        assert main.find_videos([str(footage / 'notes.txt')]) == [str(footage / 'notes.txt')]
+
+
+@pytest.mark.unit
+class TestImportLocalVideo:
+    """Test extracting a single local video"""
+    
+    def test_import_keeps_link(self, footage, folders):
+        """Test that an extracted video stays hard-linked into the upload folder"""
+        frames, uploads = folders
+        
+        assert main.import_local_video(str(footage / 'a.avi'), 1.0, 'local') == 0
+        
+        assert os.listdir(frames) == ['local']
+        assert len(os.listdir(uploads)) == 1
+        assert os.path.samefile(uploads / os.listdir(uploads)[0], footage / 'a.avi')
+    
+    def test_failed_import_removes_link(self, footage, folders):
+        """Test that the hard link of a video that could not be extracted is removed"""
+        frames, uploads = folders
+        broken = footage / 'bad.avi'
+        broken.write_bytes(b'not a video')
+        
+        assert main.import_local_video(str(broken), 1.0) == 1
+        
+        assert os.listdir(uploads) == []
+        assert os.stat(broken).st_nlink == 1
+
+
+@pytest.mark.unit
+class TestIngestVideos:
+    """Test the headless parallel ingest"""
+    
+    def _ingest(self, tmp_path, *paths, **kwargs):
+        summary_path = str(tmp_path / 'summary.json')
+        code = main.ingest_videos([str(path) for path in paths], summary_path=summary_path,
+                                  jobs=2, **kwargs)
+        with open(summary_path) as f:
+            return code, json.load(f)
+    
+    def test_summary(self, tmp_path, footage, folders):
+        """Test that every video becomes a project and is listed in the summary"""
+        frames, uploads = folders
+        
+        code, summary = self._ingest(tmp_path, footage, recursive=True)
+        
+        assert code == 0
+        assert (summary['videos'], summary['completed'], summary['failed']) == (2, 2, 0)
+        assert summary['frames'] == 6
+        assert summary['frames_folder'] == str(frames)
+        for entry in summary['results']:
+            assert entry['status'] == 'completed'
+            assert entry['frame_count'] == 3
+            assert entry['linked'] is True
+            assert os.path.samefile(entry['video_path'], entry['path'])
+            assert os.path.isdir(frames / entry['project_id'])
+        assert [entry['path'] for entry in summary['results']] == [
+            str(footage / 'a.avi'), str(footage / 'day2' / 'b.avi')]
+    
+    def test_failures(self, tmp_path, footage, folders):
+        """Test that failed videos are reported, set the exit code and leave nothing behind"""
+        frames, uploads = folders
+        broken = footage / 'broken.avi'
+        broken.write_bytes(b'not a video')
+        
+        code, summary = self._ingest(tmp_path, footage, footage / 'notes.txt')
+        
+        assert code == 1
+        assert (summary['videos'], summary['completed'], summary['failed']) == (3, 1, 2)
+        results = {os.path.basename(entry['path']): entry for entry in summary['results']}
+        assert results['broken.avi']['status'] == 'failed'
+        assert 'Could not open video file' in results['broken.avi']['error']
+        assert results['broken.avi']['video_path'] is None
+        assert results['notes.txt']['status'] == 'failed'
+        assert 'Invalid file type' in results['notes.txt']['error']
+        # Only the extracted video keeps its hard link and project folder
+        assert os.listdir(uploads) == [os.path.basename(results['a.avi']['video_path'])]
+        assert os.listdir(frames) == [results['a.avi']['project_id']]
+        assert broken.exists()
+    
+    def test_no_videos(self, tmp_path, folders):
+        """Test that an empty run fails without writing a summary"""
+        empty = tmp_path / 'empty'
+        empty.mkdir()
+        
+        assert main.ingest_videos([str(empty)], summary_path=str(tmp_path / 'summary.json')) == 1
+        assert not (tmp_path / 'summary.json').exists()
+
+
+@pytest.mark.unit
+class TestCommandLine:
+    """Test parsing of the import and ingest options"""
+    
+    def _ingest_args(self, *argv):
+        with patch.object(sys, 'argv', ['main.py', *argv]), \
+                patch.object(main, 'ingest_videos', return_value=0) as ingest:
+            assert main.main() == 0
+        return ingest.call_args[0]
+    
+    def test_options_before_or_after_the_command(self):
+        """Test that --interval and --import-mode apply wherever they are given"""
+        assert self._ingest_args('--interval', '5', '--import-mode', 'reference',
+                                 'ingest', 'videos') == \
+            (['videos'], 5.0, False, None, 'reference', 'ingest_summary.json')
+        assert self._ingest_args('ingest', 'videos', '-r', '--interval', '2') == \
+            (['videos'], 2.0, True, None, None, 'ingest_summary.json')
+        assert self._ingest_args('--interval', '5', 'ingest', 'videos', '--interval', '2')[1] == 2.0
+    
+    def test_defaults(self):
+        """Test the ingest defaults"""
+        assert self._ingest_args('ingest', 'videos') == \
+            (['videos'], 1.0, False, None, None, 'ingest_summary.json')
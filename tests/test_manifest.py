@@ -0,0 +1,210 @@
+"""
+Unit tests for VisionLabel Pro compact frame manifests.
+
+This module tests the metadata manifest including:
+- Packing and unpacking of per-frame arrays
+- Frame filenames from patterns
+- Frame numbers and timestamps for every sampling mode
+- Transparent reading of old metadata with frame_paths lists
+- The frame number and timestamp index side file
+"""
+
+import pytest
+import os
+import json
+import numpy as np
+
+from modules.manifest import (compact_metadata, frame_filename, frame_numbers, frame_timestamps,
+                              pack_array, pack_increasing, unpack_array, load_frame_index,
+                              save_frame_index, MANIFEST_VERSION, FRAME_INDEX_DTYPE)
+
+
+@pytest.fixture
+def old_format_metadata():
+    """
+    Metadata as written before compact manifests (explicit frame_paths).
+    
+    Returns:
+        dict: Old-format metadata of a 3-frame interval project
+    """
+    return {
+        'project_id': 'legacy',
+        'video_path': '/videos/legacy.mp4',
+        'video_name': 'legacy.mp4',
+        'fps': 30.0,
+        'total_frames': 90,
+        'duration': 3.0,
+        'interval': 1.0,
+        'extracted_count': 3,
+        'created_at': '2024-01-01T00:00:00',
+        'frame_paths': [f'/data/frames/legacy/frame_{i:06d}.jpg' for i in range(3)]
+    }
+
+
+@pytest.mark.unit
+class TestPackedArrays:
+    """Test packed array encoding"""
+    
+    def test_round_trip(self):
+        """Test that packed arrays unpack to the same values"""
+        values = [0, 7, 2 ** 40, 123456]
+        
+        packed = pack_array(values, '<i8')
+        
+        assert json.loads(json.dumps(packed)) == packed
+        assert list(unpack_array(packed)) == values
+    
+    def test_float_round_trip(self):
+        """Test that timestamps survive packing exactly"""
+        values = [0.0, 0.033367, 1234.5]
+        
+        assert list(unpack_array(pack_array(values, '<f8'))) == values
+    
+    def test_empty_array(self):
+        """Test packing of an empty list"""
+        assert unpack_array(pack_array([], '<i8')).size == 0
+    
+    def test_plain_list_accepted(self):
+        """Test that old metadata lists unpack unchanged"""
+        assert list(unpack_array([1, 2, 3])) == [1, 2, 3]
+    
+    def test_increasing_round_trip(self):
+        """Test delta packing of frame numbers"""
+        values = [0, 30, 75, 70000, 70001]
+        
+        packed = pack_increasing(values)
+        
+        assert packed['dtype'] == '<u4'
+        assert list(unpack_array(packed)) == values
+        assert list(unpack_array(pack_increasing([42]))) == [42]
+    
+    def test_increasing_much_smaller_than_list(self):
+        """Test that steady frame numbers pack to about one byte each"""
+        values = list(range(100000, 400000, 6))
+        
+        packed = json.dumps(pack_increasing(values))
+        
+        assert len(packed) * 4 < len(json.dumps(values))
+    
+    def test_decreasing_values_fall_back(self):
+        """Test that unsorted values are packed without deltas"""
+        assert list(unpack_array(pack_increasing([5, 3, 9]))) == [5, 3, 9]
+
+
+@pytest.mark.unit
+class TestCompactMetadata:
+    """Test conversion to the compact layout"""
+    
+    def test_paths_replaced_by_pattern(self, old_format_metadata):
+        """Test that the path list is replaced by a pattern"""
+        compact = compact_metadata(old_format_metadata)
+        
+        assert 'frame_paths' not in compact
+        assert compact['frame_pattern'] == 'frame_%06d.jpg'
+        assert compact['manifest_version'] == MANIFEST_VERSION
+        assert 'frame_paths' in old_format_metadata
+    
+    def test_lists_are_packed(self, old_format_metadata):
+        """Test that frame number and timestamp lists become packed arrays"""
+        old_format_metadata['frame_numbers'] = [0, 45]
+        old_format_metadata['frame_timestamps'] = [0.0, 1.5]
+        
+        compact = compact_metadata(old_format_metadata)
+        
+        assert isinstance(compact['frame_numbers'], dict)
+        assert 'frame_timestamps' not in compact  # derivable from fps
+        assert list(frame_numbers(compact)) == [0, 45]
+        assert list(frame_timestamps(compact)) == [0.0, 1.5]
+    
+    def test_irregular_timestamps_kept(self, old_format_metadata):
+        """Test that timestamps that do not follow the frame rate are stored"""
+        old_format_metadata['frame_numbers'] = [0, 45]
+        old_format_metadata['frame_timestamps'] = [0.0, 1.52]
+        
+        compact = compact_metadata(old_format_metadata)
+        
+        assert list(frame_timestamps(compact)) == [0.0, 1.52]
+    
+    def test_pattern_uses_encoding_extension(self, old_format_metadata):
+        """Test that the pattern follows the frame format"""
+        old_format_metadata['encoding'] = {'format': 'webp', 'extension': '.webp'}
+        
+        assert frame_filename(compact_metadata(old_format_metadata), 12) == 'frame_000012.webp'
+
+
+@pytest.mark.unit
+class TestOldFormatReading:
+    """Test that old metadata is read transparently"""
+    
+    def test_frame_filename(self, old_format_metadata):
+        """Test frame filenames without a pattern"""
+        assert frame_filename(old_format_metadata, 2) == 'frame_000002.jpg'
+    
+    def test_frame_numbers_from_interval(self, old_format_metadata):
+        """Test that interval projects derive source frame numbers"""
+        assert list(frame_numbers(old_format_metadata)) == [0, 30, 60]
+        assert list(frame_timestamps(old_format_metadata)) == [0.0, 1.0, 2.0]
+    
+    def test_old_project_served_by_processor(self, video_processor, old_format_metadata):
+        """Test that VideoProcessor resolves frames of an old project"""
+        project_folder = os.path.join(video_processor.frames_folder, 'legacy')
+        os.makedirs(project_folder)
+        with open(os.path.join(project_folder, 'metadata.json'), 'w') as f:
+            json.dump(old_format_metadata, f)
+        
+        assert video_processor.get_frame_path('legacy', 1) == os.path.join(
+            project_folder, 'frame_000001.jpg')
+        with pytest.raises(IndexError):
+            video_processor.get_frame_path('legacy', 3)
+
+
+@pytest.mark.unit
+class TestWrittenManifest:
+    """Test metadata written by extraction"""
+    
+    def test_metadata_file_has_no_path_list(self, video_processor, mock_video_file):
+        """Test that extraction writes the compact layout"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            mock_video_file, sampling='scene', max_gap=0.5
+        )
+        
+        with open(os.path.join(video_processor.frames_folder, project_id, 'metadata.json')) as f:
+            stored = json.load(f)
+        
+        assert 'frame_paths' not in stored
+        assert stored['frame_pattern'] == 'frame_%06d.jpg'
+        assert list(frame_numbers(stored)) == list(frame_numbers(metadata))
+        assert len(frame_numbers(stored)) == len(frame_paths)
+
+
+@pytest.mark.unit
+class TestFrameIndexFile:
+    """Test saving and loading the frame index side file"""
+    
+    def test_round_trip(self, tmp_path):
+        """Test that records are stored as a structured array"""
+        save_frame_index(str(tmp_path), [(0, 0.0), (45, 1.5015), (120, 4.004)])
+        
+        index = load_frame_index(str(tmp_path))
+        
+        assert index.dtype == FRAME_INDEX_DTYPE
+        assert list(index['frame_number']) == [0, 45, 120]
+        assert list(index['timestamp']) == [0.0, 1.5015, 4.004]
+    
+    def test_empty_index(self, tmp_path):
+        """Test that a project without frames gets an empty index"""
+        save_frame_index(str(tmp_path), [])
+        
+        assert len(load_frame_index(str(tmp_path))) == 0
+    
+    def test_missing_index_rebuilt_from_metadata(self, tmp_path, old_format_metadata):
+        """Test that old projects get an index derived from their metadata"""
+        index = load_frame_index(str(tmp_path), old_format_metadata)
+        
+        assert list(index['frame_number']) == [0, 30, 60]
+        assert list(index['timestamp']) == [0.0, 1.0, 2.0]
+    
+    def test_missing_index_without_metadata(self, tmp_path):
+        """Test that a missing index is reported"""
+        with pytest.raises(FileNotFoundError):
+            load_frame_index(str(tmp_path))
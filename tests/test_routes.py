@@ -8,18 +8,26 @@ This module tests all route functionality including:
 - Authentication protection and access control
 - Error handling and response codes
 - Session management and project tracking
+- Re-sampling projects from their stored video
+- Resumable chunked uploads
+- Importing server-side videos
 """
 
 import pytest
 import os
 import json
+import shutil
 import tempfile
+import time
+from concurrent import futures
 from unittest.mock import patch, MagicMock
 from werkzeug.datastructures import FileStorage
 from io import BytesIO
 
 from flask import url_for, session
 
+from modules.jobs import JobRunner
+
 
 @pytest.mark.unit
 class TestMainRoutes:
@@ -138,7 +146,9 @@ class TestVideoUpload:
     @patch('modules.routes.video_processor')
     def test_upload_video_success(self, mock_processor, authenticated_client):
         """Test successful video upload and processing"""
-        # Mock video processor
+        # Mock video processor (no earlier upload of the same content)
+        mock_processor.find_source_video.return_value = None
+        mock_processor.find_extraction.return_value = None
         mock_processor.extract_frames.return_value = (
             'test-project-123',
             ['/frames/frame_0.jpg', '/frames/frame_1.jpg'],
@@ -161,11 +171,19 @@ class TestVideoUpload:
         
         response = authenticated_client.post('/upload', data=data)
         
-        assert response.status_code == 200
+        assert response.status_code == 202
         data = json.loads(response.data)
         assert data['success'] is True
-        assert data['project_id'] == 'test-project-123'
-        assert 'redirect_url' in data
+        assert 'job_id' in data
+        
+        # Extraction runs in the background; poll the job until it finishes
+        from modules import routes
+        routes.job_runner.get(data['job_id']).future.result(timeout=5)
+        job_response = authenticated_client.get(data['status_url'])
+        job_data = json.loads(job_response.data)
+        assert job_data['status'] == 'completed'
+        assert job_data['result']['project_id'] == 'test-project-123'
+        assert 'redirect' in job_data
     
     def test_upload_video_invalid_interval(self, authenticated_client):
         """Test video upload with invalid interval parameter"""
@@ -183,6 +201,8 @@ class TestVideoUpload:
     @patch('modules.routes.video_processor')
     def test_upload_video_processing_error(self, mock_processor, authenticated_client):
         """Test video upload with processing error"""
+        mock_processor.find_source_video.return_value = None
+        mock_processor.find_extraction.return_value = None
         mock_processor.extract_frames.side_effect = Exception("Processing failed")
         
         video_data = BytesIO(b'fake video content')
@@ -190,8 +210,15 @@ class TestVideoUpload:
         
         response = authenticated_client.post('/upload', data=data)
         
-        assert response.status_code == 500
-        assert b'Error processing video' in response.data
+        # The upload is accepted; the failure is reported by the job
+        assert response.status_code == 202
+        job_id = json.loads(response.data)['job_id']
+        from modules import routes
+        routes.job_runner.get(job_id).future.result(timeout=5)
+        job_response = authenticated_client.get(f'/api/jobs/{job_id}')
+        job_data = json.loads(job_response.data)
+        assert job_data['status'] == 'failed'
+        assert 'Processing failed' in job_data['error']
 
 
 @pytest.mark.unit
@@ -334,6 +361,693 @@ class TestAPIEndpoints:
         assert response.status_code == 500
 
 
+@pytest.fixture
+def frame_project(app, mock_video_file):
+    """
+    Extract a small project served through a processor bound to the test app.
+    
+    Returns:
+        tuple: (VideoProcessor, project_id)
+    """
+    from modules.video_processor import VideoProcessor
+    processor = VideoProcessor(app.config['FRAMES_FOLDER'])
+    project_id, frame_paths, metadata = processor.extract_frames(mock_video_file,
+                                                                 project_name='cached')
+    with patch('modules.routes.video_processor', processor):
+        yield processor, project_id
+
+
+@pytest.mark.unit
+class TestFrameCaching:
+    """Test HTTP caching of frame responses"""
+    
+    def test_frame_cache_headers(self, client, frame_project):
+        """Test that frames carry a strong ETag and immutable caching"""
+        response = client.get('/api/frame/cached/0')
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'image/jpeg'
+        assert response.headers['ETag'].startswith('"')
+        assert response.last_modified is not None
+        assert response.cache_control.immutable
+        assert response.cache_control.max_age == client.application.config['FRAME_CACHE_MAX_AGE']
+    
+    def test_if_none_match_returns_304(self, client, frame_project):
+        """Test that a matching ETag returns 304 without a body"""
+        from modules import routes
+        etag = client.get('/api/frame/cached/0').headers['ETag']
+        lookups = routes.frame_cache.hits + routes.frame_cache.misses
+        
+        response = client.get('/api/frame/cached/0', headers={'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+        assert routes.frame_cache.hits + routes.frame_cache.misses == lookups
+    
+    def test_etag_differs_per_frame_and_size(self, client, frame_project):
+        """Test that each frame and variant has its own validator"""
+        etags = {client.get(url).headers['ETag'] for url in (
+            '/api/frame/cached/0', '/api/frame/cached/1', '/api/frame/cached/0?size=thumb'
+        )}
+        
+        assert len(etags) == 3
+    
+    def test_stale_etag_returns_frame(self, client, frame_project):
+        """Test that a non-matching ETag gets the full frame"""
+        response = client.get('/api/frame/cached/0', headers={'If-None-Match': '"stale"'})
+        
+        assert response.status_code == 200
+        assert len(response.data) > 0
+    
+    def test_repeat_requests_served_from_memory(self, client, frame_project):
+        """Test that a frame body is read from disk once and then cached"""
+        from modules import routes
+        first = client.get('/api/frame/cached/2')
+        hits = routes.frame_cache.hits
+        
+        second = client.get('/api/frame/cached/2')
+        
+        assert second.data == first.data
+        assert routes.frame_cache.hits == hits + 1
+    
+    def test_cache_keyed_by_file_not_etag(self, app, client, frame_project, tmp_path):
+        """Test that files of equal size and mtime are cached separately"""
+        from modules import routes
+        client.get('/api/frame/cached/0')
+        first, second = tmp_path / 'a.jpg', tmp_path / 'b.jpg'
+        first.write_bytes(b'first')
+        second.write_bytes(b'other')
+        for path in (first, second):
+            os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+        
+        with app.test_request_context():
+            bodies = [routes._send_frame(str(path)).get_data() for path in (first, second)]
+            assert routes.frame_cache.get((str(first), 5, 1_000_000_000)) == b'first'
+        
+        assert bodies == [b'first', b'other']
+    
+    def test_if_modified_since_returns_304(self, client, frame_project):
+        """Test Last-Modified based revalidation"""
+        last_modified = client.get('/api/frame/cached/0').headers['Last-Modified']
+        
+        response = client.get('/api/frame/cached/0', headers={'If-Modified-Since': last_modified})
+        
+        assert response.status_code == 304
+
+
+@pytest.mark.unit
+class TestProjectResampling:
+    """Test re-sampling a project from its stored video"""
+    
+    def test_resample_requires_login(self, client):
+        """Test that re-sampling is protected"""
+        response = client.post('/api/project/cached/resample', json={'interval': 0.5})
+        
+        assert response.status_code == 302
+    
+    def test_resample_moves_annotations(self, app, frame_project):
+        """Test that annotations follow their source timestamps"""
+        from modules import routes
+        from modules.data_storage import LabelStorage
+        processor, project_id = frame_project
+        storage = LabelStorage(app.config['DATASETS_FOLDER'])
+        box = [{'id': 'a', 'class': 'car', 'x': 1, 'y': 2, 'width': 3, 'height': 4}]
+        storage.save_annotation(project_id, 1, processor.get_frame_path(project_id, 1), box)
+        
+        with patch('modules.routes.label_storage', storage):
+            result = routes._resample_project(project_id, 0.5)
+        
+        assert result['frame_count'] == 6
+        assert result['revision'] == 1
+        assert result['annotated_frames'] == {'matched': 1, 'unmatched': 0}
+        # 1.0s was frame 1 at a 1s interval and is frame 2 at 0.5s
+        assert storage.get_annotations(project_id, 2)['annotations'] == box
+        assert storage.get_annotations(project_id, 1) == {'annotations': []}
+    
+    def test_resample_keeps_unspecified_settings(self, logged_in_client, upload_service,
+                                                 mock_video_file):
+        """Test that a re-sample keeps the sampling mode and filters the request leaves out"""
+        from modules import routes
+        routes.video_processor.extract_frames(mock_video_file, project_name='scenes',
+                                              sampling='scene', scene_threshold=0.3,
+                                              dedupe_distance=4)
+        
+        response = logged_in_client.post('/api/project/scenes/resample', json={'image_quality': 80})
+        
+        assert response.status_code == 202
+        job = routes.job_runner.get(response.get_json()['job_id'])
+        job.future.result(timeout=30)
+        assert job.status == 'completed', job.error
+        params = routes.video_processor.get_project_metadata('scenes')['extraction_params']
+        assert params['sampling'] == 'scene'
+        assert params['scene_threshold'] == 0.3
+        assert params['dedupe_distance'] == 4
+        assert params['image_quality'] == 80
+    
+    def test_filmstrip_url_carries_frame_version(self, client, frame_project):
+        """Test that sprite URLs change when a project is re-sampled"""
+        from modules.filmstrip import FilmstripCache
+        processor, project_id = frame_project
+        version = processor.get_project_metadata(project_id)['extraction_id']
+        with patch('modules.routes.filmstrip_cache', FilmstripCache(processor)):
+            before = client.get(f'/api/filmstrip/{project_id}').get_json()['sprite_url']
+            processor.resample_project(project_id, 0.5)
+            after = client.get(f'/api/filmstrip/{project_id}').get_json()
+        
+        assert f'v={version}' in before
+        assert after['sprite_url'] != before
+        assert f"v={processor.get_project_metadata(project_id)['extraction_id']}" in after['sprite_url']
+        assert after['count'] == 6
+    
+    def test_reused_project_id_gets_new_frame_urls(self, client, frame_project, mock_video_file):
+        """Test that re-extracting under a deleted project's ID changes the frame version"""
+        from modules.filmstrip import FilmstripCache
+        processor, project_id = frame_project
+        with patch('modules.routes.filmstrip_cache', FilmstripCache(processor)):
+            before = client.get(f'/api/filmstrip/{project_id}').get_json()['sprite_url']
+            processor.delete_project(project_id)
+            processor.extract_frames(mock_video_file, interval=0.5, project_name=project_id)
+            after = client.get(f'/api/filmstrip/{project_id}').get_json()['sprite_url']
+        
+        assert after != before
+
+
+@pytest.mark.unit
+class TestUploadReuse:
+    """Test reuse of stored videos and extractions for repeated uploads"""
+    
+    def _upload_copy(self, app, mock_video_file, name):
+        """Copy the test video into the upload folder as a new upload"""
+        import shutil
+        from modules.uploads import file_sha256
+        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+        video_path = os.path.join(app.config['UPLOAD_FOLDER'], name)
+        shutil.copy(mock_video_file, video_path)
+        return video_path, file_sha256(video_path)
+    
+    def test_same_settings_reuse_frames(self, app, frame_project, mock_video_file):
+        """Test that a repeated upload links the frames of the first extraction"""
+        from modules import routes
+        processor, project_id = frame_project
+        first_path, sha = self._upload_copy(app, mock_video_file, 'first.mp4')
+        processor.extract_frames(first_path, project_name='first', source_sha256=sha)
+        second_path, _ = self._upload_copy(app, mock_video_file, 'second.mp4')
+        
+        with app.test_request_context(), patch('modules.routes.job_runner', JobRunner(1)):
+            job, reused = routes._submit_extraction(
+                second_path, sha, 1.0, 'second', False, {}, {'image_format': 'jpeg',
+                                                             'image_quality': 95})
+            job.future.result(timeout=10)
+        
+        assert reused == 'first'
+        assert job.result == {'project_id': 'second', 'frame_count': 3}
+        assert not os.path.exists(second_path)
+        assert processor.get_project_metadata('second')['video_path'] == first_path
+        assert os.path.samefile(processor.get_frame_path('first', 0),
+                                processor.get_frame_path('second', 0))
+    
+    def test_other_settings_extract_from_stored_video(self, app, frame_project, mock_video_file):
+        """Test that new settings decode again but keep only one copy of the video"""
+        from modules import routes
+        processor, project_id = frame_project
+        first_path, sha = self._upload_copy(app, mock_video_file, 'first.mp4')
+        processor.extract_frames(first_path, project_name='first', source_sha256=sha)
+        second_path, _ = self._upload_copy(app, mock_video_file, 'second.mp4')
+        
+        with app.test_request_context(), patch('modules.routes.job_runner', JobRunner(1)):
+            job, reused = routes._submit_extraction(
+                second_path, sha, 0.5, 'second', False, {}, {'image_format': 'jpeg',
+                                                             'image_quality': 95})
+            job.future.result(timeout=10)
+        
+        assert reused is None
+        assert job.result == {'project_id': 'second', 'frame_count': 6}
+        assert not os.path.exists(second_path)
+        assert processor.get_project_metadata('second')['video_path'] == first_path
+
+
+@pytest.fixture
+def logged_in_client(client, test_user):
+    """
+    Client logged in as test_user through the application's user manager.
+    
+    Returns:
+        FlaskClient: Client with a logged-in session
+    """
+    from modules import models
+    with patch.dict(models.user_manager.users, {test_user.id: test_user}):
+        with client.session_transaction() as sess:
+            sess['_user_id'] = test_user.id
+            sess['_fresh'] = True
+        yield client
+
+
+@pytest.fixture
+def upload_service(app):
+    """
+    Chunked upload store, job runner and video processor bound to the test app.
+    
+    Returns:
+        ChunkedUploads: The patched upload store
+    """
+    from modules.uploads import ChunkedUploads
+    from modules.video_processor import VideoProcessor
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    uploads = ChunkedUploads(app.config['UPLOAD_FOLDER'], 10 * 1024 * 1024)
+    with patch('modules.routes.chunked_uploads', uploads), \
+            patch('modules.routes.job_runner', JobRunner(1)), \
+            patch('modules.routes.video_processor', VideoProcessor(app.config['FRAMES_FOLDER'])):
+        yield uploads
+
+
+@pytest.mark.unit
+class TestChunkedUpload:
+    """Test the resumable chunked upload endpoints"""
+    
+    def _start(self, client, size, **values):
+        values = dict({'filename': 'clip.mp4', 'size': size, 'interval': 1.0}, **values)
+        return client.post('/api/uploads', json=values)
+    
+    def test_requires_login(self, client):
+        """Test that starting an upload is protected"""
+        response = client.post('/api/uploads', json={'filename': 'clip.mp4', 'size': 10})
+        
+        assert response.status_code == 302
+    
+    def test_rejects_bad_requests(self, logged_in_client, upload_service):
+        """Test validation before any bytes are sent"""
+        assert self._start(logged_in_client, 10, filename='notes.txt').status_code == 400
+        assert self._start(logged_in_client, 10, interval=50).status_code == 400
+        assert self._start(logged_in_client, 0).status_code == 400
+        assert self._start(logged_in_client, 11 * 1024 * 1024).status_code == 413
+    
+    def test_chunks_resume_and_extract(self, logged_in_client, upload_service, mock_video_file):
+        """Test a full upload in chunks, with a retried chunk, then extraction"""
+        import hashlib
+        from modules import routes
+        with open(mock_video_file, 'rb') as f:
+            content = f.read()
+        half = len(content) // 2
+        
+        created = self._start(logged_in_client, len(content), project_name='chunked')
+        assert created.status_code == 201
+        status = created.get_json()
+        upload_url = status['upload_url']
+        
+        first = logged_in_client.put(f"{upload_url}?offset=0", data=content[:half])
+        assert first.get_json()['offset'] == half
+        
+        # A retried chunk is refused with the offset to continue from
+        retry = logged_in_client.put(f"{upload_url}?offset=0", data=content[:half])
+        assert retry.status_code == 409
+        assert retry.get_json()['offset'] == half
+        assert logged_in_client.get(upload_url).get_json()['offset'] == half
+        
+        early = logged_in_client.post(status['finalize_url'], json={})
+        assert early.status_code == 409
+        
+        rest = logged_in_client.put(upload_url, data=content[half:], headers={
+            'Content-Range': f"bytes {half}-{len(content) - 1}/{len(content)}"})
+        assert rest.get_json()['complete'] is True
+        
+        finalized = logged_in_client.post(status['finalize_url'], json={
+            'sha256': hashlib.sha256(content).hexdigest()})
+        assert finalized.status_code == 202
+        job = routes.job_runner.get(finalized.get_json()['job_id'])
+        job.future.result(timeout=10)
+        assert job.result == {'project_id': 'chunked', 'frame_count': 3}
+        assert logged_in_client.get(upload_url).status_code == 404
+    
+    def test_progressive_extraction(self, logged_in_client, upload_service, avi_video_file):
+        """Test that extraction starts with the upload and ends after finalize"""
+        from modules import routes
+        with open(avi_video_file, 'rb') as f:
+            content = f.read()
+        
+        status = self._start(logged_in_client, len(content), filename='clip.avi',
+                             interval=0.5).get_json()
+        assert status['project_url'].endswith(f"/annotate/{status['project_id']}")
+        job = routes.job_runner.get(status['job_id'])
+        assert job.detached is True
+        
+        half = len(content) // 2
+        logged_in_client.put(f"{status['upload_url']}?offset=0", data=content[:half])
+        logged_in_client.put(f"{status['upload_url']}?offset={half}", data=content[half:])
+        finalized = logged_in_client.post(status['finalize_url'], json={}).get_json()
+        
+        assert finalized['job_id'] == job.id
+        job.future.result(timeout=10)
+        assert job.result == {'project_id': status['project_id'], 'frame_count': 6}
+    
+    def test_finalize_restarts_failed_progressive_job(self, logged_in_client, upload_service,
+                                                      avi_video_file):
+        """Test that finalize extracts the file again when the progressive job is gone"""
+        from modules import routes
+        with open(avi_video_file, 'rb') as f:
+            content = f.read()
+        
+        for pruned in (False, True):
+            status = self._start(logged_in_client, len(content), filename='clip.avi',
+                                 interval=0.5).get_json()
+            logged_in_client.delete(status['status_url'])
+            futures.wait([routes.job_runner.get(status['job_id']).future], timeout=10)
+            if pruned:
+                # Finished jobs may be dropped from the job history
+                del routes.job_runner._jobs[status['job_id']]
+            logged_in_client.put(f"{status['upload_url']}?offset=0", data=content)
+            
+            finalized = logged_in_client.post(status['finalize_url'], json={})
+            
+            assert finalized.status_code == 202
+            job = routes.job_runner.get(finalized.get_json()['job_id'])
+            assert job.id != status['job_id']
+            job.future.result(timeout=10)
+            assert job.result == {'project_id': status['project_id'], 'frame_count': 6}
+            routes.video_processor.delete_project(status['project_id'])
+    
+    def test_progressive_gives_up_on_paused_upload(self, logged_in_client, upload_service, app,
+                                                   avi_video_file):
+        """Test that a paused upload frees its thread and is extracted at finalize"""
+        from modules import routes
+        from modules.jobs import JOB_FAILED
+        with open(avi_video_file, 'rb') as f:
+            content = f.read()
+        with patch.dict(app.config, {'PROGRESSIVE_STALL_SECONDS': 0.5}):
+            status = self._start(logged_in_client, len(content), filename='clip.avi',
+                                 interval=0.5).get_json()
+        logged_in_client.put(f"{status['upload_url']}?offset=0", data=content[:len(content) // 2])
+        
+        progressive = routes.job_runner.get(status['job_id'])
+        progressive.future.result(timeout=10)
+        assert progressive.status == JOB_FAILED
+        logged_in_client.put(f"{status['upload_url']}?offset={len(content) // 2}",
+                             data=content[len(content) // 2:])
+        finalized = logged_in_client.post(status['finalize_url'], json={})
+        
+        job = routes.job_runner.get(finalized.get_json()['job_id'])
+        assert job.id != progressive.id
+        job.future.result(timeout=10)
+        assert job.result == {'project_id': status['project_id'], 'frame_count': 6}
+    
+    def test_finalize_replaces_queued_progressive_job(self, logged_in_client, upload_service,
+                                                      avi_video_file):
+        """Test that a progressive job still waiting for a thread is replaced at finalize"""
+        from modules import routes
+        from modules.jobs import JOB_CANCELLED, JOB_QUEUED
+        with open(avi_video_file, 'rb') as f:
+            content = f.read()
+        with patch('modules.routes.job_runner', JobRunner(1, max_detached=1)):
+            # Takes the only progressive thread and sends nothing
+            paused = self._start(logged_in_client, 4, filename='clip.avi').get_json()
+            status = self._start(logged_in_client, len(content), filename='clip.avi',
+                                 interval=0.5).get_json()
+            queued = routes.job_runner.get(status['job_id'])
+            assert queued.status == JOB_QUEUED
+            logged_in_client.put(f"{status['upload_url']}?offset=0", data=content)
+            
+            finalized = logged_in_client.post(status['finalize_url'], json={})
+            
+            job = routes.job_runner.get(finalized.get_json()['job_id'])
+            job.future.result(timeout=10)
+            assert job.result == {'project_id': status['project_id'], 'frame_count': 6}
+            assert queued.status == JOB_CANCELLED
+            logged_in_client.delete(paused['upload_url'])
+            routes.job_runner.get(paused['job_id']).future.result(timeout=10)
+    
+    def test_expired_upload_stops_extraction(self, logged_in_client, upload_service,
+                                             avi_video_file):
+        """Test that expiring an upload ends its progressive job and deletes its frames"""
+        from modules import routes
+        from modules.jobs import JOB_COMPLETED
+        with open(avi_video_file, 'rb') as f:
+            content = f.read()
+        upload_service.on_expire = routes._upload_expired
+        status = self._start(logged_in_client, len(content), filename='clip.avi').get_json()
+        logged_in_client.put(f"{status['upload_url']}?offset=0", data=content[:len(content) // 2])
+        upload = upload_service.get(status['upload_id'])
+        upload.created_at = time.time() - upload_service.expire_seconds - 1
+        
+        assert upload_service.expire() == [upload]
+        
+        job = routes.job_runner.get(status['job_id'])
+        job.future.result(timeout=10)
+        assert job.status != JOB_COMPLETED
+        assert job.cancel_requested
+        assert not os.path.exists(upload.path)
+        assert not os.path.exists(os.path.join(routes.video_processor.frames_folder,
+                                               status['project_id']))
+    
+    def test_progressive_disabled(self, logged_in_client, upload_service):
+        """Test that extraction can wait for the complete upload"""
+        for values in ({'progressive': False}, {'lazy': True}, {'sampling': 'count', 'target_count': 3}):
+            status = self._start(logged_in_client, 4, **values).get_json()
+            assert 'job_id' not in status
+    
+    def test_abort_stops_progressive_extraction(self, logged_in_client, upload_service,
+                                                avi_video_file):
+        """Test that abandoning the upload fails its extraction job"""
+        from modules import routes
+        from modules.jobs import JOB_FAILED
+        with open(avi_video_file, 'rb') as f:
+            content = f.read()
+        status = self._start(logged_in_client, len(content), filename='clip.avi').get_json()
+        logged_in_client.put(f"{status['upload_url']}?offset=0", data=content[:len(content) // 2])
+        
+        logged_in_client.delete(status['upload_url'])
+        
+        job = routes.job_runner.get(status['job_id'])
+        job.future.result(timeout=10)
+        assert job.status == JOB_FAILED
+        assert 'abandoned' in job.error
+        assert not os.path.exists(os.path.join(routes.video_processor.frames_folder,
+                                               status['project_id']))
+    
+    def test_checksum_mismatch(self, logged_in_client, upload_service):
+        """Test that a corrupt upload is discarded"""
+        status = self._start(logged_in_client, 4).get_json()
+        logged_in_client.put(f"{status['upload_url']}?offset=0", data=b'abcd')
+        
+        response = logged_in_client.post(status['finalize_url'], json={'sha256': '0' * 64})
+        
+        assert response.status_code == 422
+        assert logged_in_client.get(status['upload_url']).status_code == 404
+    
+    def test_abort_upload(self, logged_in_client, upload_service):
+        """Test that an abandoned upload is deleted"""
+        status = self._start(logged_in_client, 4).get_json()
+        logged_in_client.put(f"{status['upload_url']}?offset=0", data=b'ab')
+        path = upload_service.get(status['upload_id']).path
+        
+        response = logged_in_client.delete(status['upload_url'])
+        
+        assert response.status_code == 200
+        assert not os.path.exists(path)
+
+
+@pytest.mark.unit
+class TestServerImport:
+    """Test importing videos from allow-listed server folders"""
+    
+    @pytest.fixture
+    def footage(self, app, tmp_path, mock_video_file):
+        root = tmp_path / 'footage'
+        root.mkdir()
+        video = root / 'run1.mp4'
+        shutil.copy(mock_video_file, video)
+        with patch.dict(app.config, {'IMPORT_ROOTS': [str(root)]}):
+            yield video
+    
+    def test_requires_login(self, client):
+        """Test that importing is protected"""
+        assert client.post('/api/import', json={'path': '/tmp/a.mp4'}).status_code == 302
+    
+    def test_disabled_without_roots(self, logged_in_client, upload_service, app):
+        """Test that imports are refused unless folders are allow-listed"""
+        with patch.dict(app.config, {'IMPORT_ROOTS': []}):
+            response = logged_in_client.post('/api/import', json={'path': '/tmp/a.mp4'})
+        
+        assert response.status_code == 403
+    
+    def test_rejects_bad_paths(self, logged_in_client, upload_service, footage, tmp_path):
+        """Test allow-list, existence, file type and mode checks"""
+        outside = tmp_path / 'outside.mp4'
+        outside.write_bytes(b'x')
+        notes = footage.parent / 'notes.txt'
+        notes.write_bytes(b'x')
+        
+        def post(**values):
+            return logged_in_client.post('/api/import', json=values).status_code
+        
+        assert post(path=str(outside)) == 403
+        assert post(path=str(footage.parent / '..' / 'outside.mp4')) == 403
+        assert post(path=str(footage.parent / 'missing.mp4')) == 404
+        assert post(path=str(notes)) == 400
+        assert post(path=str(footage), mode='copy') == 400
+        assert post(path=str(footage), interval=50) == 400
+        assert post(path=str(footage), image_quality=0) == 400
+        assert post(path=str(footage), image_quality=101) == 400
+    
+    def test_import_extracts_linked_video(self, logged_in_client, upload_service, footage, app):
+        """Test that an imported video is hard-linked and extracted"""
+        from modules import routes
+        
+        response = logged_in_client.post('/api/import', json={
+            'path': str(footage), 'project_name': 'imported', 'interval': 1.0})
+        
+        assert response.status_code == 202
+        assert response.get_json()['linked'] is True
+        job = routes.job_runner.get(response.get_json()['job_id'])
+        job.future.result(timeout=10)
+        assert job.result == {'project_id': 'imported', 'frame_count': 3}
+        metadata = routes.video_processor.get_project_metadata('imported')
+        assert os.path.dirname(metadata['video_path']) == app.config['UPLOAD_FOLDER']
+        assert os.path.samefile(metadata['video_path'], footage)
+    
+    def test_import_by_reference(self, logged_in_client, upload_service, footage):
+        """Test that a referenced video is extracted where it is"""
+        from modules import routes
+        
+        response = logged_in_client.post('/api/import', json={
+            'path': str(footage), 'project_name': 'referenced', 'mode': 'reference'})
+        
+        assert response.get_json()['linked'] is False
+        routes.job_runner.get(response.get_json()['job_id']).future.result(timeout=10)
+        metadata = routes.video_processor.get_project_metadata('referenced')
+        assert metadata['video_path'] == os.path.realpath(footage)
+    
+    def test_failed_import_removes_link(self, logged_in_client, upload_service, footage, app):
+        """Test that the hard link of a video that was not extracted is removed"""
+        from modules import routes
+        
+        with patch.object(routes.video_processor, 'extract_frames',
+                          side_effect=RuntimeError('Could not open video')):
+            response = logged_in_client.post('/api/import', json={'path': str(footage)})
+        
+        assert response.get_json()['linked'] is True
+        job = routes.job_runner.get(response.get_json()['job_id'])
+        job.future.result(timeout=10)
+        assert job.status == 'failed'
+        for _ in range(50):
+            if not os.listdir(app.config['UPLOAD_FOLDER']):
+                break
+            time.sleep(0.1)
+        assert os.listdir(app.config['UPLOAD_FOLDER']) == []
+        assert footage.exists()
+    
+    def test_rejected_submission_removes_link(self, logged_in_client, upload_service, footage, app):
+        """Test that the hard link is removed when the job cannot be submitted"""
+        from modules import routes
+        
+        with patch.object(routes.job_runner, 'submit', side_effect=RuntimeError('shut down')):
+            with pytest.raises(RuntimeError):
+                logged_in_client.post('/api/import', json={'path': str(footage)})
+        
+        assert os.listdir(app.config['UPLOAD_FOLDER']) == []
+        assert footage.exists()
+
+
+@pytest.mark.unit
+class TestBatchImport:
+    """Test queuing many server-side videos in one request"""
+    
+    @pytest.fixture
+    def footage(self, app, tmp_path, mock_video_file):
+        root = tmp_path / 'footage'
+        (root / 'day2').mkdir(parents=True)
+        for path in (root / 'a.mp4', root / 'b.mp4', root / 'day2' / 'c.mp4'):
+            shutil.copy(mock_video_file, path)
+        (root / 'notes.txt').write_bytes(b'x')
+        with patch.dict(app.config, {'IMPORT_ROOTS': [str(root)]}):
+            yield root
+    
+    def test_requires_login(self, client):
+        """Test that batch import is protected"""
+        assert client.post('/api/batch', json={'paths': ['/tmp/a.mp4']}).status_code == 302
+    
+    def test_disabled_without_roots(self, logged_in_client, upload_service, app):
+        """Test that batches are refused unless folders are allow-listed"""
+        with patch.dict(app.config, {'IMPORT_ROOTS': []}):
+            response = logged_in_client.post('/api/batch', json={'paths': ['/tmp/a.mp4']})
+        
+        assert response.status_code == 403
+    
+    def test_directory_batch(self, logged_in_client, upload_service, footage):
+        """Test that every video of a folder gets its own extraction job"""
+        from modules import routes
+        
+        response = logged_in_client.post('/api/batch', json={
+            'directory': str(footage), 'recursive': True, 'interval': 1.0})
+        
+        assert response.status_code == 202
+        data = response.get_json()
+        assert [os.path.basename(job['path']) for job in data['jobs']] == ['a.mp4', 'b.mp4', 'c.mp4']
+        assert data['errors'] == []
+        for entry in data['jobs']:
+            job = routes.job_runner.get(entry['job_id'])
+            job.future.result(timeout=10)
+            assert job.result['frame_count'] == 3
+            assert job.duration_estimate > 0
+        
+        listed = logged_in_client.get('/api/jobs').get_json()['jobs']
+        assert {job['job_id'] for job in listed} == {job['job_id'] for job in data['jobs']}
+    
+    def test_top_level_only_by_default(self, logged_in_client, upload_service, footage):
+        """Test that sub-folders are only scanned when recursive is set"""
+        response = logged_in_client.post('/api/batch', json={'directory': str(footage)})
+        
+        assert len(response.get_json()['jobs']) == 2
+    
+    def test_rejected_paths_are_reported(self, logged_in_client, upload_service, footage, tmp_path):
+        """Test that bad entries are listed while the rest are queued"""
+        outside = tmp_path / 'outside.mp4'
+        outside.write_bytes(b'x')
+        
+        response = logged_in_client.post('/api/batch', json={'paths': [
+            str(footage / 'a.mp4'), str(outside), str(footage / 'missing.mp4'),
+            str(footage / 'notes.txt')]})
+        
+        assert response.status_code == 202
+        data = response.get_json()
+        assert len(data['jobs']) == 1
+        assert [error['path'] for error in data['errors']] == [
+            str(outside), str(footage / 'missing.mp4'), str(footage / 'notes.txt')]
+    
+    def test_rejects_bad_requests(self, logged_in_client, upload_service, footage, tmp_path, app):
+        """Test folder, empty batch, settings and size checks"""
+        def post(**values):
+            return logged_in_client.post('/api/batch', json=values).status_code
+        
+        assert post() == 400
+        assert post(directory=str(tmp_path)) == 403
+        assert post(directory=str(footage / 'missing')) == 404
+        assert post(paths=[str(tmp_path / 'x.mp4')]) == 400
+        assert post(directory=str(footage), mode='copy') == 400
+        assert post(directory=str(footage), interval=50) == 400
+        assert post(directory=str(footage), image_quality=150) == 400
+        with patch.dict(app.config, {'MAX_BATCH_FILES': 1}):
+            assert post(directory=str(footage)) == 413
+    
+    def test_oversized_scan_stops_early(self, logged_in_client, upload_service, footage, app):
+        """Test that a recursive scan ends once the batch is known to be too big"""
+        from modules import routes
+        visited = []
+        walk = os.walk
+        
+        def recording_walk(top):
+            for folder, subfolders, names in walk(top):
+                visited.append(folder)
+                yield folder, subfolders, names
+        
+        with patch.dict(app.config, {'MAX_BATCH_FILES': 1}), \
+                patch.object(routes.os, 'walk', recording_walk):
+            response = logged_in_client.post('/api/batch', json={
+                'directory': str(footage), 'recursive': True})
+        
+        assert response.status_code == 413
+        assert visited == [str(footage)]
+
+
 @pytest.mark.unit
 class TestSessionManagement:
     """Test session management and project tracking"""
@@ -351,8 +1065,12 @@ class TestSessionManagement:
         data = {'video': (video_data, 'test.mp4')}
         
         response = authenticated_client.post('/upload', data=data)
+        job_id = json.loads(response.data)['job_id']
+        from modules import routes
+        routes.job_runner.get(job_id).future.result(timeout=5)
+        authenticated_client.get(f'/api/jobs/{job_id}')
         
-        # Check session was updated
+        # Check session was updated once the job completed
         with authenticated_client.session_transaction() as sess:
             assert sess.get('current_project') == 'session-test-project'
             assert sess.get('current_frame') == 0
@@ -445,7 +1163,7 @@ class TestRouteIntegration:
             'project_name': 'Integration Test'
         })
         
-        assert upload_response.status_code == 200
+        assert upload_response.status_code == 202
         
         # 2. Access annotation page
         mock_storage.load_project_metadata.return_value = {
@@ -0,0 +1,247 @@
+"""
+Unit tests for VisionLabel Pro upload storage.
+
+This module tests the upload helpers including:
+- Writing upload streams to disk
+- Hashing uploads while they are written
+- Hashing stored files
+- Resumable chunked uploads
+- Allow-listed import of server-side videos
+"""
+
+import pytest
+import hashlib
+import os
+import time
+from io import BytesIO
+from unittest.mock import patch
+
+from modules.uploads import (save_stream, file_sha256, resolve_import_path, import_video,
+                             ChunkedUploads, UploadOffsetError)
+
+
+@pytest.mark.unit
+class TestSaveStream:
+    """Test writing and hashing upload streams"""
+    
+    def test_content_and_digest(self, tmp_path):
+        """Test that the file is written and its SHA-256 returned"""
+        content = bytes(range(256)) * 1000
+        path = str(tmp_path / 'video.mp4')
+        
+        digest = save_stream(BytesIO(content), path, chunk_size=4096)
+        
+        with open(path, 'rb') as f:
+            assert f.read() == content
+        assert digest == hashlib.sha256(content).hexdigest()
+    
+    def test_digest_independent_of_chunk_size(self, tmp_path):
+        """Test that chunking does not change the digest"""
+        content = b'frame data ' * 5000
+        
+        digests = {save_stream(BytesIO(content), str(tmp_path / f'{size}.mp4'), chunk_size=size)
+                   for size in (1, 7, 4096, 1024 * 1024)}
+        
+        assert len(digests) == 1
+    
+    def test_empty_stream(self, tmp_path):
+        """Test that an empty upload gives an empty file"""
+        path = str(tmp_path / 'empty.mp4')
+        
+        assert save_stream(BytesIO(b''), path) == hashlib.sha256(b'').hexdigest()
+        assert file_sha256(path) == hashlib.sha256(b'').hexdigest()
+    
+    def test_file_digest_matches_stream_digest(self, tmp_path):
+        """Test that stored files hash like the stream they came from"""
+        path = str(tmp_path / 'video.mp4')
+        digest = save_stream(BytesIO(b'x' * 3_000_000), path)
+        
+        assert file_sha256(path) == digest
+
+
+@pytest.mark.unit
+class TestChunkedUploads:
+    """Test resumable uploads sent in byte-offset chunks"""
+    
+    CONTENT = bytes(range(256)) * 400
+    
+    @pytest.fixture
+    def uploads(self, tmp_path):
+        return ChunkedUploads(str(tmp_path), max_size=1024 * 1024)
+    
+    def test_create_limits(self, uploads):
+        """Test that sizes outside the limit are refused"""
+        with pytest.raises(ValueError):
+            uploads.create('clip.mp4', 0)
+        with pytest.raises(ValueError):
+            uploads.create('clip.mp4', 1024 * 1024 + 1)
+        
+        upload = uploads.create('clip.mp4', 10, owner_id='user', params={'interval': 2.0})
+        assert upload.offset == 0
+        assert upload.path.endswith('_clip.mp4')
+        assert os.path.exists(upload.path)
+    
+    def test_chunks_in_order(self, uploads):
+        """Test that chunks are appended and hashed as they arrive"""
+        upload = uploads.create('clip.mp4', len(self.CONTENT))
+        
+        for start in range(0, len(self.CONTENT), 30000):
+            chunk = self.CONTENT[start:start + 30000]
+            assert uploads.append(upload, start, BytesIO(chunk), chunk_size=4096) == start + len(chunk)
+        
+        assert upload.complete
+        assert uploads.finish(upload) == hashlib.sha256(self.CONTENT).hexdigest()
+        with open(upload.path, 'rb') as f:
+            assert f.read() == self.CONTENT
+        assert uploads.get(upload.id) is None
+    
+    def test_wrong_offset(self, uploads):
+        """Test that a chunk at the wrong offset reports where to resume"""
+        upload = uploads.create('clip.mp4', len(self.CONTENT))
+        uploads.append(upload, 0, BytesIO(self.CONTENT[:1000]))
+        
+        with pytest.raises(UploadOffsetError) as error:
+            uploads.append(upload, 0, BytesIO(self.CONTENT[:1000]))
+        
+        assert error.value.expected == 1000
+        assert upload.offset == 1000
+    
+    def test_resume_after_restart(self, uploads, tmp_path):
+        """Test that a new instance continues from the partial file"""
+        upload = uploads.create('clip.mp4', len(self.CONTENT), params={'interval': 2.0})
+        uploads.append(upload, 0, BytesIO(self.CONTENT[:5000]))
+        
+        restarted = ChunkedUploads(str(tmp_path), max_size=1024 * 1024)
+        resumed = restarted.get(upload.id)
+        assert resumed.offset == 5000
+        assert resumed.params == {'interval': 2.0}
+        
+        restarted.append(resumed, 5000, BytesIO(self.CONTENT[5000:]))
+        assert restarted.finish(resumed) == hashlib.sha256(self.CONTENT).hexdigest()
+    
+    def test_unknown_upload(self, uploads):
+        """Test lookups of unknown or malformed ids"""
+        assert uploads.get('0' * 32) is None
+        assert uploads.get('../etc') is None
+    
+    def test_overflow(self, uploads):
+        """Test that more bytes than announced are refused"""
+        upload = uploads.create('clip.mp4', 10)
+        
+        with pytest.raises(ValueError):
+            uploads.append(upload, 0, BytesIO(b'x' * 11))
+    
+    def test_finish_checks(self, uploads):
+        """Test that incomplete or corrupt uploads cannot be finished"""
+        upload = uploads.create('clip.mp4', 4)
+        uploads.append(upload, 0, BytesIO(b'ab'))
+        with pytest.raises(ValueError):
+            uploads.finish(upload)
+        
+        uploads.append(upload, 2, BytesIO(b'cd'))
+        with pytest.raises(ValueError):
+            uploads.finish(upload, sha256='0' * 64)
+        
+        expected = hashlib.sha256(b'abcd').hexdigest()
+        assert uploads.finish(upload, sha256=expected.upper()) == expected
+    
+    def test_abort_and_expire(self, uploads):
+        """Test that dropped and stale uploads are deleted"""
+        aborted = uploads.create('a.mp4', 4)
+        uploads.abort(aborted)
+        assert not os.path.exists(aborted.path)
+        assert uploads.get(aborted.id) is None
+        
+        stale = uploads.create('b.mp4', 4)
+        fresh = uploads.create('c.mp4', 4)
+        stale.created_at = time.time() - uploads.expire_seconds - 1
+        uploads.expire()
+        
+        assert not os.path.exists(stale.path)
+        assert uploads.get(fresh.id) is fresh
+    
+    def test_periodic_expiry(self, uploads):
+        """Test that the expiry thread aborts stale uploads and reports them"""
+        expired = []
+        uploads.on_expire = expired.append
+        stale = uploads.create('a.mp4', 4)
+        stale.created_at = time.time() - uploads.expire_seconds - 1
+        
+        uploads.start_expiry(interval=0.05)
+        try:
+            for _ in range(100):
+                if expired:
+                    break
+                time.sleep(0.05)
+        finally:
+            uploads.stop_expiry()
+        
+        assert expired == [stale]
+        assert not os.path.exists(stale.path)
+
+
+@pytest.mark.unit
+class TestServerImport:
+    """Test importing videos that are already on the server"""
+    
+    @pytest.fixture
+    def footage(self, tmp_path):
+        root = tmp_path / 'footage'
+        root.mkdir()
+        video = root / 'run1.mp4'
+        video.write_bytes(b'video data')
+        return root, video
+    
+    def test_path_inside_root(self, footage):
+        """Test that videos inside an allowed folder resolve"""
+        root, video = footage
+        
+        assert resolve_import_path(str(video), [str(root)]) == os.path.realpath(video)
+        assert resolve_import_path(str(root / 'sub' / '..' / 'run1.mp4'), [str(root)]) == \
+            os.path.realpath(video)
+        assert resolve_import_path(str(video), None) == os.path.realpath(video)
+    
+    def test_path_outside_roots(self, footage, tmp_path):
+        """Test that paths escaping the allowed folders are refused"""
+        root, _ = footage
+        secret = tmp_path / 'secret.mp4'
+        secret.write_bytes(b'x')
+        (root / 'link.mp4').symlink_to(secret)
+        sibling = tmp_path / 'footage2'
+        sibling.mkdir()
+        (sibling / 'b.mp4').write_bytes(b'x')
+        
+        for path in (str(secret), str(root / '..' / 'secret.mp4'), str(root / 'link.mp4'),
+                     str(sibling / 'b.mp4'), 'footage/run1.mp4', ''):
+            with pytest.raises(PermissionError):
+                resolve_import_path(path, [str(root)])
+        with pytest.raises(PermissionError):
+            resolve_import_path(str(secret), [])
+    
+    def test_missing_file(self, footage):
+        """Test that only existing files can be imported"""
+        root, _ = footage
+        
+        with pytest.raises(FileNotFoundError):
+            resolve_import_path(str(root / 'missing.mp4'), [str(root)])
+        with pytest.raises(FileNotFoundError):
+            resolve_import_path(str(root), [str(root)])
+    
+    def test_link_and_reference(self, footage, tmp_path):
+        """Test that imports are hard-linked or referenced, never copied"""
+        _, video = footage
+        upload_folder = str(tmp_path / 'uploads')
+        
+        linked = import_video(str(video), upload_folder)
+        assert os.path.dirname(linked) == upload_folder
+        assert os.path.samefile(linked, video)
+        assert import_video(str(video), upload_folder, 'reference') == str(video)
+        with pytest.raises(ValueError):
+            import_video(str(video), upload_folder, 'copy')
+    
+    def test_link_falls_back_to_reference(self, footage, tmp_path):
+        """Test that videos on another file system are used in place"""
+        _, video = footage
+        
+        with patch('modules.uploads.os.link', side_effect=OSError(18, 'Invalid cross-device link')):
+            assert import_video(str(video), str(tmp_path / 'uploads')) == str(video)
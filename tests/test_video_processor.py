@@ -14,11 +14,13 @@ import pytest
 import os
 import tempfile
 import shutil
+import threading
 from unittest.mock import patch, MagicMock, call, mock_open
 import cv2
 import numpy as np
 
-from modules.video_processor import VideoProcessor
+from modules.video_processor import VideoProcessor, ExtractionCancelled, extraction_params
+from modules.manifest import frame_numbers, frame_timestamps
 
 
 @pytest.mark.unit
@@ -65,6 +67,16 @@ class TestVideoFrameExtraction:
         
         assert 'Could not open video file' in str(exc_info.value)
     
+    def test_unreadable_video_leaves_no_project(self, video_processor, tmp_path):
+        """Test that no project folder is created for a video that cannot be opened"""
+        video = tmp_path / 'broken.mp4'
+        video.write_bytes(b'not a video')
+        
+        with pytest.raises(ValueError):
+            video_processor.extract_frames(str(video), project_name='broken')
+        
+        assert not os.path.exists(os.path.join(video_processor.frames_folder, 'broken'))
+    
     @patch('cv2.VideoCapture')
     @patch('cv2.imwrite')
     @patch('os.path.exists')
@@ -240,15 +252,805 @@ class TestVideoFrameExtraction:
         mock_cap.set.return_value = True
         mock_capture.return_value = mock_cap
         
-        # Execute - should handle write failure gracefully
+        # Execute - a frame that was not written must not be listed in a project
+        with pytest.raises(OSError, match='Could not write frame'):
+            video_processor.extract_frames('/path/to/video.mp4', interval=1.0)
+
+
+@pytest.mark.unit
+class TestFrameSamplingStrategy:
+    """Test grab/seek sampling strategy selection and decoding"""
+    
+    def test_choose_grab_when_keyframes_unknown(self, video_processor):
+        """Test that grab is used when the keyframe spacing is unknown"""
+        assert video_processor.choose_sampling_strategy(60, None) == 'grab'
+    
+    def test_choose_grab_when_every_frame_sampled(self, video_processor):
+        """Test that grab is used when no frames are skipped"""
+        assert video_processor.choose_sampling_strategy(1, 1.0) == 'grab'
+    
+    def test_choose_seek_for_sparse_sampling(self, video_processor):
+        """Test that seek is used when the interval spans several GOPs"""
+        assert video_processor.choose_sampling_strategy(60, 12.0) == 'seek'
+        assert video_processor.choose_sampling_strategy(1800, 250.0) == 'seek'
+    
+    def test_choose_grab_for_long_gop(self, video_processor):
+        """Test that grab is used when a seek would decode more than it skips"""
+        assert video_processor.choose_sampling_strategy(30, 250.0) == 'grab'
+    
+    def test_invalid_strategy(self, video_processor, mock_video_file):
+        """Test that unknown strategies are rejected"""
+        with pytest.raises(ValueError):
+            video_processor.extract_frames(mock_video_file, strategy='bogus')
+    
+    @patch('cv2.VideoCapture')
+    @patch('cv2.imwrite')
+    @patch('os.path.exists')
+    @patch('os.makedirs')
+    @patch('builtins.open', new_callable=mock_open)
+    def test_grab_strategy_skips_decoding(self, mock_file_open, mock_makedirs, mock_exists,
+                                          mock_imwrite, mock_capture, video_processor):
+        """Test that skipped frames are grabbed without being retrieved"""
+        mock_exists.return_value = True
+        
+        mock_cap = MagicMock()
+        mock_cap.isOpened.return_value = True
+        mock_cap.get.side_effect = lambda prop: {
+            cv2.CAP_PROP_FPS: 30.0,
+            cv2.CAP_PROP_FRAME_COUNT: 90
+        }.get(prop, 0)
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        mock_cap.read.return_value = (True, frame)
+        mock_cap.grab.return_value = True
+        mock_capture.return_value = mock_cap
+        
         project_id, frame_paths, metadata = video_processor.extract_frames(
-            '/path/to/video.mp4', interval=1.0
+            '/path/to/video.mp4', interval=1.0, strategy='grab'
+        )
+        
+        assert len(frame_paths) == 3
+        assert mock_cap.read.call_count == 3
+        assert mock_cap.grab.call_count == 87
+        assert metadata['sampling_strategy'] == 'grab'
+    
+    @patch('cv2.VideoCapture')
+    @patch('cv2.imwrite')
+    @patch('os.path.exists')
+    @patch('os.makedirs')
+    @patch('builtins.open', new_callable=mock_open)
+    def test_seek_strategy_sets_position(self, mock_file_open, mock_makedirs, mock_exists,
+                                         mock_imwrite, mock_capture, video_processor):
+        """Test that the seek strategy jumps straight to each sampled frame"""
+        mock_exists.return_value = True
+        
+        mock_cap = MagicMock()
+        mock_cap.isOpened.return_value = True
+        mock_cap.get.side_effect = lambda prop: {
+            cv2.CAP_PROP_FPS: 30.0,
+            cv2.CAP_PROP_FRAME_COUNT: 90
+        }.get(prop, 0)
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        mock_cap.read.return_value = (True, frame)
+        mock_cap.set.return_value = True
+        mock_capture.return_value = mock_cap
+        
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            '/path/to/video.mp4', interval=1.0, strategy='seek'
+        )
+        
+        assert len(frame_paths) == 3
+        mock_cap.set.assert_has_calls([
+            call(cv2.CAP_PROP_POS_FRAMES, 30),
+            call(cv2.CAP_PROP_POS_FRAMES, 60)
+        ])
+        mock_cap.grab.assert_not_called()
+    
+    def test_strategies_produce_identical_frames(self, video_processor, mock_video_file):
+        """Test that grab and seek sampling write the same frames"""
+        _, grab_paths, _ = video_processor.extract_frames(
+            mock_video_file, interval=0.5, project_name='grab_test', strategy='grab'
+        )
+        _, seek_paths, _ = video_processor.extract_frames(
+            mock_video_file, interval=0.5, project_name='seek_test', strategy='seek'
+        )
+        
+        assert len(grab_paths) == len(seek_paths) == 6
+        for grab_path, seek_path in zip(grab_paths, seek_paths):
+            with open(grab_path, 'rb') as a, open(seek_path, 'rb') as b:
+                assert a.read() == b.read()
+    
+    def test_probe_keyframe_interval(self, video_processor, mock_video_file):
+        """Test keyframe spacing probe on a real video"""
+        keyframe_interval = video_processor.probe_keyframe_interval(mock_video_file)
+        
+        if keyframe_interval is not None:
+            assert keyframe_interval >= 1
+    
+    def test_probe_duration(self, video_processor, mock_video_file, tmp_path):
+        """Test duration probe from the container header"""
+        assert video_processor.probe_duration(mock_video_file) == pytest.approx(3.0)
+        assert video_processor.probe_duration(str(tmp_path / 'missing.mp4')) == 0.0
+    
+    def test_estimate_duration(self, video_processor, tmp_path):
+        """Test that the scheduling estimate follows the file size"""
+        video = tmp_path / 'clip.mp4'
+        video.write_bytes(b'x' * (2 * video_processor.ESTIMATE_BYTES_PER_SECOND))
+        
+        assert video_processor.estimate_duration(str(video)) == pytest.approx(2.0)
+        assert video_processor.estimate_duration(str(tmp_path / 'missing.mp4')) == 0.0
+
+
+@pytest.mark.unit
+class TestParallelSegmentExtraction:
+    """Test splitting extraction across worker processes"""
+    
+    def test_single_worker_uses_one_segment(self, app):
+        """Test that a single worker never splits the video"""
+        processor = VideoProcessor(app.config['FRAMES_FOLDER'])
+        
+        assert processor.plan_segments(108000, 60.0, 60) == [(0, 108000)]
+    
+    def test_short_video_uses_one_segment(self, app):
+        """Test that videos shorter than two segments are not split"""
+        processor = VideoProcessor(app.config['FRAMES_FOLDER'], workers=8, min_segment_seconds=30.0)
+        
+        assert processor.plan_segments(1500, 30.0, 30) == [(0, 1500)]
+    
+    def test_segments_start_on_sampled_frames(self, app):
+        """Test that segments cover the video and start on sampled frames"""
+        processor = VideoProcessor(app.config['FRAMES_FOLDER'], workers=4, min_segment_seconds=30.0)
+        
+        segments = processor.plan_segments(108000, 60.0, 45)
+        
+        assert len(segments) == 4
+        assert segments[0][0] == 0
+        assert segments[-1][1] == 108000
+        for (_, end), (start, _) in zip(segments, segments[1:]):
+            assert end == start
+        for start, _ in segments:
+            assert start % 45 == 0
+    
+    def test_segment_count_limited_by_min_length(self, app):
+        """Test that segments are never shorter than the configured minimum"""
+        processor = VideoProcessor(app.config['FRAMES_FOLDER'], workers=32, min_segment_seconds=60.0)
+        
+        segments = processor.plan_segments(30 * 300, 30.0, 30)
+        
+        assert len(segments) == 5
+    
+    def test_extraction_cores(self, app):
+        """Test the cores an extraction is scheduled with"""
+        processor = VideoProcessor(app.config['FRAMES_FOLDER'], workers=4,
+                                   min_segment_seconds=60.0, encoder_threads=3)
+        
+        assert processor.extraction_cores(3600) == 4
+        assert processor.extraction_cores(150) == 2
+        assert processor.extraction_cores(30) == 4  # Decoder plus encoder threads
+        assert processor.extraction_cores(3600, parallel=False) == 4
+        assert VideoProcessor(app.config['FRAMES_FOLDER'], encoder_threads=1).extraction_cores(3600) == 1
+    
+    @pytest.mark.slow
+    def test_parallel_matches_sequential(self, app, mock_video_file):
+        """Test that parallel extraction writes the same files as sequential"""
+        sequential = VideoProcessor(app.config['FRAMES_FOLDER'])
+        parallel = VideoProcessor(app.config['FRAMES_FOLDER'], workers=3, min_segment_seconds=0.5)
+        
+        _, sequential_paths, sequential_meta = sequential.extract_frames(
+            mock_video_file, interval=0.2, project_name='sequential', strategy='grab'
+        )
+        _, parallel_paths, parallel_meta = parallel.extract_frames(
+            mock_video_file, interval=0.2, project_name='parallel', strategy='grab'
+        )
+        
+        assert [os.path.basename(p) for p in parallel_paths] == \
+            [os.path.basename(p) for p in sequential_paths]
+        assert parallel_meta['extracted_count'] == sequential_meta['extracted_count'] == 15
+        for sequential_path, parallel_path in zip(sequential_paths, parallel_paths):
+            with open(sequential_path, 'rb') as a, open(parallel_path, 'rb') as b:
+                assert a.read() == b.read()
+        assert np.array_equal(parallel.get_frame_index('parallel'),
+                              sequential.get_frame_index('sequential'))
+
+
+@pytest.mark.unit
+class TestPipelinedExtraction:
+    """Test the threaded decode/encode pipeline"""
+    
+    def test_queue_size_from_buffer(self, app):
+        """Test that the buffer size caps the number of queued frames"""
+        processor = VideoProcessor(app.config['FRAMES_FOLDER'], encoder_threads=4,
+                                   pipeline_buffer_mb=100)
+        mock_cap = MagicMock()
+        mock_cap.get.side_effect = lambda prop: {
+            cv2.CAP_PROP_FRAME_WIDTH: 3840,
+            cv2.CAP_PROP_FRAME_HEIGHT: 2160
+        }.get(prop, 0)
+        
+        # 100MB holds four 3840x2160 BGR frames
+        assert processor.pipeline_queue_size(mock_cap) == 4
+    
+    def test_queue_size_unknown_dimensions(self, app):
+        """Test the queue size fallback when frame dimensions are unknown"""
+        processor = VideoProcessor(app.config['FRAMES_FOLDER'], encoder_threads=3)
+        mock_cap = MagicMock()
+        mock_cap.get.return_value = 0
+        
+        assert processor.pipeline_queue_size(mock_cap) == 6
+    
+    def test_pipelined_matches_sequential(self, app, mock_video_file):
+        """Test that pipelined extraction writes the same files as sequential"""
+        sequential = VideoProcessor(app.config['FRAMES_FOLDER'])
+        pipelined = VideoProcessor(app.config['FRAMES_FOLDER'], encoder_threads=4,
+                                   pipeline_buffer_mb=1)
+        
+        _, sequential_paths, _ = sequential.extract_frames(
+            mock_video_file, interval=0.1, project_name='sequential'
+        )
+        _, pipelined_paths, metadata = pipelined.extract_frames(
+            mock_video_file, interval=0.1, project_name='pipelined'
         )
         
-        # Should still return results even if some writes failed
-        assert project_id is not None
-        assert isinstance(frame_paths, list)
-        assert isinstance(metadata, dict)
+        assert metadata['extracted_count'] == len(sequential_paths) == 30
+        for sequential_path, pipelined_path in zip(sequential_paths, pipelined_paths):
+            with open(sequential_path, 'rb') as a, open(pipelined_path, 'rb') as b:
+                assert a.read() == b.read()
+    
+    @patch('cv2.imwrite')
+    def test_encoder_error_propagates(self, mock_imwrite, app, mock_video_file):
+        """Test that an encoder failure aborts the extraction"""
+        mock_imwrite.side_effect = cv2.error("encode failed")
+        processor = VideoProcessor(app.config['FRAMES_FOLDER'], encoder_threads=2)
+        
+        with pytest.raises(cv2.error):
+            processor.extract_frames(mock_video_file, interval=0.5)
+
+
+@pytest.mark.integration
+class TestExtractionProgress:
+    """Test progress reporting and cancellation during extraction"""
+    
+    def test_progress_callback_reports_counts(self, video_processor, mock_video_file):
+        """Test that progress is reported for every written frame"""
+        reports = []
+        
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            mock_video_file, interval=1.0,
+            progress_callback=lambda decoded, written, total: reports.append((decoded, written, total))
+        )
+        
+        assert reports[0] == (0, 0, 90)
+        assert [written for _, written, _ in reports[1:]] == [1, 2, 3]
+        assert all(total == 90 for _, _, total in reports)
+    
+    def test_cancel_removes_partial_project(self, video_processor, mock_video_file):
+        """Test that cancelling from the callback aborts and cleans up"""
+        def cancel_after_first_frame(decoded, written, total):
+            if written >= 1:
+                raise ExtractionCancelled()
+        
+        with pytest.raises(ExtractionCancelled):
+            video_processor.extract_frames(
+                mock_video_file, interval=0.5, project_name='cancelled',
+                progress_callback=cancel_after_first_frame
+            )
+        
+        assert not os.path.exists(os.path.join(video_processor.frames_folder, 'cancelled'))
+    
+    def test_segment_stops_at_cancel_event(self, video_processor, mock_video_file, tmp_path):
+        """Test that a segment worker stops once the shared cancel event is set"""
+        from modules.video_processor import _extract_segment
+        cancel_event = threading.Event()
+        cancel_event.set()
+        
+        with pytest.raises(ExtractionCancelled):
+            _extract_segment(video_processor.frames_folder, mock_video_file, str(tmp_path),
+                             0, 90, 15, 'grab', 'segment_000_', cancel_event=cancel_event)
+        
+        assert len(list(tmp_path.glob('segment_*'))) <= 1
+    
+    @pytest.mark.slow
+    def test_cancel_parallel_extraction(self, app, mock_video_file):
+        """Test that cancelling stops running segments and cleans up"""
+        processor = VideoProcessor(app.config['FRAMES_FOLDER'], workers=3, min_segment_seconds=0.5)
+        
+        reports = []
+        
+        def cancel(decoded, written, total):
+            # The first report comes before the segments are started
+            reports.append(decoded)
+            if len(reports) > 1:
+                raise ExtractionCancelled()
+        
+        with pytest.raises(ExtractionCancelled):
+            processor.extract_frames(mock_video_file, interval=0.2, project_name='cancelled',
+                                     strategy='grab', progress_callback=cancel)
+        
+        assert len(reports) == 2
+        assert not os.path.exists(os.path.join(processor.frames_folder, 'cancelled'))
+
+
+@pytest.mark.integration
+class TestLazyProjects:
+    """Test on-demand frame materialization"""
+    
+    def test_create_lazy_project_writes_no_frames(self, video_processor, mock_video_file):
+        """Test that a lazy project only records frame timestamps"""
+        project_id, frame_paths, metadata = video_processor.create_lazy_project(
+            mock_video_file, interval=1.0, project_name='lazy'
+        )
+        
+        assert metadata['lazy'] is True
+        assert metadata['extracted_count'] == 3
+        assert list(frame_timestamps(metadata)) == [0.0, 1.0, 2.0]
+        assert not any(os.path.exists(p) for p in frame_paths)
+        assert video_processor.get_project_metadata('lazy')['extracted_count'] == 3
+    
+    def test_materialize_frame_matches_eager_extraction(self, video_processor, mock_video_file):
+        """Test that an on-demand frame equals the eagerly extracted one"""
+        _, eager_paths, _ = video_processor.extract_frames(
+            mock_video_file, interval=1.0, project_name='eager'
+        )
+        video_processor.create_lazy_project(mock_video_file, interval=1.0, project_name='lazy')
+        
+        frame_path = video_processor.materialize_frame('lazy', 2)
+        
+        assert os.path.exists(frame_path)
+        assert os.path.basename(frame_path) == os.path.basename(eager_paths[2])
+        with open(frame_path, 'rb') as a, open(eager_paths[2], 'rb') as b:
+            assert a.read() == b.read()
+        # Only the requested frame is cached
+        cached = [f for f in os.listdir(os.path.dirname(frame_path)) if f.endswith('.jpg')]
+        assert cached == ['frame_000002.jpg']
+    
+    def test_materialize_frame_out_of_range(self, video_processor, mock_video_file):
+        """Test that out-of-range lazy frames raise IndexError"""
+        video_processor.create_lazy_project(mock_video_file, interval=1.0, project_name='lazy')
+        
+        with pytest.raises(IndexError):
+            video_processor.materialize_frame('lazy', 3)
+    
+    def test_materialize_missing_eager_frame(self, video_processor, mock_video_file):
+        """Test that a deleted frame of an eager project is reported missing"""
+        _, frame_paths, _ = video_processor.extract_frames(
+            mock_video_file, interval=1.0, project_name='eager'
+        )
+        os.remove(frame_paths[0])
+        
+        with pytest.raises(FileNotFoundError):
+            video_processor.materialize_frame('eager', 0)
+
+
+@pytest.fixture
+def scene_video_file():
+    """
+    Create a video with three static scenes of one second each.
+    
+    Returns:
+        str: Path to the video file
+    """
+    temp_file = tempfile.NamedTemporaryFile(mode='wb', suffix='.mp4', delete=False)
+    temp_file.close()
+    
+    out = cv2.VideoWriter(temp_file.name, cv2.VideoWriter_fourcc(*'mp4v'), 30.0, (320, 240))
+    for color in ([20, 20, 20], [200, 60, 60], [60, 200, 220]):
+        for _ in range(30):
+            frame = np.zeros((240, 320, 3), dtype=np.uint8)
+            frame[:, :] = color
+            out.write(frame)
+    out.release()
+    
+    yield temp_file.name
+    os.unlink(temp_file.name)
+
+
+@pytest.mark.unit
+class TestSceneSampling:
+    """Test scene-change adaptive sampling"""
+    
+    def test_identical_frames_score_zero(self, video_processor):
+        """Test that identical signatures do not count as a change"""
+        frame = np.full((480, 640, 3), 128, dtype=np.uint8)
+        signature = video_processor.frame_signature(frame)
+        
+        assert signature.shape == (48, 64)
+        assert video_processor.scene_change_score(signature, signature) == 0.0
+    
+    def test_cut_scores_high(self, video_processor):
+        """Test that a hard cut scores above the default threshold"""
+        dark = video_processor.frame_signature(np.full((480, 640, 3), 10, dtype=np.uint8))
+        bright = video_processor.frame_signature(np.full((480, 640, 3), 240, dtype=np.uint8))
+        
+        assert video_processor.scene_change_score(dark, bright) > 0.5
+    
+    def test_small_noise_scores_low(self, video_processor):
+        """Test that sensor noise stays below the default threshold"""
+        rng = np.random.default_rng(0)
+        base = np.full((480, 640, 3), 120, dtype=np.uint8)
+        noisy = np.clip(base + rng.integers(-3, 4, base.shape), 0, 255).astype(np.uint8)
+        
+        score = video_processor.scene_change_score(video_processor.frame_signature(base),
+                                                   video_processor.frame_signature(noisy))
+        assert score < 0.15
+    
+    def test_invalid_sampling_mode(self, video_processor, mock_video_file):
+        """Test that unknown sampling modes are rejected"""
+        with pytest.raises(ValueError):
+            video_processor.extract_frames(mock_video_file, sampling='random')
+    
+    def test_scene_sampling_keeps_one_frame_per_scene(self, video_processor, scene_video_file):
+        """Test that static scenes produce a single frame each"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            scene_video_file, sampling='scene', project_name='scenes'
+        )
+        
+        assert len(frame_paths) == 3
+        assert metadata['sampling'] == 'scene'
+        assert list(frame_numbers(metadata)) == [0, 30, 60]
+        assert list(frame_timestamps(metadata)) == [0.0, 1.0, 2.0]
+        assert [os.path.basename(p) for p in frame_paths] == [
+            'frame_000000.jpg', 'frame_000001.jpg', 'frame_000002.jpg'
+        ]
+    
+    def test_scene_sampling_max_gap(self, video_processor, scene_video_file):
+        """Test that max_gap forces frames inside long static scenes"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            scene_video_file, sampling='scene', max_gap=0.5
+        )
+        
+        assert list(frame_numbers(metadata)) == [0, 15, 30, 45, 60, 75]
+    
+    def test_scene_sampling_min_gap(self, video_processor, scene_video_file):
+        """Test that min_gap suppresses changes that come too soon"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            scene_video_file, sampling='scene', min_gap=1.5
+        )
+        
+        assert list(frame_numbers(metadata)) == [0, 45]
+
+
+@pytest.mark.unit
+class TestTargetCountSampling:
+    """Test extraction of a fixed number of evenly spaced frames"""
+    
+    def test_target_frame_numbers(self, video_processor):
+        """Test even spacing of target frames"""
+        assert video_processor.target_frame_numbers(90, 3) == [0, 30, 60]
+        assert video_processor.target_frame_numbers(10, 4) == [0, 2, 5, 7]
+        assert video_processor.target_frame_numbers(5, 10) == [0, 1, 2, 3, 4]
+        assert video_processor.target_frame_numbers(0, 10) == []
+    
+    def test_missing_target_count(self, video_processor, mock_video_file):
+        """Test that count sampling requires a positive target_count"""
+        with pytest.raises(ValueError):
+            video_processor.extract_frames(mock_video_file, sampling='count')
+        with pytest.raises(ValueError):
+            video_processor.extract_frames(mock_video_file, sampling='count', target_count=0)
+    
+    @pytest.mark.parametrize('strategy', ['seek', 'grab'])
+    def test_count_sampling(self, video_processor, mock_video_file, strategy):
+        """Test that both strategies extract the requested evenly spaced frames"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            mock_video_file, sampling='count', target_count=4, strategy=strategy
+        )
+        
+        assert len(frame_paths) == 4
+        assert metadata['sampling'] == 'count'
+        assert metadata['target_count'] == 4
+        assert list(frame_numbers(metadata)) == [0, 22, 45, 67]
+    
+    def test_count_sampling_matches_decoded_frames(self, video_processor, mock_video_file):
+        """Test that seeking lands on the same pixels as a linear decode"""
+        cap = cv2.VideoCapture(mock_video_file)
+        reference = []
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            reference.append(frame)
+        cap.release()
+        
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            mock_video_file, sampling='count', target_count=4, strategy='seek'
+        )
+        
+        for frame_number, frame_path in zip(frame_numbers(metadata), frame_paths):
+            expected = cv2.imdecode(cv2.imencode('.jpg', reference[frame_number])[1],
+                                    cv2.IMREAD_COLOR)
+            assert np.array_equal(cv2.imread(frame_path), expected)
+
+
+@pytest.mark.unit
+class TestFrameEncoding:
+    """Test per-project frame encoding settings"""
+    
+    @pytest.mark.parametrize('image_format,extension', [('webp', '.webp'), ('png', '.png')])
+    def test_extract_frames_format(self, video_processor, mock_video_file, image_format, extension):
+        """Test that frames are written and recorded in the requested format"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            mock_video_file, image_format=image_format, image_quality=80
+        )
+        
+        assert len(frame_paths) == 3
+        assert all(path.endswith(extension) for path in frame_paths)
+        assert all(cv2.imread(path) is not None for path in frame_paths)
+        assert metadata['encoding']['format'] == image_format
+        assert metadata['encoding']['quality'] == 80
+    
+    def test_default_encoding_recorded(self, video_processor, mock_video_file):
+        """Test that default projects record JPEG settings"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(mock_video_file)
+        
+        assert metadata['encoding']['format'] == 'jpeg'
+        assert metadata['encoding']['mimetype'] == 'image/jpeg'
+    
+    def test_parallel_and_pipelined_keep_format(self, app, mock_video_file):
+        """Test that segment workers and encoder threads use the project format"""
+        processor = VideoProcessor(app.config['FRAMES_FOLDER'], workers=2,
+                                   min_segment_seconds=1.0, encoder_threads=2)
+        project_id, frame_paths, metadata = processor.extract_frames(
+            mock_video_file, interval=0.5, image_format='webp'
+        )
+        
+        assert len(frame_paths) == 6
+        assert all(path.endswith('.webp') and os.path.exists(path) for path in frame_paths)
+    
+    def test_lazy_project_format(self, video_processor, mock_video_file):
+        """Test that lazily decoded frames use the project format"""
+        project_id, frame_paths, metadata = video_processor.create_lazy_project(
+            mock_video_file, interval=1.0, image_format='png'
+        )
+        
+        frame_path = video_processor.materialize_frame(project_id, 1)
+        
+        assert frame_path.endswith('.png')
+        assert cv2.imread(frame_path) is not None
+    
+    def test_invalid_format(self, video_processor, mock_video_file):
+        """Test that unknown formats are rejected before any work is done"""
+        with pytest.raises(ValueError):
+            video_processor.extract_frames(mock_video_file, image_format='gif')
+
+
+@pytest.mark.unit
+class TestFrameVariants:
+    """Test thumbnail and preview variants written with every frame"""
+    
+    def test_variants_written_during_extraction(self, video_processor, mock_video_file):
+        """Test that a thumbnail is written next to each full frame"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(mock_video_file)
+        
+        assert metadata['variants'] == {'thumb': 256, 'preview': 1280}
+        for frame_path in frame_paths:
+            thumb = cv2.imread(video_processor.variant_path(frame_path, 'thumb'))
+            assert thumb.shape == (192, 256, 3)
+    
+    def test_small_frames_have_no_preview(self, video_processor, mock_video_file):
+        """Test that previews are not written for frames below preview size"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(mock_video_file)
+        
+        assert not os.path.exists(video_processor.variant_path(frame_paths[0], 'preview'))
+        assert video_processor.materialize_frame(project_id, 0, 'preview') == frame_paths[0]
+    
+    def test_small_frame_preview_not_decoded(self, video_processor, mock_video_file):
+        """Test that the recorded frame size answers preview requests without decoding"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(mock_video_file)
+        
+        assert (metadata['width'], metadata['height']) == (640, 480)
+        with patch('cv2.imread') as mock_imread:
+            assert video_processor.materialize_frame(project_id, 1, 'preview') == frame_paths[1]
+        mock_imread.assert_not_called()
+    
+    def test_save_frame_writes_all_variants(self, video_processor, tmp_path):
+        """Test that large frames get both downscaled variants"""
+        from modules.frame_encoder import FrameEncoder
+        frame = np.zeros((2160, 3840, 3), dtype=np.uint8)
+        frame_path = os.path.join(str(tmp_path), 'frame_000000.jpg')
+        
+        video_processor._save_frame(FrameEncoder(), frame_path, frame, atomic=True)
+        
+        assert cv2.imread(video_processor.variant_path(frame_path, 'preview')).shape == (720, 1280, 3)
+        assert cv2.imread(video_processor.variant_path(frame_path, 'thumb')).shape == (144, 256, 3)
+        assert cv2.imread(frame_path).shape == (2160, 3840, 3)
+    
+    def test_parallel_extraction_variants(self, app, mock_video_file):
+        """Test that segment variants are renamed with their frames"""
+        processor = VideoProcessor(app.config['FRAMES_FOLDER'], workers=2, min_segment_seconds=1.0)
+        project_id, frame_paths, metadata = processor.extract_frames(mock_video_file, interval=0.5)
+        
+        thumb_folder = os.path.join(app.config['FRAMES_FOLDER'], project_id, 'thumb')
+        assert sorted(os.listdir(thumb_folder)) == [os.path.basename(p) for p in frame_paths]
+    
+    def test_lazy_project_thumbnail(self, video_processor, mock_video_file):
+        """Test that a thumbnail request decodes a lazy frame once"""
+        project_id, frame_paths, metadata = video_processor.create_lazy_project(mock_video_file)
+        
+        thumb_path = video_processor.materialize_frame(project_id, 1, 'thumb')
+        
+        assert thumb_path == video_processor.variant_path(frame_paths[1], 'thumb')
+        assert os.path.exists(frame_paths[1])
+    
+    def test_missing_variant_generated_from_frame(self, video_processor, mock_video_file):
+        """Test that projects without variants get them on first request"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(mock_video_file)
+        shutil.rmtree(os.path.join(video_processor.frames_folder, project_id, 'thumb'))
+        
+        thumb_path = video_processor.materialize_frame(project_id, 2, 'thumb')
+        
+        assert cv2.imread(thumb_path).shape == (192, 256, 3)
+    
+    def test_unknown_size(self, video_processor, mock_video_file):
+        """Test that unknown sizes are rejected"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(mock_video_file)
+        
+        with pytest.raises(ValueError):
+            video_processor.materialize_frame(project_id, 0, 'huge')
+
+
+@pytest.fixture
+def pattern_video_file():
+    """
+    Create a video with three static textured scenes of one second each.
+    
+    Returns:
+        str: Path to the video file
+    """
+    temp_file = tempfile.NamedTemporaryFile(mode='wb', suffix='.mp4', delete=False)
+    temp_file.close()
+    
+    ramp = np.tile(np.linspace(0, 255, 320, dtype=np.uint8), (240, 1))
+    checker = ((np.indices((240, 320)) // 40).sum(axis=0) % 2 * 255).astype(np.uint8)
+    out = cv2.VideoWriter(temp_file.name, cv2.VideoWriter_fourcc(*'mp4v'), 30.0, (320, 240))
+    for pattern in (ramp, ramp[:, ::-1], checker):
+        for _ in range(30):
+            out.write(cv2.cvtColor(np.ascontiguousarray(pattern), cv2.COLOR_GRAY2BGR))
+    out.release()
+    
+    yield temp_file.name
+    os.unlink(temp_file.name)
+
+
+@pytest.mark.unit
+class TestDuplicateSuppression:
+    """Test perceptual-hash near-duplicate suppression"""
+    
+    def test_static_scenes_dedupe_to_one_frame_each(self, video_processor, pattern_video_file):
+        """Test that repeated frames of a static scene are skipped"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            pattern_video_file, interval=0.5, dedupe_distance=6
+        )
+        
+        assert len(frame_paths) == 3
+        assert list(frame_numbers(metadata)) == [0, 30, 60]
+        assert metadata['dedupe_distance'] == 6
+        assert [os.path.basename(p) for p in frame_paths] == [
+            'frame_000000.jpg', 'frame_000001.jpg', 'frame_000002.jpg'
+        ]
+        
+        hashes = np.load(os.path.join(video_processor.frames_folder, project_id,
+                                      metadata['hash_index']))
+        assert len(hashes) == 3
+    
+    def test_dedupe_disabled_by_default(self, video_processor, pattern_video_file):
+        """Test that every sampled frame is kept without a distance"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            pattern_video_file, interval=0.5
+        )
+        
+        assert len(frame_paths) == 6
+        assert 'dedupe_distance' not in metadata
+    
+    def test_find_similar_frames(self, video_processor, pattern_video_file):
+        """Test lookup of visually similar frames through the hash index"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            pattern_video_file, interval=0.5, dedupe_distance=0
+        )
+        
+        assert len(frame_paths) == 3
+        assert video_processor.find_similar_frames(project_id, 0, max_distance=0) == []
+        similar = video_processor.find_similar_frames(project_id, 0, max_distance=64)
+        assert sorted(index for index, _ in similar) == [1, 2]
+        assert [distance for _, distance in similar] == sorted(d for _, d in similar)
+        
+        with pytest.raises(IndexError):
+            video_processor.find_similar_frames(project_id, 5)
+    
+    def test_dedupe_with_scene_sampling(self, video_processor, pattern_video_file):
+        """Test that dedupe also applies on top of scene sampling"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            pattern_video_file, sampling='scene', max_gap=0.5, dedupe_distance=6
+        )
+        
+        assert list(frame_numbers(metadata)) == [0, 30, 60]
+
+
+@pytest.fixture
+def quality_video_file():
+    """
+    Create a video with a sharp, a blurred and an underexposed second.
+    
+    Returns:
+        str: Path to the video file
+    """
+    temp_file = tempfile.NamedTemporaryFile(mode='wb', suffix='.mp4', delete=False)
+    temp_file.close()
+    
+    checker = ((np.indices((240, 320)) // 20).sum(axis=0) % 2 * 200 + 30).astype(np.uint8)
+    sharp = cv2.cvtColor(checker, cv2.COLOR_GRAY2BGR)
+    blurred = cv2.GaussianBlur(sharp, (0, 0), 12)
+    dark = (sharp // 16).astype(np.uint8)
+    out = cv2.VideoWriter(temp_file.name, cv2.VideoWriter_fourcc(*'mp4v'), 30.0, (320, 240))
+    for frame in (sharp, blurred, dark):
+        for _ in range(30):
+            out.write(frame)
+    out.release()
+    
+    yield temp_file.name
+    os.unlink(temp_file.name)
+
+
+@pytest.mark.unit
+class TestQualityFilter:
+    """Test blur and exposure scoring during extraction"""
+    
+    def test_sharp_frame_has_no_issues(self, video_processor):
+        """Test that a well exposed, detailed frame passes"""
+        checker = ((np.indices((480, 640)) // 20).sum(axis=0) % 2 * 160 + 40).astype(np.uint8)
+        quality = video_processor.frame_quality(cv2.cvtColor(checker, cv2.COLOR_GRAY2BGR))
+        
+        assert quality['issues'] == []
+        assert quality['sharpness'] > 100
+    
+    def test_blurred_frame_is_blurry(self, video_processor):
+        """Test that a blurred frame scores low sharpness"""
+        checker = ((np.indices((480, 640)) // 20).sum(axis=0) % 2 * 160 + 40).astype(np.uint8)
+        blurred = cv2.GaussianBlur(cv2.cvtColor(checker, cv2.COLOR_GRAY2BGR), (0, 0), 12)
+        
+        assert video_processor.frame_quality(blurred)['issues'] == ['blurry']
+    
+    def test_exposure_issues(self, video_processor):
+        """Test that black and white frames are flagged as badly exposed"""
+        black = np.zeros((480, 640, 3), dtype=np.uint8)
+        white = np.full((480, 640, 3), 255, dtype=np.uint8)
+        
+        assert 'underexposed' in video_processor.frame_quality(black)['issues']
+        assert 'overexposed' in video_processor.frame_quality(white)['issues']
+    
+    def test_invalid_quality_filter(self, video_processor, mock_video_file):
+        """Test that unknown quality filters are rejected"""
+        with pytest.raises(ValueError):
+            video_processor.extract_frames(mock_video_file, quality_filter='blur')
+    
+    def test_drop_low_quality_frames(self, video_processor, quality_video_file):
+        """Test that blurry and dark frames are not written"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            quality_video_file, interval=0.5, quality_filter='drop'
+        )
+        
+        assert list(frame_numbers(metadata)) == [0, 15]
+        assert len(frame_paths) == 2
+        assert metadata['low_quality_frames'] == []
+        assert len(metadata['frame_quality']) == 2
+    
+    def test_flag_low_quality_frames(self, video_processor, quality_video_file):
+        """Test that flagged frames are kept and listed in the metadata"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            quality_video_file, interval=0.5, quality_filter='flag'
+        )
+        
+        assert len(frame_paths) == 6
+        assert metadata['low_quality_frames'] == [2, 3, 4, 5]
+        assert metadata['frame_quality'][2]['issues'] == ['blurry']
+        assert 'underexposed' in metadata['frame_quality'][4]['issues']
+    
+    def test_quality_with_dedupe(self, video_processor, quality_video_file):
+        """Test that scores stay aligned with frames that survive de-duplication"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            quality_video_file, interval=0.5, quality_filter='flag', dedupe_distance=6
+        )
+        
+        assert len(metadata['frame_quality']) == len(frame_paths)
+        assert frame_numbers(metadata)[0] == 0
+        assert metadata['frame_quality'][0]['issues'] == []
 
 
 @pytest.mark.unit
@@ -345,6 +1147,384 @@ class TestVideoProcessorMetadata:
         assert metadata['frame_size'] == [854, 480]
 
 
+@pytest.mark.unit
+class TestMetadataCache:
+    """Test caching of parsed project metadata"""
+    
+    def test_repeat_lookups_parse_once(self, video_processor, mock_video_file):
+        """Test that unchanged metadata is not parsed again"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(mock_video_file)
+        video_processor.get_project_metadata(project_id)
+        
+        with patch('json.load') as mock_load:
+            for frame_index in range(3):
+                video_processor.get_frame_path(project_id, frame_index)
+        
+        mock_load.assert_not_called()
+    
+    def test_rewritten_metadata_is_reloaded(self, video_processor, mock_video_file):
+        """Test that a changed metadata.json invalidates the cache"""
+        import json
+        project_id, frame_paths, metadata = video_processor.extract_frames(mock_video_file)
+        video_processor.get_project_metadata(project_id)
+        
+        metadata_path = os.path.join(video_processor.frames_folder, project_id, 'metadata.json')
+        metadata['video_name'] = 'renamed_video.mp4'
+        with open(metadata_path, 'w') as f:
+            json.dump(metadata, f, indent=2)
+        
+        assert video_processor.get_project_metadata(project_id)['video_name'] == 'renamed_video.mp4'
+    
+    def test_returned_metadata_is_a_copy(self, video_processor, mock_video_file):
+        """Test that callers cannot change the cached entry"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(mock_video_file)
+        
+        video_processor.get_project_metadata(project_id)['extracted_count'] = 0
+        
+        assert video_processor.get_project_metadata(project_id)['extracted_count'] == 3
+    
+    def test_frame_path_from_index(self, video_processor, mock_video_file):
+        """Test that frame paths are built from the index"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            mock_video_file, image_format='webp'
+        )
+        
+        assert [video_processor.get_frame_path(project_id, i) for i in range(3)] == frame_paths
+        with pytest.raises(IndexError):
+            video_processor.get_frame_path(project_id, 3)
+    
+    def test_deleted_project_not_served_from_cache(self, video_processor, mock_video_file):
+        """Test that deleting a project drops its cached metadata"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(mock_video_file)
+        video_processor.get_project_metadata(project_id)
+        
+        video_processor.delete_project(project_id)
+        
+        with pytest.raises(FileNotFoundError):
+            video_processor.get_project_metadata(project_id)
+    
+    def test_deleted_project_releases_video_handles(self, video_processor, mock_video_file):
+        """Test that deleting a lazy project closes its pooled captures"""
+        project_id, frame_paths, metadata = video_processor.create_lazy_project(mock_video_file)
+        video_processor.materialize_frame(project_id, 1)
+        assert len(video_processor.capture_pool) == 1
+        
+        video_processor.delete_project(project_id)
+        
+        assert len(video_processor.capture_pool) == 0
+
+
+@pytest.mark.unit
+class TestFrameIndex:
+    """Test the frame number and timestamp side file"""
+    
+    def test_interval_extraction_writes_index(self, video_processor, mock_video_file):
+        """Test that every extracted frame gets a frame number and timestamp"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(mock_video_file)
+        
+        index = video_processor.get_frame_index(project_id)
+        
+        assert metadata['frame_index'] == 'frame_index.npy'
+        assert os.path.exists(os.path.join(video_processor.frames_folder, project_id,
+                                           'frame_index.npy'))
+        assert list(index['frame_number']) == [0, 30, 60]
+        assert np.allclose(index['timestamp'], [0.0, 1.0, 2.0])
+    
+    def test_pipelined_extraction_writes_index(self, app, mock_video_file):
+        """Test that the pipelined writer records the same index"""
+        processor = VideoProcessor(app.config['FRAMES_FOLDER'], encoder_threads=3)
+        project_id, frame_paths, metadata = processor.extract_frames(mock_video_file, interval=0.5)
+        
+        index = processor.get_frame_index(project_id)
+        
+        assert list(index['frame_number']) == list(range(0, 90, 15))
+        assert np.allclose(index['timestamp'], np.arange(6) * 0.5)
+    
+    def test_scene_index_matches_metadata(self, video_processor, scene_video_file):
+        """Test that filtered extraction stores the kept frames in the index"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            scene_video_file, sampling='scene'
+        )
+        
+        index = video_processor.get_frame_index(project_id)
+        
+        assert len(index) == len(frame_paths)
+        assert list(index['frame_number']) == list(frame_numbers(metadata))
+        assert np.allclose(index['timestamp'], frame_timestamps(metadata))
+    
+    def test_lazy_project_writes_index(self, video_processor, mock_video_file):
+        """Test that on-demand projects record the sampled frames up front"""
+        project_id, frame_paths, metadata = video_processor.create_lazy_project(mock_video_file)
+        
+        index = video_processor.get_frame_index(project_id)
+        
+        assert list(index['frame_number']) == [0, 30, 60]
+        assert list(index['timestamp']) == [0.0, 1.0, 2.0]
+    
+    def test_project_without_index_uses_metadata(self, video_processor, mock_video_file):
+        """Test that projects extracted before the side file existed still work"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(mock_video_file)
+        os.remove(os.path.join(video_processor.frames_folder, project_id, 'frame_index.npy'))
+        
+        index = video_processor.get_frame_index(project_id)
+        
+        assert list(index['frame_number']) == [0, 30, 60]
+        assert list(index['timestamp']) == [0.0, 1.0, 2.0]
+
+
+@pytest.mark.unit
+class TestResampleProject:
+    """Test re-sampling an existing project from its stored video"""
+    
+    def test_resample_at_new_interval(self, video_processor, mock_video_file):
+        """Test that the project keeps its ID and gets the new frames"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            mock_video_file, project_name='resampled'
+        )
+        
+        project_id, frame_paths, resampled = video_processor.resample_project(project_id, 0.5)
+        
+        assert project_id == 'resampled'
+        assert len(frame_paths) == 6
+        assert all(os.path.exists(path) for path in frame_paths)
+        assert os.path.dirname(frame_paths[0]) == os.path.join(video_processor.frames_folder,
+                                                               'resampled')
+        assert resampled['project_id'] == 'resampled'
+        assert resampled['revision'] == 1
+        assert resampled['created_at'] == metadata['created_at']
+        assert video_processor.get_project_metadata(project_id)['extracted_count'] == 6
+        assert list(video_processor.get_frame_index(project_id)['frame_number']) == \
+            list(range(0, 90, 15))
+        assert os.listdir(video_processor.frames_folder) == ['resampled']
+    
+    def test_resample_keeps_encoding_and_changes_mode(self, video_processor, scene_video_file):
+        """Test switching the sampling mode with the project's frame format"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            scene_video_file, image_format='webp'
+        )
+        
+        project_id, frame_paths, resampled = video_processor.resample_project(
+            project_id, sampling='scene'
+        )
+        
+        assert resampled['sampling'] == 'scene'
+        assert resampled['encoding']['format'] == 'webp'
+        assert frame_paths[0].endswith('.webp')
+    
+    def test_lazy_project_stays_lazy(self, video_processor, mock_video_file):
+        """Test that on-demand projects are re-sampled without decoding"""
+        project_id, frame_paths, metadata = video_processor.create_lazy_project(mock_video_file)
+        
+        project_id, frame_paths, resampled = video_processor.resample_project(project_id, 0.5)
+        
+        assert resampled['lazy'] is True
+        assert len(frame_paths) == 6
+        assert not os.path.exists(frame_paths[0])
+    
+    def test_missing_source_video(self, video_processor, mock_video_file):
+        """Test that a project whose video was removed cannot be re-sampled"""
+        import shutil as shell
+        video_copy = os.path.join(video_processor.frames_folder, 'copy.mp4')
+        os.makedirs(video_processor.frames_folder, exist_ok=True)
+        shell.copy(mock_video_file, video_copy)
+        project_id, frame_paths, metadata = video_processor.extract_frames(video_copy)
+        os.remove(video_copy)
+        
+        with pytest.raises(FileNotFoundError):
+            video_processor.resample_project(project_id, 0.5)
+    
+    def test_cancelled_resample_keeps_project(self, video_processor, mock_video_file):
+        """Test that a cancelled run leaves the old frames in place"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            mock_video_file, project_name='kept'
+        )
+        
+        def cancel(decoded, written, total):
+            if written:
+                raise ExtractionCancelled()
+        
+        with pytest.raises(ExtractionCancelled):
+            video_processor.resample_project(project_id, 0.5, progress_callback=cancel)
+        
+        assert video_processor.get_project_metadata(project_id)['extracted_count'] == 3
+        assert all(os.path.exists(path) for path in frame_paths)
+        assert os.listdir(video_processor.frames_folder) == ['kept']
+
+
+@pytest.mark.unit
+class TestExtractionReuse:
+    """Test finding and reusing extractions of the same video content"""
+    
+    def test_params_ignore_unused_settings(self):
+        """Test that settings without effect do not make params differ"""
+        assert extraction_params(1.0, sampling='count', target_count=10) == \
+            extraction_params(2.0, sampling='count', target_count=10)
+        assert extraction_params(1.0, scene_threshold=0.3) == extraction_params(1.0)
+        assert extraction_params(1.0, image_format='png', image_quality=80) == \
+            extraction_params(1.0, image_format='png')
+        assert extraction_params(1.0) != extraction_params(0.5)
+        assert extraction_params(1.0) != extraction_params(1.0, lazy=True)
+        assert extraction_params(1.0) == extraction_params(1.0, image_quality=95)
+    
+    def test_metadata_records_source_and_params(self, video_processor, mock_video_file):
+        """Test that extraction records the content hash and settings"""
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            mock_video_file, 0.5, source_sha256='abc'
+        )
+        
+        assert metadata['source_sha256'] == 'abc'
+        assert metadata['extraction_params'] == extraction_params(0.5)
+    
+    def test_find_extraction_matches_settings(self, video_processor, mock_video_file):
+        """Test that only an extraction with the same settings is found"""
+        video_processor.extract_frames(mock_video_file, project_name='one', source_sha256='abc')
+        video_processor.create_lazy_project(mock_video_file, project_name='lazy',
+                                            source_sha256='abc')
+        
+        assert video_processor.find_extraction('abc', extraction_params(1.0)) == 'one'
+        assert video_processor.find_extraction('abc', extraction_params(1.0, lazy=True)) == 'lazy'
+        assert video_processor.find_extraction('abc', extraction_params(0.5)) is None
+        assert video_processor.find_extraction('other', extraction_params(1.0)) is None
+        assert video_processor.find_source_video('abc') == mock_video_file
+        assert video_processor.find_source_video('other') is None
+    
+    def test_source_index_avoids_rescanning(self, video_processor, mock_video_file):
+        """Test that lookups after the first only read the matching projects"""
+        video_processor.extract_frames(mock_video_file, project_name='one', source_sha256='abc')
+        assert video_processor.find_extraction('abc', extraction_params(1.0)) == 'one'
+        
+        with patch('modules.video_processor.os.listdir') as mock_listdir:
+            video_processor.extract_frames(mock_video_file, 0.5, project_name='two',
+                                           source_sha256='abc')
+            video_processor.clone_project('one', 'copy')
+            assert video_processor.find_extraction('abc', extraction_params(0.5)) == 'two'
+            
+            video_processor.delete_project('one')
+            assert video_processor.find_extraction('abc', extraction_params(1.0)) == 'copy'
+            video_processor.delete_project('copy')
+            assert video_processor.find_extraction('abc', extraction_params(1.0)) is None
+        mock_listdir.assert_not_called()
+    
+    def test_clone_links_frames(self, video_processor, mock_video_file):
+        """Test that a clone shares frame files but not its metadata"""
+        source_id, source_paths, source_meta = video_processor.extract_frames(
+            mock_video_file, project_name='source', source_sha256='abc'
+        )
+        
+        project_id, frame_paths, metadata = video_processor.clone_project(
+            'source', 'copy', '/uploads/copy.mp4'
+        )
+        
+        assert project_id == 'copy'
+        assert len(frame_paths) == 3
+        for source_path, frame_path in zip(source_paths, frame_paths):
+            assert os.path.samefile(source_path, frame_path)
+        assert metadata['cloned_from'] == 'source'
+        assert metadata['video_path'] == '/uploads/copy.mp4'
+        assert video_processor.get_project_metadata('source')['video_path'] == mock_video_file
+        assert list(video_processor.get_frame_index('copy')['frame_number']) == [0, 30, 60]
+        
+        video_processor.delete_project('source')
+        assert all(os.path.exists(path) for path in frame_paths)
+    
+    def test_clone_onto_itself(self, video_processor, mock_video_file):
+        """Test that re-uploading under the source's name keeps the project"""
+        video_processor.extract_frames(mock_video_file, project_name='same')
+        
+        project_id, frame_paths, metadata = video_processor.clone_project('same', 'same')
+        
+        assert project_id == 'same'
+        assert 'cloned_from' not in metadata
+    
+    def test_clone_into_existing_project(self, video_processor, mock_video_file):
+        """Test that an existing project is never overwritten"""
+        video_processor.extract_frames(mock_video_file, project_name='one')
+        video_processor.extract_frames(mock_video_file, project_name='two')
+        
+        with pytest.raises(ValueError):
+            video_processor.clone_project('one', 'two')
+
+
+@pytest.mark.unit
+class TestProgressiveExtraction:
+    """Test extracting a video while it is still being uploaded"""
+    
+    def test_matches_extraction_of_complete_file(self, video_processor, avi_video_file, slow_upload):
+        """Test that frames, index and metadata equal a normal extraction"""
+        _, expected_paths, expected = video_processor.extract_frames(
+            avi_video_file, 0.5, project_name='complete')
+        growing, writer = slow_upload(avi_video_file)
+        
+        project_id, frame_paths, metadata = video_processor.extract_frames(
+            growing.path, 0.5, project_name='growing', growing=growing)
+        writer.join()
+        
+        assert len(frame_paths) == len(expected_paths) == 6
+        for path, expected_path in zip(frame_paths, expected_paths):
+            assert np.array_equal(cv2.imread(path), cv2.imread(expected_path))
+        assert np.array_equal(video_processor.get_frame_index('growing'),
+                              video_processor.get_frame_index('complete'))
+        assert metadata['total_frames'] == 90
+        assert metadata['source_sha256'] == 'feed'
+        assert 'extracting' not in video_processor.get_project_metadata(project_id)
+    
+    def test_frames_served_during_extraction(self, video_processor, avi_video_file, slow_upload):
+        """Test that metadata.json lists written frames before extraction ends"""
+        seen = []
+        
+        def progress(frames_decoded, frames_written, total_frames):
+            if frames_written == 1:
+                metadata = video_processor.get_project_metadata('growing')
+                seen.append((metadata.get('extracting'), metadata['extracted_count']))
+                assert os.path.exists(video_processor.get_frame_path('growing', 0))
+        
+        growing, writer = slow_upload(avi_video_file)
+        video_processor.extract_frames(growing.path, 0.5, project_name='growing',
+                                       progress_callback=progress, growing=growing)
+        writer.join()
+        
+        assert seen == [(True, 1)]
+    
+    def test_filtered_sampling(self, video_processor, avi_video_file, slow_upload):
+        """Test that scene sampling records the kept frames of a growing upload"""
+        _, expected_paths, _ = video_processor.extract_frames(
+            avi_video_file, project_name='complete', sampling='scene', scene_threshold=0.05)
+        growing, writer = slow_upload(avi_video_file)
+        
+        _, frame_paths, _ = video_processor.extract_frames(
+            growing.path, project_name='growing', sampling='scene', scene_threshold=0.05,
+            growing=growing)
+        writer.join()
+        
+        assert len(frame_paths) == len(expected_paths)
+        assert np.array_equal(video_processor.get_frame_index('growing'),
+                              video_processor.get_frame_index('complete'))
+    
+    def test_count_sampling_rejected(self, video_processor, avi_video_file):
+        """Test that count sampling asks for the complete video"""
+        from modules.growing_capture import GrowingFile
+        
+        with pytest.raises(ValueError):
+            video_processor.extract_frames(avi_video_file, sampling='count', target_count=5,
+                                           growing=GrowingFile(avi_video_file))
+    
+    def test_abandoned_upload_removes_project(self, video_processor, avi_video_file, tmp_path):
+        """Test that the partial project is deleted when the upload is abandoned"""
+        from modules.growing_capture import GrowingFile, SourceAborted
+        import threading
+        with open(avi_video_file, 'rb') as f:
+            data = f.read()
+        path = tmp_path / 'upload.avi'
+        path.write_bytes(data[:len(data) // 2])
+        growing = GrowingFile(str(path))
+        threading.Timer(0.2, growing.abort).start()
+        
+        with pytest.raises(SourceAborted):
+            video_processor.extract_frames(str(path), 0.5, project_name='growing', growing=growing)
+        
+        assert not os.path.exists(os.path.join(video_processor.frames_folder, 'growing'))
+
+
 @pytest.mark.unit
 class TestVideoProcessorErrorHandling:
     """Test error handling and edge cases"""